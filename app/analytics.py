@@ -0,0 +1,196 @@
+"""
+Аналитика семантического графа: степени, PageRank и компоненты связности
+
+Связи загружаются из TermRelation в разреженную матрицу смежности (SciPy), метрики считаются
+векторно для всех терминов сразу. Результат кэшируется в памяти процесса и сбрасывается
+событиями, которые добавляют или удаляют термины и связи; пересчёт выполняется при следующем
+запросе в пуле потоков, одновременные запросы ждут один общий расчёт. Изменение описания или ключевого слова метрики не затрагивает - ключевые слова
+подставляются при формировании ответа.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from sqlmodel import Session, select
+
+from .db import read_engine
+from .events import ChangeSet, subscribe, subscribe_reset
+from .models import Term, TermRelation
+from .versioning import read_version
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-8
+PAGERANK_MAX_ITERATIONS = 100
+DEFAULT_ANALYTICS_LIMIT = 50
+MAX_ANALYTICS_LIMIT = 1000
+
+
+@dataclass
+class GraphMetrics:
+	"""Метрики всех терминов; массивы выровнены по ids (по возрастанию id)"""
+	version: int
+	ids: np.ndarray
+	edges: int
+	in_degree: np.ndarray
+	out_degree: np.ndarray
+	pagerank: np.ndarray
+	pagerank_iterations: int
+	# Номер компоненты каждого термина; компоненты пронумерованы по убыванию размера
+	component: np.ndarray
+	component_sizes: np.ndarray
+	# Позиции терминов в ids, сгруппированные по компонентам
+	component_members: np.ndarray
+	component_offsets: np.ndarray
+	# Порядок терминов по убыванию степени и PageRank
+	degree_order: np.ndarray
+	pagerank_order: np.ndarray
+
+	@property
+	def degree(self) -> np.ndarray:
+		return self.in_degree + self.out_degree
+
+	def members(self, component: int) -> np.ndarray:
+		return self.ids[self.component_members[self.component_offsets[component]:self.component_offsets[component + 1]]]
+
+
+def pagerank(adjacency: csr_matrix, damping: float = PAGERANK_DAMPING,
+			 tolerance: float = PAGERANK_TOLERANCE, max_iterations: int = PAGERANK_MAX_ITERATIONS) -> tuple[np.ndarray, int]:
+	"""PageRank степенным методом; вес висячих узлов (без исходящих связей) распределяется равномерно"""
+	n = adjacency.shape[0]
+	if n == 0:
+		return np.zeros(0), 0
+	out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+	dangling = out_weight == 0
+	inv_out = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+	transposed = adjacency.T.tocsr()
+	rank = np.full(n, 1.0 / n)
+	for iteration in range(1, max_iterations + 1):
+		spread = transposed @ (rank * inv_out)
+		updated = damping * spread + (damping * rank[dangling].sum() + 1.0 - damping) / n
+		change = np.abs(updated - rank).sum()
+		rank = updated
+		if change < tolerance:
+			break
+	return rank / rank.sum(), iteration
+
+
+def compute_metrics(version: int, node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> GraphMetrics:
+	"""Метрики графа по отсортированным node_ids и концам связей"""
+	n = len(node_ids)
+	src = np.searchsorted(node_ids, sources)
+	tgt = np.searchsorted(node_ids, targets)
+	# Связи разных типов между одной парой терминов учитываются в степенях каждая,
+	# в PageRank - как вес ребра
+	adjacency = csr_matrix((np.ones(len(src)), (src, tgt)), shape=(n, n))
+	adjacency.sum_duplicates()
+	out_degree = np.bincount(src, minlength=n)
+	in_degree = np.bincount(tgt, minlength=n)
+	rank, iterations = pagerank(adjacency)
+
+	_, labels = connected_components(adjacency, directed=True, connection="weak")
+	sizes = np.bincount(labels)
+	# Перенумерация компонент по убыванию размера (при равенстве - по наименьшему id)
+	by_size = np.argsort(-sizes, kind="stable")
+	renumber = np.empty_like(by_size)
+	renumber[by_size] = np.arange(len(by_size))
+	component = renumber[labels]
+	members = np.argsort(component, kind="stable")
+	component_sizes = sizes[by_size]
+
+	degree = in_degree + out_degree
+	return GraphMetrics(
+		version=version,
+		ids=node_ids,
+		edges=len(sources),
+		in_degree=in_degree,
+		out_degree=out_degree,
+		pagerank=rank,
+		pagerank_iterations=iterations,
+		component=component,
+		component_sizes=component_sizes,
+		component_members=members,
+		component_offsets=np.concatenate(([0], np.cumsum(component_sizes))),
+		degree_order=np.lexsort((node_ids, -degree)),
+		pagerank_order=np.lexsort((node_ids, -rank)),
+	)
+
+
+class GraphAnalytics:
+	"""Кэш метрик графа; сбрасывается при добавлении и удалении терминов и связей"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._metrics: Optional[GraphMetrics] = None
+		# Текущий расчёт; общий для всех ожидающих, в том числе из разных циклов событий
+		self._building: Optional[Future] = None
+		# Номер изменения графа: результат расчёта, начатого до изменения, не кэшируется
+		self._generation = 0
+
+	@property
+	def cached(self) -> bool:
+		return self._metrics is not None
+
+	async def metrics(self) -> GraphMetrics:
+		"""Актуальные метрики: из кэша или новым расчётом в пуле потоков, не блокируя цикл событий"""
+		metrics = self._metrics
+		if metrics is not None:
+			return metrics
+		with self._lock:
+			if self._metrics is not None:
+				return self._metrics
+			future = self._building
+			if future is None:
+				future = self._building = Future()
+				# Задача ставится в пул сразу: отмена запроса не оставит ожидающих без результата
+				asyncio.get_running_loop().run_in_executor(None, self._build, future, self._generation)
+		return await asyncio.wrap_future(future)
+
+	def _build(self, future: Future, generation: int) -> None:
+		try:
+			with Session(read_engine) as session:
+				metrics = self._compute(session)
+		except BaseException as exc:
+			with self._lock:
+				if self._building is future:
+					self._building = None
+			future.set_exception(exc)
+			return
+		with self._lock:
+			if self._building is future:
+				self._building = None
+			if generation == self._generation:
+				self._metrics = metrics
+		future.set_result(metrics)
+
+	def _compute(self, session: Session) -> GraphMetrics:
+		version = read_version(session)
+		node_ids = np.fromiter(session.exec(select(Term.id).order_by(Term.id)), dtype=np.int64)
+		# Пары читаются плоским потоком чисел: np.array по списку Row в десятки раз медленнее
+		rows = session.connection().execute(select(TermRelation.source_id, TermRelation.target_id))
+		edges = np.fromiter(chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+		return compute_metrics(version, node_ids, edges[:, 0], edges[:, 1])
+
+	def invalidate(self) -> None:
+		with self._lock:
+			self._generation += 1
+			self._metrics = None
+			# Запросы после изменения не ждут расчёта, начатого до него
+			self._building = None
+
+	def rebuild(self, _session: Session) -> None:
+		self.invalidate()
+
+	def on_changes(self, changes: ChangeSet) -> None:
+		if changes.terms_added or changes.terms_deleted or changes.relations_added or changes.relations_deleted:
+			self.invalidate()
+
+
+graph_analytics = GraphAnalytics()
+subscribe(graph_analytics.on_changes)
+subscribe_reset(graph_analytics.rebuild)
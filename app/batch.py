@@ -0,0 +1,137 @@
+"""
+Пакетные операции над терминами, общие для REST и gRPC: одна транзакция на пакет
+и поиск существующих ключевых слов одним IN-запросом
+"""
+from typing import Any, Iterable, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import delete, or_
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, select
+
+from .cache import term_cache
+from .events import record_relations_deleted, record_terms_added, record_terms_deleted
+from .models import Term, TermRelation
+from .schemas import BulkItemResult, TermCreate, TermRead
+
+# Число параметров в одном IN: старые сборки SQLite ограничены 999 переменными
+IN_CHUNK_SIZE = 500
+
+
+def in_chunks(items: list, size: int = IN_CHUNK_SIZE) -> Iterator[list]:
+	for start in range(0, len(items), size):
+		yield items[start:start + size]
+
+
+def find_terms(session: Session, keywords: Iterable[str]) -> dict[str, Term]:
+	"""Термины по набору ключевых слов за минимальное число IN-запросов"""
+	unique = list(dict.fromkeys(keywords))
+	found: dict[str, Term] = {}
+	for chunk in in_chunks(unique):
+		for term in session.exec(select(Term).where(Term.keyword.in_(chunk))).all():
+			found[term.keyword] = term
+	return found
+
+
+def batch_get_terms(session: Session, keywords: list[str]) -> tuple[list[TermRead], list[str]]:
+	"""Найденные термины (в порядке запроса) и список отсутствующих ключевых слов"""
+	cached: dict[str, TermRead] = {}
+	misses = []
+	generation = term_cache.generation
+	for keyword in dict.fromkeys(keywords):
+		term = term_cache.get(keyword)
+		if term is None:
+			misses.append(keyword)
+		else:
+			cached[keyword] = term
+	for keyword, term in find_terms(session, misses).items():
+		cached[keyword] = TermRead.model_validate(term)
+		term_cache.set(keyword, cached[keyword], generation)
+
+	terms = []
+	missing = []
+	for keyword in dict.fromkeys(keywords):
+		if keyword in cached:
+			terms.append(cached[keyword])
+		else:
+			missing.append(keyword)
+	return terms, missing
+
+
+def error_detail(exc: ValidationError) -> str:
+	return "; ".join(
+		f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+	)
+
+
+def bulk_create_terms(session: Session, items: list[dict[str, Any]]) -> list[BulkItemResult]:
+	"""Создание пакета терминов в одной транзакции с результатом по каждому элементу"""
+	results: list[Optional[BulkItemResult]] = [None] * len(items)
+	valid: list[tuple[int, TermCreate]] = []
+	for index, item in enumerate(items):
+		try:
+			valid.append((index, TermCreate.model_validate(item)))
+		except ValidationError as exc:
+			keyword = item.get("keyword") if isinstance(item, dict) else None
+			results[index] = BulkItemResult(
+				keyword=keyword if isinstance(keyword, str) else None,
+				status="error",
+				detail=error_detail(exc)
+			)
+
+	# Повторы внутри пакета отсекаются здесь, с существующими терминами - уникальным индексом keyword,
+	# поэтому одновременное создание того же термина даёт conflict, а не ошибку всего пакета
+	rows, indexes = [], {}
+	for index, data in valid:
+		if data.keyword in indexes:
+			results[index] = BulkItemResult(keyword=data.keyword, status="conflict", detail="Term already exists")
+			continue
+		indexes[data.keyword] = index
+		rows.append({"keyword": data.keyword, "description": data.description, "source": data.source})
+
+	if rows:
+		inserted = session.exec(
+			insert(Term)
+			.on_conflict_do_nothing(index_elements=[Term.keyword])
+			.returning(Term.id, Term.keyword, Term.description, Term.source),
+			params=rows
+		).all()
+		created = {row.keyword: TermRead.model_validate(row) for row in inserted}
+		for keyword, index in indexes.items():
+			if keyword in created:
+				results[index] = BulkItemResult(keyword=keyword, status="created", term=created[keyword])
+			else:
+				results[index] = BulkItemResult(keyword=keyword, status="conflict", detail="Term already exists")
+		# Core INSERT минует события ORM - сообщаем о создании явно
+		record_terms_added(session, {term.id: keyword for keyword, term in created.items()})
+		session.commit()
+	return results
+
+
+def bulk_delete_terms(session: Session, keywords: list[str]) -> list[BulkItemResult]:
+	"""Удаление пакета терминов вместе с их связями в одной транзакции"""
+	existing = find_terms(session, keywords)
+	ids = [term.id for term in existing.values()]
+	if ids:
+		relations = []
+		for chunk in in_chunks(ids):
+			incident = or_(TermRelation.source_id.in_(chunk), TermRelation.target_id.in_(chunk))
+			relations.extend(session.exec(select(
+				TermRelation.id, TermRelation.source_id, TermRelation.target_id, TermRelation.relation_type
+			).where(incident)).all())
+			session.exec(delete(TermRelation).where(incident))
+			session.exec(delete(Term).where(Term.id.in_(chunk)))
+		# Core DELETE минует события ORM - сообщаем об удалении явно
+		record_relations_deleted(session, list(dict.fromkeys(tuple(row) for row in relations)))
+		record_terms_deleted(session, {term.id: term.keyword for term in existing.values()})
+		session.commit()
+
+	results = []
+	reported: set[str] = set()
+	for keyword in keywords:
+		if keyword in existing and keyword not in reported:
+			reported.add(keyword)
+			results.append(BulkItemResult(keyword=keyword, status="deleted"))
+		else:
+			results.append(BulkItemResult(keyword=keyword, status="not_found", detail="Term not found"))
+	return results
@@ -0,0 +1,137 @@
+"""
+Кэш терминов в памяти процесса (read-through), общий для REST и gRPC
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from sqlmodel import Session
+
+from .events import ChangeSet, subscribe, subscribe_reset
+from .schemas import TermRead
+
+TERM_CACHE_SIZE = int(os.getenv("TERM_CACHE_SIZE", "1024"))
+TERM_CACHE_TTL = float(os.getenv("TERM_CACHE_TTL", "300"))
+TERM_COUNT_TTL = float(os.getenv("TERM_COUNT_TTL", "30"))
+
+
+class TermCache:
+	"""LRU-кэш keyword -> TermRead с ограничением по размеру и времени жизни записи
+
+	Запись после чтения из БД передаёт generation, взятый до чтения: если между ними был сброс,
+	прочитанная строка могла устареть и в кэш не попадает
+	"""
+
+	def __init__(self, maxsize: int = TERM_CACHE_SIZE, ttl: float = TERM_CACHE_TTL,
+				 clock: Callable[[], float] = time.monotonic) -> None:
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self._clock = clock
+		self._data: "OrderedDict[str, tuple[float, TermRead]]" = OrderedDict()
+		self._lock = threading.Lock()
+		self._generation = 0  # растёт при каждом сбросе
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, keyword: str) -> Optional[TermRead]:
+		with self._lock:
+			entry = self._data.get(keyword)
+			if entry is None:
+				self.misses += 1
+				return None
+			expires_at, term = entry
+			if expires_at <= self._clock():
+				del self._data[keyword]
+				self.misses += 1
+				return None
+			self._data.move_to_end(keyword)
+			self.hits += 1
+			return term
+
+	@property
+	def generation(self) -> int:
+		return self._generation
+
+	def set(self, keyword: str, term: TermRead, generation: Optional[int] = None) -> None:
+		if self.maxsize <= 0:
+			return
+		with self._lock:
+			if generation is not None and generation != self._generation:
+				return
+			self._data[keyword] = (self._clock() + self.ttl, term)
+			self._data.move_to_end(keyword)
+			while len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+				self.evictions += 1
+
+	def invalidate(self, *keywords: Optional[str]) -> None:
+		with self._lock:
+			self._generation += 1
+			for keyword in keywords:
+				if keyword is not None:
+					self._data.pop(keyword, None)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._generation += 1
+			self._data.clear()
+
+	def stats(self) -> dict:
+		with self._lock:
+			total = self.hits + self.misses
+			return {
+				"size": len(self._data),
+				"maxsize": self.maxsize,
+				"ttl": self.ttl,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"hit_ratio": self.hits / total if total else 0.0,
+			}
+
+
+class CountCache:
+	"""Закэшированное значение COUNT(*), сбрасывается при записи или по истечении ttl"""
+
+	def __init__(self, ttl: float = TERM_COUNT_TTL, clock: Callable[[], float] = time.monotonic) -> None:
+		self.ttl = ttl
+		self._clock = clock
+		self._value: Optional[tuple[float, int]] = None
+		self._lock = threading.Lock()
+
+	def get(self) -> Optional[int]:
+		with self._lock:
+			if self._value is None or self._value[0] <= self._clock():
+				return None
+			return self._value[1]
+
+	def set(self, value: int) -> None:
+		with self._lock:
+			self._value = (self._clock() + self.ttl, value)
+
+	def invalidate(self) -> None:
+		with self._lock:
+			self._value = None
+
+
+term_cache = TermCache()
+term_count_cache = CountCache()
+
+
+@subscribe
+def _invalidate_changed(changes: ChangeSet) -> None:
+	"""Сброс по журналу изменений: так до кэша доходят и записи других процессов"""
+	term_cache.invalidate(*changes.terms_deleted.values())
+	for old_keyword, keyword in changes.terms_updated.values():
+		term_cache.invalidate(old_keyword, keyword)
+	if changes.terms_added or changes.terms_deleted:
+		term_count_cache.invalidate()
+
+
+@subscribe_reset
+def _clear(_session: Session) -> None:
+	term_cache.clear()
+	term_count_cache.invalidate()
@@ -1,15 +1,176 @@
-from typing import Generator
+"""
+Настройка движка SQLite: профили PRAGMA и пула соединений задаются переменными окружения
 
+GLOSSARY_DATABASE_URL       - адрес БД (по умолчанию sqlite:///./glossary.db)
+GLOSSARY_DB_PROFILE         - default (как есть) или production (WAL, synchronous=NORMAL, кэш и mmap)
+GLOSSARY_SQLITE_JOURNAL_MODE, GLOSSARY_SQLITE_SYNCHRONOUS, GLOSSARY_SQLITE_CACHE_SIZE,
+GLOSSARY_SQLITE_MMAP_SIZE, GLOSSARY_SQLITE_BUSY_TIMEOUT - переопределяют отдельные PRAGMA профиля
+GLOSSARY_DB_POOL_SIZE, GLOSSARY_DB_MAX_OVERFLOW         - размер пула соединений
+GLOSSARY_DB_READ_ENGINE     - 1, чтобы GET-запросы шли через отдельный read-only движок
+SLOW_QUERY_MS               - порог лога медленных запросов (см. query_stats)
+
+Синхронные движки используются gRPC сервером, асинхронные (aiosqlite) - роутерами FastAPI
+"""
+import os
+from dataclasses import dataclass, replace
+from typing import AsyncGenerator, Generator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .events import init_changelog
+from .query_stats import install_query_hooks
+from .relations import init_relation_indexes
+from .search import init_search
+
+DATABASE_URL = os.getenv("GLOSSARY_DATABASE_URL", "sqlite:///./glossary.db")
+
+
+@dataclass(frozen=True)
+class EngineSettings:
+	journal_mode: Optional[str] = None
+	synchronous: Optional[str] = None
+	cache_size: Optional[int] = None  # отрицательное значение - размер в КБ
+	mmap_size: Optional[int] = None
+	busy_timeout: Optional[int] = None  # мс
+	pool_size: int = 5
+	max_overflow: int = 10
+	read_engine: bool = False
+
+
+PROFILES = {
+	"default": EngineSettings(),
+	"production": EngineSettings(
+		journal_mode="WAL",
+		synchronous="NORMAL",
+		cache_size=-65536,
+		mmap_size=268435456,
+		busy_timeout=5000,
+		pool_size=20,
+		max_overflow=20,
+		read_engine=True,
+	),
+}
+
+
+def _env_int(name: str) -> Optional[int]:
+	value = os.getenv(name)
+	return int(value) if value not in (None, "") else None
+
+
+def settings_from_env() -> EngineSettings:
+	profile = os.getenv("GLOSSARY_DB_PROFILE", "default")
+	if profile not in PROFILES:
+		raise ValueError(f"Unknown GLOSSARY_DB_PROFILE '{profile}', expected one of {sorted(PROFILES)}")
+	settings = PROFILES[profile]
+	overrides = {
+		"journal_mode": os.getenv("GLOSSARY_SQLITE_JOURNAL_MODE") or None,
+		"synchronous": os.getenv("GLOSSARY_SQLITE_SYNCHRONOUS") or None,
+		"cache_size": _env_int("GLOSSARY_SQLITE_CACHE_SIZE"),
+		"mmap_size": _env_int("GLOSSARY_SQLITE_MMAP_SIZE"),
+		"busy_timeout": _env_int("GLOSSARY_SQLITE_BUSY_TIMEOUT"),
+		"pool_size": _env_int("GLOSSARY_DB_POOL_SIZE"),
+		"max_overflow": _env_int("GLOSSARY_DB_MAX_OVERFLOW"),
+	}
+	if os.getenv("GLOSSARY_DB_READ_ENGINE"):
+		overrides["read_engine"] = os.getenv("GLOSSARY_DB_READ_ENGINE") not in ("0", "false", "no")
+	return replace(settings, **{key: value for key, value in overrides.items() if value is not None})
+
+
+def _pragmas(settings: EngineSettings, read_only: bool) -> list[str]:
+	pragmas = []
+	if settings.journal_mode:
+		pragmas.append(f"PRAGMA journal_mode={settings.journal_mode}")
+	if settings.synchronous:
+		pragmas.append(f"PRAGMA synchronous={settings.synchronous}")
+	if settings.cache_size is not None:
+		pragmas.append(f"PRAGMA cache_size={settings.cache_size}")
+	if settings.mmap_size is not None:
+		pragmas.append(f"PRAGMA mmap_size={settings.mmap_size}")
+	if settings.busy_timeout is not None:
+		pragmas.append(f"PRAGMA busy_timeout={settings.busy_timeout}")
+	if read_only:
+		pragmas.append("PRAGMA query_only=ON")
+	return pragmas
+
+
+def _pool_kwargs(url: str, settings: EngineSettings) -> dict:
+	# In-memory SQLite живёт в одном соединении, пул для него не настраивается
+	if ":memory:" in url or url.rstrip("/").endswith(":"):
+		return {}
+	return {"pool_size": settings.pool_size, "max_overflow": settings.max_overflow}
+
+
+def _install_pragmas(sync_engine: Engine, pragmas: list[str]) -> None:
+	"""PRAGMA применяются к каждому новому соединению пула"""
+	if not pragmas:
+		return
 
-DATABASE_URL = "sqlite:///./glossary.db"
-engine = create_engine(DATABASE_URL, echo=False)
+	@event.listens_for(sync_engine, "connect")
+	def _apply_pragmas(dbapi_connection, _connection_record):
+		cursor = dbapi_connection.cursor()
+		for pragma in pragmas:
+			cursor.execute(pragma)
+		cursor.close()
+
+
+def build_engine(url: str, settings: EngineSettings, read_only: bool = False) -> Engine:
+	new_engine = create_engine(url, echo=False, **_pool_kwargs(url, settings))
+	_install_pragmas(new_engine, _pragmas(settings, read_only))
+	install_query_hooks(new_engine)
+	return new_engine
+
+
+def async_url(url: str) -> str:
+	"""sqlite:///... -> sqlite+aiosqlite:///..."""
+	scheme, rest = url.split("://", 1)
+	if scheme == "sqlite":
+		scheme = "sqlite+aiosqlite"
+	return f"{scheme}://{rest}"
+
+
+def build_async_engine(url: str, settings: EngineSettings, read_only: bool = False) -> AsyncEngine:
+	new_engine = create_async_engine(async_url(url), echo=False, **_pool_kwargs(url, settings))
+	_install_pragmas(new_engine.sync_engine, _pragmas(settings, read_only))
+	install_query_hooks(new_engine.sync_engine)
+	return new_engine
+
+
+engine_settings = settings_from_env()
+engine = build_engine(DATABASE_URL, engine_settings)
+# Отдельный пул только для чтения, чтобы читатели не ждали соединений, занятых писателями
+read_engine = build_engine(DATABASE_URL, engine_settings, read_only=True) if engine_settings.read_engine else engine
+async_engine = build_async_engine(DATABASE_URL, engine_settings)
+async_read_engine = (
+	build_async_engine(DATABASE_URL, engine_settings, read_only=True) if engine_settings.read_engine else async_engine
+)
 
 
 def init_db() -> None:
 	SQLModel.metadata.create_all(engine)
+	init_changelog(engine)
+	init_relation_indexes(engine)
+	init_search(engine)
 
 
 def get_session() -> Generator[Session, None, None]:
 	with Session(engine) as session:
 		yield session
+
+
+def get_read_session() -> Generator[Session, None, None]:
+	with Session(read_engine) as session:
+		yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+	async with AsyncSession(async_engine, expire_on_commit=False) as session:
+		yield session
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+	async with AsyncSession(async_read_engine) as session:
+		yield session
@@ -0,0 +1,299 @@
+"""
+Журнал и уведомления об изменениях терминов и связей
+
+Изменения ORM-объектов собираются по событиям сессии; операции, выполняемые Core-запросами
+в обход ORM (пакетное удаление), регистрируют изменения через record_* явно. Каждое изменение
+записывается в таблицу changelog в той же транзакции, что и сами данные, - её автоинкрементный
+ключ служит версией глоссария, а в data сохраняются ключевые слова термина или концы связи.
+
+Подписчики (индексы и кэши в памяти процесса) получают изменения строго по порядку версий
+журнала. Изменения своей транзакции процесс применяет сразу после commit из session.info, без
+обращения к БД, если перед ними в журнале нет неприменённых версий. Изменения других процессов
+(воркеров REST и gRPC) обнаруживаются по PRAGMA data_version перед обработкой запроса и
+дочитываются из changelog через отдельное соединение, а не через пулы запросов. Так все воркеры
+видят одну и ту же последовательность изменений и запись в одном воркере не отдаётся устаревшей
+из другого.
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import event, func, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlmodel import Session as SQLModelSession
+
+from .models import ChangeLog, Term, TermRelation
+
+logger = logging.getLogger(__name__)
+
+# (id, source_id, target_id, relation_type)
+RelationKey = tuple[int, int, int, str]
+
+
+@dataclass
+class ChangeSet:
+	terms_added: dict[int, str] = field(default_factory=dict)  # id -> keyword
+	terms_updated: dict[int, tuple[str, str]] = field(default_factory=dict)  # id -> (old keyword, new keyword)
+	terms_deleted: dict[int, str] = field(default_factory=dict)  # id -> keyword
+	relations_added: list[RelationKey] = field(default_factory=list)
+	relations_deleted: list[RelationKey] = field(default_factory=list)
+	version: Optional[int] = None  # версия глоссария после транзакции
+
+	def __bool__(self) -> bool:
+		return bool(
+			self.terms_added or self.terms_updated or self.terms_deleted
+			or self.relations_added or self.relations_deleted
+		)
+
+
+Listener = Callable[[ChangeSet], None]
+# Полная пересборка состояния по БД, когда часть журнала уже удалена
+ResetListener = Callable[[SQLModelSession], None]
+_listeners: list[Listener] = []
+_reset_listeners: list[ResetListener] = []
+
+
+def subscribe(listener: Listener) -> Listener:
+	_listeners.append(listener)
+	return listener
+
+
+def subscribe_reset(listener: ResetListener) -> ResetListener:
+	_reset_listeners.append(listener)
+	return listener
+
+
+def init_changelog(engine: Engine) -> None:
+	"""Добавляет колонку data в changelog, созданный до её появления"""
+	with engine.begin() as connection:
+		columns = {row[1] for row in connection.execute(text("PRAGMA table_info(changelog)"))}
+		if "data" not in columns:
+			connection.execute(text("ALTER TABLE changelog ADD COLUMN data VARCHAR"))
+
+
+def _term_row(op: str, term_id: int, keyword: str, old_keyword: Optional[str] = None) -> dict:
+	data = {"keyword": keyword} if old_keyword is None else {"keyword": keyword, "old": old_keyword}
+	return {"entity": "term", "entity_id": term_id, "op": op, "data": json.dumps(data, ensure_ascii=False)}
+
+
+def _relation_row(op: str, relation: RelationKey) -> dict:
+	relation_id, source, target, relation_type = relation
+	data = {"source": source, "target": target, "type": relation_type}
+	return {"entity": "relation", "entity_id": relation_id, "op": op, "data": json.dumps(data, ensure_ascii=False)}
+
+
+def _relation_key(relation: TermRelation) -> RelationKey:
+	return relation.id, relation.source_id, relation.target_id, relation.relation_type
+
+
+def _write_changelog(session: Session, rows: list[dict]) -> None:
+	if not rows:
+		return
+	connection = session.connection()
+	connection.execute(insert(ChangeLog), rows)
+	# Запись в SQLite сериализована, поэтому версии транзакции идут подряд и max(version) - последняя из них
+	last = connection.execute(select(func.max(ChangeLog.version))).scalar()
+	session.info.setdefault("glossary_first_version", last - len(rows) + 1)
+	session.info.setdefault("glossary_changes", []).extend(
+		(row["entity"], row["entity_id"], row["op"], row["data"]) for row in rows
+	)
+
+
+def record_terms_added(session: Session, terms: dict[int, str]) -> None:
+	_write_changelog(session, [_term_row("insert", term_id, keyword) for term_id, keyword in terms.items()])
+
+
+def record_terms_deleted(session: Session, terms: dict[int, str]) -> None:
+	_write_changelog(session, [_term_row("delete", term_id, keyword) for term_id, keyword in terms.items()])
+
+
+def record_relations_added(session: Session, relations: list[RelationKey]) -> None:
+	_write_changelog(session, [_relation_row("insert", relation) for relation in relations])
+
+
+def record_relations_deleted(session: Session, relations: list[RelationKey]) -> None:
+	_write_changelog(session, [_relation_row("delete", relation) for relation in relations])
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, _flush_context) -> None:
+	rows = []
+	for obj in session.new:
+		if isinstance(obj, Term):
+			rows.append(_term_row("insert", obj.id, obj.keyword))
+		elif isinstance(obj, TermRelation):
+			rows.append(_relation_row("insert", _relation_key(obj)))
+	for obj in session.dirty:
+		if isinstance(obj, Term) and session.is_modified(obj):
+			history = inspect(obj).attrs.keyword.history
+			old_keyword = history.deleted[0] if history.deleted else obj.keyword
+			rows.append(_term_row("update", obj.id, obj.keyword, old_keyword))
+	for obj in session.deleted:
+		if isinstance(obj, Term):
+			rows.append(_term_row("delete", obj.id, obj.keyword))
+		elif isinstance(obj, TermRelation):
+			rows.append(_relation_row("delete", _relation_key(obj)))
+	_write_changelog(session, rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session: Session) -> None:
+	first_version = session.info.pop("glossary_first_version", None)
+	rows = session.info.pop("glossary_changes", [])
+	if first_version is None:
+		return
+	try:
+		change_feed.apply_committed(first_version, rows)
+	except Exception:
+		# Ошибка подписчика не должна превращать успешную запись в ошибку запроса
+		logger.exception("Change feed apply failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+	session.info.pop("glossary_first_version", None)
+	session.info.pop("glossary_changes", None)
+
+
+def _notify(listeners: Iterable[Callable[[Any], None]], argument: Any) -> None:
+	for listener in listeners:
+		try:
+			listener(argument)
+		except Exception:
+			# Ошибка индекса не должна мешать остальным подписчикам
+			logger.exception("Change listener %r failed", listener)
+
+
+def changesets(entries: Iterable[tuple[int, str, int, str, Optional[str]]]) -> Iterable[ChangeSet]:
+	"""ChangeSet-ы из строк журнала (version, entity, entity_id, op, data) по порядку версий
+
+	Подряд идущие записи объединяются, пока термин, ключевое слово, связь или ребро не
+	встречаются повторно: внутри ChangeSet порядок применения не определён, поэтому
+	зависимые изменения (удаление и повторное создание) попадают в разные ChangeSet.
+	"""
+	changes, seen = ChangeSet(), set()
+	for version, entity, entity_id, op, data in entries:
+		values = json.loads(data)
+		if entity == "term":
+			keys = {("term", entity_id), ("keyword", values["keyword"])}
+			if "old" in values:
+				keys.add(("keyword", values["old"]))
+		else:
+			keys = {("relation", entity_id), ("edge", values["source"], values["target"], values["type"])}
+		if not seen.isdisjoint(keys):
+			yield changes
+			changes, seen = ChangeSet(), set()
+		seen |= keys
+		changes.version = version
+		if entity == "term":
+			if op == "insert":
+				changes.terms_added[entity_id] = values["keyword"]
+			elif op == "update":
+				changes.terms_updated[entity_id] = (values["old"], values["keyword"])
+			else:
+				changes.terms_deleted[entity_id] = values["keyword"]
+		else:
+			relation = (entity_id, values["source"], values["target"], values["type"])
+			(changes.relations_added if op == "insert" else changes.relations_deleted).append(relation)
+	if changes.version is not None:
+		yield changes
+
+
+_CHANGELOG_AFTER = "SELECT version, entity, entity_id, op, data FROM changelog WHERE version > ? ORDER BY version"
+
+
+class ChangeFeed:
+	"""Применение журнала изменений к подписчикам процесса по порядку версий
+
+	Блокировка не реентерабельная и после commit берётся без ожидания: commit не ждёт (и не
+	блокирует цикл событий), пока poll дочитывает журнал, - его изменения применит следующий poll
+	"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._engine: Optional[Engine] = None
+		self._applied: Optional[int] = None  # последняя применённая версия
+		self._probe = None  # отдельное соединение для PRAGMA data_version и чтения журнала
+		self._data_version: Optional[int] = None
+
+	@property
+	def applied(self) -> Optional[int]:
+		return self._applied
+
+	def start(self, engine: Engine) -> None:
+		"""Начать следить за изменениями других процессов (вызывается до сборки индексов)"""
+		with self._lock:
+			self._engine = engine
+			if self._probe is None:
+				raw = engine.raw_connection()
+				self._probe = raw.dbapi_connection
+				raw.detach()
+				# data_version читается до позиции в журнале: более поздний commit её изменит
+				self._data_version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+			if self._applied is None:
+				self._applied = self._probe.execute("SELECT coalesce(max(version), 0) FROM changelog").fetchone()[0]
+
+	def stop(self) -> None:
+		with self._lock:
+			if self._probe is not None:
+				self._probe.close()
+			self._probe = None
+			self._data_version = None
+
+	def poll(self) -> None:
+		"""Применить изменения из журнала, если БД менялась после прошлой проверки
+
+		PRAGMA data_version меняется при commit любого другого соединения и не требует чтения данных,
+		поэтому проверка выполняется перед каждым запросом (в пуле потоков, не в цикле событий)
+		"""
+		if self._probe is None:
+			return
+		with self._lock:
+			if self._probe is None:
+				return
+			data_version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+			if data_version == self._data_version:
+				return
+			self._data_version = data_version
+			entries = self._probe.execute(_CHANGELOG_AFTER, (self._applied,)).fetchall()
+			if not entries:
+				return
+			# Версии идут без пропусков; пропуск означает, что журнал уже очищен (prune_changelog)
+			if entries[0][0] != self._applied + 1 or any(entry[4] is None for entry in entries):
+				self._reset()
+				return
+			self._apply(entries)
+
+	def apply_committed(self, first_version: int, rows: list[tuple[str, int, str, Optional[str]]]) -> None:
+		"""Изменения только что закоммиченной транзакции процесса (entity, entity_id, op, data), без чтения БД
+
+		Если перед ними есть неприменённые версии или журнал сейчас дочитывается, изменения
+		пропускаются: их применит poll перед следующим запросом (data_version уже изменилась)
+		"""
+		if not self._lock.acquire(blocking=False):
+			return
+		try:
+			if self._applied is None:
+				self._applied = first_version - 1
+			if self._applied != first_version - 1:
+				return
+			self._apply([(first_version + offset, *row) for offset, row in enumerate(rows)])
+		finally:
+			self._lock.release()
+
+	def _apply(self, entries: list) -> None:
+		for changes in changesets(entries):
+			_notify(_listeners, changes)
+			self._applied = changes.version
+
+	def _reset(self) -> None:
+		logger.warning("Change log after version %s is not available, rebuilding in-memory state", self._applied)
+		with SQLModelSession(self._engine) as session:
+			self._applied = session.execute(select(func.coalesce(func.max(ChangeLog.version), 0))).scalar()
+			_notify(_reset_listeners, session)
+
+
+change_feed = ChangeFeed()
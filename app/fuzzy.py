@@ -0,0 +1,174 @@
+"""
+Нечёткий поиск ключевых слов по триграммам
+
+Инвертированный индекс триграмма -> id терминов в памяти процесса. Кандидаты берутся только
+из списков триграмм запроса, сходство - доля общих триграмм (коэффициент Жаккара, как в pg_trgm).
+Индекс собирается из таблицы term при старте и обновляется по событиям изменения терминов.
+"""
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Iterable
+
+from sqlmodel import Session, select
+
+from .events import ChangeSet, subscribe, subscribe_reset
+from .models import Term
+
+DEFAULT_FUZZY_LIMIT = 10
+MAX_FUZZY_LIMIT = 50
+DEFAULT_SIMILARITY = 0.3
+# Сколько вариантов «возможно, вы имели в виду» отдаётся вместе с 404
+DID_YOU_MEAN_LIMIT = 3
+
+_SEPARATORS_RE = re.compile(r"[\W_]+", re.UNICODE)
+_EMPTY: frozenset[int] = frozenset()
+
+
+def trigrams(text: str) -> frozenset[str]:
+	"""Триграммы слов строки без учёта регистра; слова дополняются пробелами, как в pg_trgm"""
+	result = set()
+	for word in _SEPARATORS_RE.split(text.casefold()):
+		if not word:
+			continue
+		padded = f"  {word} "
+		result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+	return frozenset(result)
+
+
+class TrigramIndex:
+	def __init__(self) -> None:
+		self._lock = threading.RLock()
+		self._build_lock = threading.Lock()
+		self._built = False
+		self._building = False
+		self._queued: list[ChangeSet] = []
+		self._postings: dict[str, set[int]] = {}
+		self._keywords: dict[int, str] = {}
+		self._sizes: dict[int, int] = {}
+
+	@property
+	def built(self) -> bool:
+		return self._built
+
+	def __len__(self) -> int:
+		return len(self._keywords)
+
+	def build(self, session: Session) -> None:
+		"""Полная сборка индекса из таблицы терминов"""
+		with self._lock:
+			self._building = True
+			self._queued = []
+		try:
+			postings: dict[str, set[int]] = {}
+			keywords: dict[int, str] = {}
+			sizes: dict[int, int] = {}
+			rows = session.exec(select(Term.id, Term.keyword).execution_options(yield_per=10000))
+			for term_id, keyword in rows:
+				grams = trigrams(keyword)
+				keywords[term_id] = keyword
+				sizes[term_id] = len(grams)
+				for gram in grams:
+					postings.setdefault(gram, set()).add(term_id)
+		except Exception:
+			with self._lock:
+				self._building = False
+			raise
+
+		with self._lock:
+			self._postings, self._keywords, self._sizes = postings, keywords, sizes
+			self._built = True
+			self._building = False
+			for changes in self._queued:
+				self._apply(changes)
+			self._queued = []
+
+	def ensure_built(self, session: Session) -> None:
+		if self._built:
+			return
+		with self._build_lock:
+			if not self._built:
+				self.build(session)
+
+	def rebuild(self, session: Session) -> None:
+		"""Пересборка после пропущенных изменений; несобранный индекс соберётся при первом запросе"""
+		if self._built:
+			with self._build_lock:
+				self.build(session)
+
+	def search(
+		self,
+		query: str,
+		limit: int = DEFAULT_FUZZY_LIMIT,
+		threshold: float = DEFAULT_SIMILARITY,
+	) -> list[tuple[str, float]]:
+		"""Не более limit пар (keyword, сходство) со сходством не ниже threshold, по убыванию сходства"""
+		grams = trigrams(query)
+		if not grams:
+			return []
+		# Сходство >= threshold требует не менее min_common общих триграмм, поэтому любой подходящий
+		# термин встречается в одном из len(grams) - min_common + 1 самых коротких списков.
+		# Кандидаты берутся только из них, длинные списки частых триграмм проверяются по членству
+		min_common = max(1, math.ceil(threshold * len(grams) - 1e-9))
+		with self._lock:
+			postings = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+			probe = len(postings) - min_common + 1
+			shared: Counter[int] = Counter()
+			for posting in postings[:probe]:
+				shared.update(posting)
+			for posting in postings[probe:]:
+				for term_id in shared:
+					if term_id in posting:
+						shared[term_id] += 1
+			scored = []
+			for term_id, common in shared.items():
+				similarity = common / (len(grams) + self._sizes[term_id] - common)
+				if similarity >= threshold:
+					scored.append((similarity, self._keywords[term_id]))
+		best = heapq.nsmallest(limit, scored, key=lambda item: (-item[0], item[1]))
+		return [(keyword, round(similarity, 4)) for similarity, keyword in best]
+
+	# --- инкрементальные обновления ---
+
+	def on_changes(self, changes: ChangeSet) -> None:
+		with self._lock:
+			if self._building:
+				self._queued.append(changes)
+			elif self._built:
+				self._apply(changes)
+
+	def _apply(self, changes: ChangeSet) -> None:
+		self.remove(changes.terms_deleted)
+		self.remove(changes.terms_updated)
+		self.add((term_id, new) for term_id, (_old, new) in changes.terms_updated.items())
+		self.add(changes.terms_added.items())
+
+	def add(self, terms: Iterable[tuple[int, str]]) -> None:
+		with self._lock:
+			for term_id, keyword in terms:
+				grams = trigrams(keyword)
+				self._keywords[term_id] = keyword
+				self._sizes[term_id] = len(grams)
+				for gram in grams:
+					self._postings.setdefault(gram, set()).add(term_id)
+
+	def remove(self, term_ids: Iterable[int]) -> None:
+		with self._lock:
+			for term_id in term_ids:
+				keyword = self._keywords.pop(term_id, None)
+				if keyword is None:
+					continue
+				del self._sizes[term_id]
+				for gram in trigrams(keyword):
+					posting = self._postings.get(gram)
+					if posting is not None:
+						posting.discard(term_id)
+						if not posting:
+							del self._postings[gram]
+
+
+trigram_index = TrigramIndex()
+subscribe(trigram_index.on_changes)
+subscribe_reset(trigram_index.rebuild)
@@ -0,0 +1,339 @@
+"""
+Индекс смежности семантического графа в памяти процесса
+
+Для каждого типа связи хранятся CSR-массивы исходящих и входящих рёбер (indptr/indices
+в array('q') с id терминов), поверх них - небольшой слой изменений после последней сборки.
+Слой сливается в CSR, когда становится большим относительно базы. Обход графа
+(окрестность, кратчайший путь) не обращается к SQLite.
+"""
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Iterable, Optional
+
+from sqlmodel import Session, select
+
+from .events import ChangeSet, subscribe, subscribe_reset
+from .models import TermRelation
+
+# Слой изменений сливается в CSR, когда превышает эту долю базы (но не раньше MIN_OVERLAY_COMPACT)
+OVERLAY_COMPACT_RATIO = 0.1
+MIN_OVERLAY_COMPACT = 1024
+
+Edge = tuple[int, int, str]  # (source_id, target_id, relation_type)
+
+
+class _CSR:
+	"""Сжатая строчная матрица смежности: соседи узла rows[id] - indices[indptr[i]:indptr[i + 1]] (отсортированы)"""
+
+	__slots__ = ("rows", "indptr", "indices")
+
+	def __init__(self, adjacency: dict[int, Iterable[int]]) -> None:
+		self.rows: dict[int, int] = {}
+		self.indptr = array("q", [0])
+		self.indices = array("q")
+		for row, node in enumerate(sorted(adjacency)):
+			self.rows[node] = row
+			self.indices.extend(sorted(adjacency[node]))
+			self.indptr.append(len(self.indices))
+
+	def neighbors(self, node: int) -> array:
+		row = self.rows.get(node)
+		if row is None:
+			return array("q")
+		return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+	def contains(self, source: int, target: int) -> bool:
+		row = self.rows.get(source)
+		if row is None:
+			return False
+		start, end = self.indptr[row], self.indptr[row + 1]
+		position = bisect_left(self.indices, target, start, end)
+		return position < end and self.indices[position] == target
+
+	def adjacency(self) -> dict[int, list[int]]:
+		return {node: list(self.neighbors(node)) for node in self.rows}
+
+	def __len__(self) -> int:
+		return len(self.indices)
+
+
+class GraphIndex:
+	def __init__(self) -> None:
+		self._lock = threading.RLock()
+		self._build_lock = threading.Lock()
+		self._built = False
+		self._building = False
+		self._queued: list[ChangeSet] = []
+		self._out: dict[str, _CSR] = {}
+		self._in: dict[str, _CSR] = {}
+		self._added: set[Edge] = set()
+		self._removed: set[Edge] = set()
+		self._added_out: dict[str, dict[int, set[int]]] = defaultdict(lambda: defaultdict(set))
+		self._added_in: dict[str, dict[int, set[int]]] = defaultdict(lambda: defaultdict(set))
+
+	@property
+	def built(self) -> bool:
+		return self._built
+
+	def build(self, session: Session) -> None:
+		"""Полная сборка индекса из таблицы связей"""
+		with self._lock:
+			self._building = True
+			self._queued = []
+		try:
+			out_adj: dict[str, dict[int, list[int]]] = defaultdict(lambda: defaultdict(list))
+			in_adj: dict[str, dict[int, list[int]]] = defaultdict(lambda: defaultdict(list))
+			rows = session.exec(
+				select(TermRelation.source_id, TermRelation.target_id, TermRelation.relation_type)
+				.execution_options(yield_per=10000)
+			)
+			for source, target, relation_type in rows:
+				out_adj[relation_type][source].append(target)
+				in_adj[relation_type][target].append(source)
+			out_csr = {relation_type: _CSR(adj) for relation_type, adj in out_adj.items()}
+			in_csr = {relation_type: _CSR(adj) for relation_type, adj in in_adj.items()}
+		except Exception:
+			with self._lock:
+				self._building = False
+			raise
+
+		with self._lock:
+			self._out, self._in = out_csr, in_csr
+			self._reset_overlay()
+			self._built = True
+			self._building = False
+			# Изменения, закоммиченные во время чтения, применяем поверх (операции идемпотентны)
+			for changes in self._queued:
+				self._apply(changes)
+			self._queued = []
+
+	def ensure_built(self, session: Session) -> None:
+		if self._built:
+			return
+		with self._build_lock:
+			if not self._built:
+				self.build(session)
+
+	def rebuild(self, session: Session) -> None:
+		"""Пересборка после пропущенных изменений; несобранный индекс соберётся при первом запросе"""
+		if self._built:
+			with self._build_lock:
+				self.build(session)
+
+	def _reset_overlay(self) -> None:
+		self._added = set()
+		self._removed = set()
+		self._added_out = defaultdict(lambda: defaultdict(set))
+		self._added_in = defaultdict(lambda: defaultdict(set))
+
+	# --- инкрементальные обновления ---
+
+	def on_changes(self, changes: ChangeSet) -> None:
+		with self._lock:
+			if self._building:
+				self._queued.append(changes)
+			elif self._built:
+				self._apply(changes)
+
+	def _in_base(self, edge: Edge) -> bool:
+		source, target, relation_type = edge
+		csr = self._out.get(relation_type)
+		return csr is not None and csr.contains(source, target)
+
+	def add_edge(self, source: int, target: int, relation_type: str) -> None:
+		edge = (source, target, relation_type)
+		with self._lock:
+			self._removed.discard(edge)
+			if not self._in_base(edge) and edge not in self._added:
+				self._added.add(edge)
+				self._added_out[relation_type][source].add(target)
+				self._added_in[relation_type][target].add(source)
+			self._maybe_compact()
+
+	def remove_edge(self, source: int, target: int, relation_type: str) -> None:
+		edge = (source, target, relation_type)
+		with self._lock:
+			if edge in self._added:
+				self._added.discard(edge)
+				self._added_out[relation_type][source].discard(target)
+				self._added_in[relation_type][target].discard(source)
+			elif self._in_base(edge):
+				self._removed.add(edge)
+			self._maybe_compact()
+
+	def remove_node(self, node: int) -> None:
+		with self._lock:
+			for relation_type in self.relation_types():
+				for target in self._neighbors(node, relation_type, outgoing=True):
+					self.remove_edge(node, target, relation_type)
+				for source in self._neighbors(node, relation_type, outgoing=False):
+					self.remove_edge(source, node, relation_type)
+
+	def _apply(self, changes: ChangeSet) -> None:
+		for _, source, target, relation_type in changes.relations_added:
+			self.add_edge(source, target, relation_type)
+		for _, source, target, relation_type in changes.relations_deleted:
+			self.remove_edge(source, target, relation_type)
+		for node in changes.terms_deleted:
+			self.remove_node(node)
+
+	def _maybe_compact(self) -> None:
+		overlay = len(self._added) + len(self._removed)
+		base = sum(len(csr) for csr in self._out.values())
+		if overlay > max(MIN_OVERLAY_COMPACT, base * OVERLAY_COMPACT_RATIO):
+			self.compact()
+
+	def compact(self) -> None:
+		"""Слияние слоя изменений в CSR без обращения к БД"""
+		with self._lock:
+			out_adj: dict[str, dict[int, set[int]]] = defaultdict(lambda: defaultdict(set))
+			for relation_type, csr in self._out.items():
+				for source, targets in csr.adjacency().items():
+					out_adj[relation_type][source].update(targets)
+			for source, target, relation_type in self._added:
+				out_adj[relation_type][source].add(target)
+			for source, target, relation_type in self._removed:
+				out_adj[relation_type][source].discard(target)
+
+			in_adj: dict[str, dict[int, set[int]]] = defaultdict(lambda: defaultdict(set))
+			for relation_type, adj in out_adj.items():
+				for source, targets in adj.items():
+					for target in targets:
+						in_adj[relation_type][target].add(source)
+
+			self._out = {t: _CSR({n: s for n, s in adj.items() if s}) for t, adj in out_adj.items()}
+			self._in = {t: _CSR({n: s for n, s in adj.items() if s}) for t, adj in in_adj.items()}
+			self._reset_overlay()
+
+	# --- чтение ---
+
+	def relation_types(self) -> list[str]:
+		with self._lock:
+			return sorted(set(self._out) | set(self._added_out))
+
+	def _neighbors(self, node: int, relation_type: str, outgoing: bool) -> list[int]:
+		base = (self._out if outgoing else self._in).get(relation_type)
+		result = list(base.neighbors(node)) if base is not None else []
+		if self._removed:
+			if outgoing:
+				result = [t for t in result if (node, t, relation_type) not in self._removed]
+			else:
+				result = [s for s in result if (s, node, relation_type) not in self._removed]
+		added = (self._added_out if outgoing else self._added_in).get(relation_type)
+		if added and node in added:
+			result.extend(added[node])
+		return result
+
+	def _expand(self, node: int, types: list[str], direction: str) -> Iterable[tuple[int, Edge]]:
+		"""Соседи узла вместе с ребром, по которому в них попадаем"""
+		for relation_type in types:
+			if direction in ("out", "both"):
+				for target in self._neighbors(node, relation_type, outgoing=True):
+					yield target, (node, target, relation_type)
+			if direction in ("in", "both"):
+				for source in self._neighbors(node, relation_type, outgoing=False):
+					yield source, (source, node, relation_type)
+
+	def _types(self, types: Optional[Iterable[str]]) -> list[str]:
+		known = self.relation_types()
+		if not types:
+			return known
+		known_set = set(known)
+		return [t for t in types if t in known_set]
+
+	def neighborhood(
+		self,
+		node: int,
+		depth: int,
+		types: Optional[Iterable[str]] = None,
+		direction: str = "both",
+		limit: int = 1000,
+	) -> tuple[dict[int, int], list[Edge], bool]:
+		"""BFS на depth шагов: {id: расстояние}, рёбра между найденными узлами и флаг усечения по limit"""
+		with self._lock:
+			relation_types = self._types(types)
+			distances = {node: 0}
+			edges: list[Edge] = []
+			seen_edges: set[Edge] = set()
+			truncated = False
+			frontier = [node]
+			for level in range(1, depth + 1):
+				next_frontier = []
+				for current in frontier:
+					for neighbor, edge in self._expand(current, relation_types, direction):
+						if neighbor not in distances:
+							if len(distances) >= limit:
+								truncated = True
+								continue
+							distances[neighbor] = level
+							next_frontier.append(neighbor)
+						if edge not in seen_edges:
+							seen_edges.add(edge)
+							edges.append(edge)
+				frontier = next_frontier
+				if not frontier:
+					break
+			return distances, edges, truncated
+
+	def shortest_path(
+		self,
+		start: int,
+		goal: int,
+		types: Optional[Iterable[str]] = None,
+		direction: str = "both",
+		max_depth: int = 10,
+	) -> Optional[tuple[list[int], list[Edge]]]:
+		"""Двунаправленный BFS: узлы и рёбра кратчайшего пути или None"""
+		if start == goal:
+			return [start], []
+		backward_direction = {"out": "in", "in": "out", "both": "both"}[direction]
+		with self._lock:
+			relation_types = self._types(types)
+			parents: dict[int, Optional[tuple[int, Edge]]] = {start: None}
+			children: dict[int, Optional[tuple[int, Edge]]] = {goal: None}
+			forward, backward = deque([start]), deque([goal])
+			for _ in range(max_depth):
+				if not forward or not backward:
+					return None
+				# Расширяем меньшую из двух границ
+				if len(forward) <= len(backward):
+					meeting = self._bfs_level(forward, parents, children, relation_types, direction)
+				else:
+					meeting = self._bfs_level(backward, children, parents, relation_types, backward_direction)
+				if meeting is not None:
+					return self._join_path(meeting, parents, children)
+			return None
+
+	def _bfs_level(self, queue: deque, visited: dict, other: dict, types: list[str], direction: str) -> Optional[int]:
+		for _ in range(len(queue)):
+			current = queue.popleft()
+			for neighbor, edge in self._expand(current, types, direction):
+				if neighbor in visited:
+					continue
+				visited[neighbor] = (current, edge)
+				if neighbor in other:
+					return neighbor
+				queue.append(neighbor)
+		return None
+
+	@staticmethod
+	def _join_path(meeting: int, parents: dict, children: dict) -> tuple[list[int], list[Edge]]:
+		nodes, edges = [meeting], []
+		node = meeting
+		while parents[node] is not None:
+			node, edge = parents[node]
+			nodes.insert(0, node)
+			edges.insert(0, edge)
+		node = meeting
+		while children[node] is not None:
+			node, edge = children[node]
+			nodes.append(node)
+			edges.append(edge)
+		return nodes, edges
+
+
+graph_index = GraphIndex()
+subscribe(graph_index.on_changes)
+subscribe_reset(graph_index.rebuild)
@@ -0,0 +1,414 @@
+"""
+Асинхронный gRPC сервер глоссария на grpc.aio с асинхронным доступом к БД
+"""
+import asyncio
+import os
+import time
+from typing import AsyncIterator
+
+import grpc
+from grpc.aio import ServicerContext
+from pydantic import ValidationError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .batch import batch_get_terms, bulk_create_terms, bulk_delete_terms, error_detail
+from .cache import term_cache
+from .db import async_engine, async_read_engine, init_db, read_engine
+from . import metrics
+from .events import change_feed
+from .grpc_server import (
+    GRPC_SERVER_OPTIONS,
+    RELATION_ERRORS,
+    _bulk_response,
+    _graph_chunks,
+    _not_found_details,
+    _relation_create,
+    _relation_message,
+    _relations_response,
+    _search_args,
+    _search_response,
+    _stream_chunk_size,
+    _suggest_response,
+    _term_message,
+    glossary_pb2,
+    glossary_pb2_grpc,
+    start_metrics_server,
+)
+from .models import Term, TermRelation
+from .pagination import InvalidCursor, clamp_limit, count_terms, decode_cursor, encode_cursor, fetch_terms_page
+from .query_stats import QueryStats, trailing_metadata, track_queries
+from .relations import fetch_relations_page, insert_relation
+from .schemas import MAX_BATCH_SIZE, TermRead
+from .search import search_terms
+from .fuzzy import trigram_index
+from .suggest import keyword_index
+from .versioning import changelog_pruner, read_version
+
+# Максимум одновременно обрабатываемых RPC; остальные получают RESOURCE_EXHAUSTED
+GRPC_MAX_CONCURRENT_RPCS = int(os.getenv("GRPC_MAX_CONCURRENT_RPCS", "1000"))
+
+
+async def _check_batch_size(size: int, context: ServicerContext) -> None:
+    if size > MAX_BATCH_SIZE:
+        await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Batch size exceeds {MAX_BATCH_SIZE}")
+
+
+class AsyncGlossaryServicer(glossary_pb2_grpc.GlossaryServiceServicer if glossary_pb2_grpc else object):
+    """Реализация gRPC сервиса поверх grpc.aio и AsyncSession"""
+
+    async def ListTerms(self, request, context: ServicerContext):
+        """Получение страницы терминов"""
+        limit = clamp_limit(request.limit)
+        async with AsyncSession(async_read_engine) as session:
+            if request.offset > 0 and not request.after:
+                # Устаревший режим OFFSET, оставлен для совместимости со старыми клиентами
+                terms = (await session.exec(
+                    select(Term).order_by(Term.keyword).offset(request.offset).limit(limit)
+                )).all()
+                next_cursor = ""
+            else:
+                try:
+                    terms, next_cursor = await session.run_sync(fetch_terms_page, request.after or None, limit)
+                except InvalidCursor as exc:
+                    await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+
+            total = 0 if request.skip_total else await session.run_sync(count_terms)
+
+            return glossary_pb2.ListTermsResponse(
+                terms=[_term_message(term) for term in terms],
+                total=total,
+                next_cursor=next_cursor or ""
+            )
+
+    async def StreamTerms(self, request, context: ServicerContext) -> AsyncIterator["glossary_pb2.TermChunk"]:
+        """Потоковая выгрузка всех терминов чанками; отмена вызова прерывает корутину через CancelledError"""
+        chunk_size = _stream_chunk_size(request)
+
+        query = select(Term).order_by(Term.keyword)
+        if request.after:
+            try:
+                query = query.where(Term.keyword > decode_cursor(request.after))
+            except InvalidCursor as exc:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+
+        async with AsyncSession(async_read_engine) as session:
+            result = await session.stream_scalars(query.execution_options(yield_per=chunk_size))
+            async for terms in result.partitions():
+                yield glossary_pb2.TermChunk(
+                    terms=[_term_message(term) for term in terms],
+                    next_cursor=encode_cursor(terms[-1].keyword)
+                )
+
+    async def GetTerm(self, request, context: ServicerContext):
+        """Получение термина по ключевому слову через общий кэш"""
+        term = term_cache.get(request.keyword)
+        if term is None:
+            generation = term_cache.generation
+            async with AsyncSession(async_read_engine) as session:
+                db_term = (await session.exec(
+                    select(Term).where(Term.keyword == request.keyword)
+                )).first()
+
+                if not db_term:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details(_not_found_details(request.keyword))
+                    return glossary_pb2.GetTermResponse()
+
+                term = TermRead.model_validate(db_term)
+                term_cache.set(request.keyword, term, generation)
+
+        return glossary_pb2.GetTermResponse(term=_term_message(term))
+
+    async def CreateTerm(self, request, context: ServicerContext):
+        """Создание нового термина"""
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            existing = (await session.exec(
+                select(Term).where(Term.keyword == request.keyword)
+            )).first()
+
+            if existing:
+                context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                context.set_details(f"Term '{request.keyword}' already exists")
+                return glossary_pb2.CreateTermResponse()
+
+            term = Term(
+                keyword=request.keyword,
+                description=request.description,
+                source=request.source if request.source else None
+            )
+            session.add(term)
+            await session.commit()
+
+            return glossary_pb2.CreateTermResponse(term=_term_message(term))
+
+    async def UpdateTerm(self, request, context: ServicerContext):
+        """Обновление существующего термина"""
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            term = (await session.exec(
+                select(Term).where(Term.keyword == request.keyword)
+            )).first()
+
+            if not term:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"Term '{request.keyword}' not found")
+                return glossary_pb2.UpdateTermResponse()
+
+            if request.new_keyword:
+                conflict = (await session.exec(
+                    select(Term).where(
+                        Term.keyword == request.new_keyword,
+                        Term.id != term.id
+                    )
+                )).first()
+                if conflict:
+                    context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                    context.set_details(f"Keyword '{request.new_keyword}' already in use")
+                    return glossary_pb2.UpdateTermResponse()
+                term.keyword = request.new_keyword
+
+            if request.description:
+                term.description = request.description
+
+            if request.source:
+                term.source = request.source
+
+            session.add(term)
+            await session.commit()
+
+            return glossary_pb2.UpdateTermResponse(term=_term_message(term))
+
+    async def DeleteTerm(self, request, context: ServicerContext):
+        """Удаление термина"""
+        async with AsyncSession(async_engine) as session:
+            term = (await session.exec(
+                select(Term).where(Term.keyword == request.keyword)
+            )).first()
+
+            if not term:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"Term '{request.keyword}' not found")
+                return glossary_pb2.DeleteTermResponse(success=False, message="Term not found")
+
+            await session.delete(term)
+            await session.commit()
+
+            return glossary_pb2.DeleteTermResponse(
+                success=True,
+                message=f"Term '{request.keyword}' deleted successfully"
+            )
+
+    async def BatchGetTerms(self, request, context: ServicerContext):
+        """Получение нескольких терминов одним IN-запросом"""
+        await _check_batch_size(len(request.keywords), context)
+        async with AsyncSession(async_read_engine) as session:
+            terms, missing = await session.run_sync(batch_get_terms, list(request.keywords))
+        return glossary_pb2.BatchGetTermsResponse(
+            terms=[_term_message(term) for term in terms],
+            missing=missing
+        )
+
+    async def BulkCreateTerms(self, request, context: ServicerContext):
+        """Пакетное создание терминов в одной транзакции"""
+        await _check_batch_size(len(request.terms), context)
+        items = [
+            {
+                "keyword": item.keyword,
+                "description": item.description,
+                "source": item.source or None
+            }
+            for item in request.terms
+        ]
+        async with AsyncSession(async_engine) as session:
+            return _bulk_response(await session.run_sync(bulk_create_terms, items))
+
+    async def BulkDeleteTerms(self, request, context: ServicerContext):
+        """Пакетное удаление терминов в одной транзакции"""
+        await _check_batch_size(len(request.keywords), context)
+        async with AsyncSession(async_engine) as session:
+            return _bulk_response(await session.run_sync(bulk_delete_terms, list(request.keywords)))
+
+    async def SearchTerms(self, request, context: ServicerContext):
+        """Полнотекстовый поиск (FTS5, BM25)"""
+        if not request.query.strip():
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Query must not be empty")
+        async with AsyncSession(async_read_engine) as session:
+            hits, next_offset = await session.run_sync(search_terms, *_search_args(request))
+        return _search_response(hits, next_offset)
+
+    async def SuggestTerms(self, request, context: ServicerContext):
+        """Автодополнение ключевых слов по префиксу"""
+        if not request.prefix:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Prefix must not be empty")
+        if not keyword_index.built:
+            async with AsyncSession(async_read_engine) as session:
+                await session.run_sync(keyword_index.ensure_built)
+        return _suggest_response(request)
+
+    async def CreateRelation(self, request, context: ServicerContext):
+        """Создание связи: один INSERT ... ON CONFLICT DO NOTHING, повтор отклоняется уникальным индексом"""
+        try:
+            data = _relation_create(request)
+        except ValidationError as exc:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, error_detail(exc))
+        async with AsyncSession(async_engine) as session:
+            try:
+                relation = await session.run_sync(insert_relation, data)
+            except tuple(RELATION_ERRORS) as exc:
+                await context.abort(RELATION_ERRORS[type(exc)], str(exc))
+        return glossary_pb2.CreateRelationResponse(relation=_relation_message(relation))
+
+    async def ListRelations(self, request, context: ServicerContext):
+        """Страница связей (один JOIN-запрос)"""
+        async with AsyncSession(async_read_engine) as session:
+            try:
+                relations, next_cursor = await session.run_sync(
+                    fetch_relations_page, request.after or None, clamp_limit(request.limit),
+                    relation_types=list(request.relation_types)
+                )
+            except InvalidCursor as exc:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+        return _relations_response(relations, next_cursor)
+
+    async def GetTermRelations(self, request, context: ServicerContext):
+        """Исходящие и входящие связи термина"""
+        async with AsyncSession(async_read_engine) as session:
+            term_id = (await session.exec(select(Term.id).where(Term.keyword == request.keyword))).first()
+            if term_id is None:
+                await context.abort(grpc.StatusCode.NOT_FOUND, _not_found_details(request.keyword))
+            try:
+                relations, next_cursor = await session.run_sync(
+                    fetch_relations_page, request.after or None, clamp_limit(request.limit),
+                    term_id=term_id, relation_types=list(request.relation_types)
+                )
+            except InvalidCursor as exc:
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+        return _relations_response(relations, next_cursor)
+
+    async def DeleteRelation(self, request, context: ServicerContext):
+        """Удаление связи по id"""
+        async with AsyncSession(async_engine) as session:
+            relation = await session.get(TermRelation, request.id)
+            if not relation:
+                await context.abort(grpc.StatusCode.NOT_FOUND, f"Relation {request.id} not found")
+            await session.delete(relation)
+            await session.commit()
+        return glossary_pb2.DeleteRelationResponse(success=True, message=f"Relation {request.id} deleted successfully")
+
+    async def StreamGraph(self, request, context: ServicerContext) -> AsyncIterator["glossary_pb2.GraphChunk"]:
+        """Потоковая выгрузка графа чанками узлов, затем рёбер, со сжатием gzip (см. GlossaryServicer.StreamGraph)"""
+        chunk_size = _stream_chunk_size(request)
+        context.set_compression(grpc.Compression.Gzip)
+        async with AsyncSession(async_read_engine) as session:
+            version = await session.run_sync(read_version)
+            for query, build in _graph_chunks(version):
+                result = await session.stream(query.execution_options(yield_per=chunk_size))
+                async for rows in result.partitions():
+                    yield build(rows)
+
+
+class ChangeFeedInterceptor(grpc.aio.ServerInterceptor):
+    """Перед каждым RPC применяет изменения, закоммиченные другими процессами (в потоке, не блокируя цикл событий)"""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        await asyncio.to_thread(change_feed.poll)
+        return await continuation(handler_call_details)
+
+
+class MetricsInterceptor(grpc.aio.ServerInterceptor):
+    """Задержка, размер ответа, код завершения, SQL-запросы и число RPC в обработке по методам"""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method
+        if handler.unary_unary:
+            return handler._replace(unary_unary=_measure_unary(method, handler.unary_unary))
+        if handler.stream_unary:
+            return handler._replace(stream_unary=_measure_unary(method, handler.stream_unary))
+        if handler.unary_stream:
+            return handler._replace(unary_stream=_measure_stream(method, handler.unary_stream))
+        return handler._replace(stream_stream=_measure_stream(method, handler.stream_stream))
+
+
+def _measure_unary(method: str, behavior):
+    async def wrapper(request, context):
+        in_flight = metrics.grpc_in_flight.labels(method)
+        in_flight.inc()
+        queries = QueryStats(method)
+        started = time.perf_counter()
+        response, failed = None, True
+        try:
+            with track_queries(queries):
+                response = await behavior(request, context)
+            failed = False
+            return response
+        finally:
+            trailing_metadata(context, queries)
+            size = response.ByteSize() if response is not None else 0
+            metrics.record_rpc(method, metrics.rpc_code(context, failed), time.perf_counter() - started, size, queries.count)
+            in_flight.dec()
+    return wrapper
+
+
+def _measure_stream(method: str, behavior):
+    async def wrapper(request, context):
+        in_flight = metrics.grpc_in_flight.labels(method)
+        in_flight.inc()
+        queries = QueryStats(method)
+        started = time.perf_counter()
+        size, failed = 0, True
+        try:
+            responses = behavior(request, context)
+            while True:
+                with track_queries(queries):
+                    response = await anext(responses, None)
+                if response is None:
+                    break
+                size += response.ByteSize()
+                yield response
+            failed = False
+            trailing_metadata(context, queries)
+        finally:
+            metrics.record_rpc(method, metrics.rpc_code(context, failed), time.perf_counter() - started, size, queries.count)
+            in_flight.dec()
+    return wrapper
+
+
+async def serve_aio(port: int = 50051, max_concurrent_rpcs: int = GRPC_MAX_CONCURRENT_RPCS) -> None:
+    """Запуск asyncio gRPC сервера"""
+    init_db()
+    change_feed.start(read_engine)
+    async with AsyncSession(async_read_engine) as session:
+        await session.run_sync(keyword_index.build)
+        await session.run_sync(trigram_index.build)
+
+    server = grpc.aio.server(
+        interceptors=[MetricsInterceptor(), ChangeFeedInterceptor()],
+        options=GRPC_SERVER_OPTIONS,
+        maximum_concurrent_rpcs=max_concurrent_rpcs
+    )
+
+    if glossary_pb2_grpc:
+        glossary_pb2_grpc.add_GlossaryServiceServicer_to_server(
+            AsyncGlossaryServicer(), server
+        )
+
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    print(f"gRPC aio server started on port {port} (max concurrent RPCs: {max_concurrent_rpcs})")
+    start_metrics_server()
+    changelog_pruner.start()
+
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(0)
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve_aio())
+    except KeyboardInterrupt:
+        pass
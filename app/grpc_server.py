@@ -1,15 +1,39 @@
 """
 gRPC сервер для работы с глоссарием терминов
 """
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
 import grpc
 from concurrent import futures
+from pathlib import Path
 from typing import Iterator
 
+from pydantic import ValidationError
 from sqlmodel import Session, select
 from grpc import ServicerContext
 
-from .db import engine, init_db
-from .models import Term
+from .batch import batch_get_terms, bulk_create_terms, bulk_delete_terms, error_detail
+from .cache import term_cache
+from .db import engine, init_db, read_engine
+from .events import change_feed
+from .fuzzy import DID_YOU_MEAN_LIMIT, trigram_index
+from . import metrics
+from .models import Term, TermRelation
+from .pagination import InvalidCursor, clamp_limit, count_terms, decode_cursor, encode_cursor, fetch_terms_page
+from .query_stats import QueryStats, trailing_metadata, track_queries
+from .relations import RelationExists, SelfRelation, TermNotFound, fetch_relations_page, insert_relation
+from .schemas import MAX_BATCH_SIZE, BulkItemResult, TermRead, TermRelationCreate, TermSearchHit
+from .search import search_terms
+from .suggest import DEFAULT_SUGGEST_LIMIT, MAX_SUGGEST_LIMIT, keyword_index
+from .versioning import changelog_pruner, read_version
+
+# Сгенерированный glossary_pb2_grpc импортирует glossary_pb2 как модуль верхнего уровня
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "proto"))
 
 # Импортируем сгенерированные файлы из proto
 try:
@@ -19,59 +43,236 @@ except ImportError:
     glossary_pb2 = None
     glossary_pb2_grpc = None
 
+# Размер чанка StreamTerms по умолчанию и верхняя граница: 1000 терминов с описаниями
+# по 2 КБ укладываются в стандартный лимит сообщения gRPC (4 МБ)
+STREAM_CHUNK_SIZE = int(os.getenv("GRPC_STREAM_CHUNK_SIZE", "200"))
+MAX_STREAM_CHUNK_SIZE = 1000
+
+# Реализация сервера: threaded (ThreadPoolExecutor) или aio (grpc.aio, см. grpc_aio_server)
+GRPC_SERVER_MODE = os.getenv("GRPC_SERVER_MODE", "threaded")
+GRPC_MAX_WORKERS = int(os.getenv("GRPC_MAX_WORKERS", "10"))
+# Число процессов сервера на одном порту (SO_REUSEPORT, ядро распределяет соединения)
+GRPC_PROCESSES = int(os.getenv("GRPC_PROCESSES", "1"))
+# SO_REUSEPORT позволяет нескольким процессам слушать один порт
+GRPC_SERVER_OPTIONS = [("grpc.so_reuseport", 1)]
+# Порт HTTP /metrics рядом с gRPC сервером (0 - не запускать)
+GRPC_METRICS_PORT = int(os.getenv("GRPC_METRICS_PORT", "9464"))
+
+# StreamGraph: узлы, затем рёбра в порядке id; строки без ORM-объектов
+GRAPH_NODES_QUERY = select(Term.id, Term.keyword, Term.description, Term.source).order_by(Term.id)
+GRAPH_EDGES_QUERY = select(
+    TermRelation.id, TermRelation.source_id, TermRelation.target_id, TermRelation.relation_type, TermRelation.description
+).order_by(TermRelation.id)
+
+# Размер страницы SearchTerms по умолчанию и верхняя граница (как в GET /terms/-/search)
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+
+def _term_message(term) -> "glossary_pb2.Term":
+    return glossary_pb2.Term(
+        id=term.id,
+        keyword=term.keyword,
+        description=term.description,
+        source=term.source or ""
+    )
+
+
+def _bulk_response(results: list[BulkItemResult]) -> "glossary_pb2.BulkResponse":
+    return glossary_pb2.BulkResponse(results=[
+        glossary_pb2.BulkItemResult(
+            keyword=result.keyword or "",
+            status=glossary_pb2.BulkStatus.Value(result.status.upper()),
+            term=_term_message(result.term) if result.term else None,
+            detail=result.detail or ""
+        )
+        for result in results
+    ])
+
+
+def _search_args(request) -> tuple[str, int, int, bool]:
+    limit = request.limit if request.limit > 0 else SEARCH_PAGE_SIZE
+    return request.query, min(limit, MAX_SEARCH_PAGE_SIZE), max(request.offset, 0), not request.no_highlight
+
+
+def _search_response(hits: list[TermSearchHit], next_offset) -> "glossary_pb2.SearchTermsResponse":
+    return glossary_pb2.SearchTermsResponse(
+        hits=[
+            glossary_pb2.SearchHit(
+                term=_term_message(hit),
+                score=hit.score,
+                keyword_highlight=hit.keyword_highlight or "",
+                snippet=hit.snippet or ""
+            )
+            for hit in hits
+        ],
+        next_offset=next_offset or 0
+    )
+
+
+def _suggest_response(request) -> "glossary_pb2.SuggestTermsResponse":
+    limit = min(request.limit if request.limit > 0 else DEFAULT_SUGGEST_LIMIT, MAX_SUGGEST_LIMIT)
+    return glossary_pb2.SuggestTermsResponse(keywords=keyword_index.suggest(request.prefix, limit))
+
+
+def _stream_chunk_size(request) -> int:
+    chunk_size = request.chunk_size if request.chunk_size > 0 else STREAM_CHUNK_SIZE
+    return min(chunk_size, MAX_STREAM_CHUNK_SIZE)
+
+
+def _relation_message(relation) -> "glossary_pb2.Relation":
+    return glossary_pb2.Relation(
+        id=relation.id,
+        source_id=relation.source_id,
+        target_id=relation.target_id,
+        relation_type=relation.relation_type,
+        description=relation.description or "",
+        source_keyword=relation.source_keyword,
+        target_keyword=relation.target_keyword
+    )
+
+
+def _relations_response(relations, next_cursor) -> "glossary_pb2.ListRelationsResponse":
+    return glossary_pb2.ListRelationsResponse(
+        relations=[_relation_message(relation) for relation in relations],
+        next_cursor=next_cursor or ""
+    )
+
+
+def _relation_create(request) -> TermRelationCreate:
+    """TermRelationCreate из запроса; пустые поля - значения по умолчанию (ValidationError при ошибке)"""
+    data = {"source_keyword": request.source_keyword, "target_keyword": request.target_keyword}
+    if request.relation_type:
+        data["relation_type"] = request.relation_type
+    if request.description:
+        data["description"] = request.description
+    return TermRelationCreate.model_validate(data)
+
+
+# Ошибки insert_relation и соответствующие им коды gRPC
+RELATION_ERRORS = {
+    TermNotFound: grpc.StatusCode.NOT_FOUND,
+    SelfRelation: grpc.StatusCode.INVALID_ARGUMENT,
+    RelationExists: grpc.StatusCode.ALREADY_EXISTS,
+}
+
+
+def _graph_chunks(version: int):
+    """(запрос, сборка чанка из строк) для узлов и рёбер StreamGraph"""
+    def nodes(rows) -> "glossary_pb2.GraphChunk":
+        return glossary_pb2.GraphChunk(nodes=[_term_message(row) for row in rows], version=version)
+
+    def edges(rows) -> "glossary_pb2.GraphChunk":
+        return glossary_pb2.GraphChunk(
+            edges=[
+                glossary_pb2.GraphEdge(
+                    id=row.id,
+                    source=row.source_id,
+                    target=row.target_id,
+                    relation_type=row.relation_type,
+                    description=row.description or ""
+                )
+                for row in rows
+            ],
+            version=version
+        )
+
+    return ((GRAPH_NODES_QUERY, nodes), (GRAPH_EDGES_QUERY, edges))
+
+
+def _not_found_details(keyword: str) -> str:
+    details = f"Term '{keyword}' not found"
+    if trigram_index.built:
+        candidates = [match for match, _ in trigram_index.search(keyword, DID_YOU_MEAN_LIMIT)]
+        if candidates:
+            details += f", did you mean: {', '.join(candidates)}?"
+    return details
+
+
+def _check_batch_size(size: int, context: ServicerContext) -> None:
+    if size > MAX_BATCH_SIZE:
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Batch size exceeds {MAX_BATCH_SIZE}")
+
 
 class GlossaryServicer(glossary_pb2_grpc.GlossaryServiceServicer if glossary_pb2_grpc else object):
     """Реализация gRPC сервиса для работы с глоссарием"""
     
     def ListTerms(self, request, context: ServicerContext):
-        """Получение списка всех терминов (более тяжелый метод)"""
-        with Session(engine) as session:
-            query = select(Term).order_by(Term.keyword)
-            
-            # Поддержка пагинации
-            if request.limit > 0:
-                query = query.limit(request.limit)
-            if request.offset > 0:
-                query = query.offset(request.offset)
+        """Получение страницы терминов (более тяжелый метод)"""
+        limit = clamp_limit(request.limit)
+        with Session(read_engine) as session:
+            if request.offset > 0 and not request.after:
+                # Устаревший режим OFFSET, оставлен для совместимости со старыми клиентами
+                terms = session.exec(
+                    select(Term).order_by(Term.keyword).offset(request.offset).limit(limit)
+                ).all()
+                next_cursor = ""
+            else:
+                try:
+                    terms, next_cursor = fetch_terms_page(session, request.after or None, limit)
+                except InvalidCursor as exc:
+                    context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                    context.set_details(str(exc))
+                    return glossary_pb2.ListTermsResponse()
             
-            terms = session.exec(query).all()
-            total = session.exec(select(Term)).all()
+            total = 0 if request.skip_total else count_terms(session)
             
-            term_messages = [
-                glossary_pb2.Term(
-                    id=term.id,
-                    keyword=term.keyword,
-                    description=term.description,
-                    source=term.source or ""
-                )
-                for term in terms
-            ]
+            term_messages = [_term_message(term) for term in terms]
             
             return glossary_pb2.ListTermsResponse(
                 terms=term_messages,
-                total=len(total)
+                total=total,
+                next_cursor=next_cursor or ""
             )
     
+    def StreamTerms(self, request, context: ServicerContext) -> Iterator["glossary_pb2.TermChunk"]:
+        """Потоковая выгрузка всех терминов чанками (память сервера не зависит от размера глоссария)"""
+        chunk_size = _stream_chunk_size(request)
+        
+        query = select(Term).order_by(Term.keyword)
+        if request.after:
+            try:
+                query = query.where(Term.keyword > decode_cursor(request.after))
+            except InvalidCursor as exc:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(exc))
+        
+        with Session(read_engine) as session:
+            result = session.exec(query.execution_options(yield_per=chunk_size))
+            for terms in result.partitions():
+                # Клиент отменил вызов или истёк дедлайн - прекращаем чтение из БД
+                if not context.is_active():
+                    return
+                yield glossary_pb2.TermChunk(
+                    terms=[_term_message(term) for term in terms],
+                    next_cursor=encode_cursor(terms[-1].keyword)
+                )
+    
     def GetTerm(self, request, context: ServicerContext):
         """Получение конкретного термина по ключевому слову (легкий метод)"""
-        with Session(engine) as session:
-            term = session.exec(
-                select(Term).where(Term.keyword == request.keyword)
-            ).first()
-            
-            if not term:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Term '{request.keyword}' not found")
-                return glossary_pb2.GetTermResponse()
-            
-            return glossary_pb2.GetTermResponse(
-                term=glossary_pb2.Term(
-                    id=term.id,
-                    keyword=term.keyword,
-                    description=term.description,
-                    source=term.source or ""
-                )
+        term = term_cache.get(request.keyword)
+        if term is None:
+            generation = term_cache.generation
+            with Session(read_engine) as session:
+                db_term = session.exec(
+                    select(Term).where(Term.keyword == request.keyword)
+                ).first()
+                
+                if not db_term:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details(_not_found_details(request.keyword))
+                    return glossary_pb2.GetTermResponse()
+                
+                term = TermRead.model_validate(db_term)
+                term_cache.set(request.keyword, term, generation)
+        
+        return glossary_pb2.GetTermResponse(
+            term=glossary_pb2.Term(
+                id=term.id,
+                keyword=term.keyword,
+                description=term.description,
+                source=term.source or ""
             )
+        )
     
     def CreateTerm(self, request, context: ServicerContext):
         """Создание нового термина (средний метод)"""
@@ -170,15 +371,232 @@ class GlossaryServicer(glossary_pb2_grpc.GlossaryServiceServicer if glossary_pb2
                 success=True,
                 message=f"Term '{request.keyword}' deleted successfully"
             )
+    
+    def BatchGetTerms(self, request, context: ServicerContext):
+        """Получение нескольких терминов одним IN-запросом"""
+        _check_batch_size(len(request.keywords), context)
+        with Session(read_engine) as session:
+            terms, missing = batch_get_terms(session, list(request.keywords))
+        return glossary_pb2.BatchGetTermsResponse(
+            terms=[_term_message(term) for term in terms],
+            missing=missing
+        )
+    
+    def BulkCreateTerms(self, request, context: ServicerContext):
+        """Пакетное создание терминов в одной транзакции"""
+        _check_batch_size(len(request.terms), context)
+        items = [
+            {
+                "keyword": item.keyword,
+                "description": item.description,
+                "source": item.source or None
+            }
+            for item in request.terms
+        ]
+        with Session(engine) as session:
+            return _bulk_response(bulk_create_terms(session, items))
+    
+    def BulkDeleteTerms(self, request, context: ServicerContext):
+        """Пакетное удаление терминов в одной транзакции"""
+        _check_batch_size(len(request.keywords), context)
+        with Session(engine) as session:
+            return _bulk_response(bulk_delete_terms(session, list(request.keywords)))
+    
+    def SearchTerms(self, request, context: ServicerContext):
+        """Полнотекстовый поиск (FTS5, BM25)"""
+        if not request.query.strip():
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Query must not be empty")
+        with Session(read_engine) as session:
+            hits, next_offset = search_terms(session, *_search_args(request))
+        return _search_response(hits, next_offset)
+    
+    def SuggestTerms(self, request, context: ServicerContext):
+        """Автодополнение ключевых слов по префиксу"""
+        if not request.prefix:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Prefix must not be empty")
+        if not keyword_index.built:
+            with Session(read_engine) as session:
+                keyword_index.ensure_built(session)
+        return _suggest_response(request)
+    
+    def CreateRelation(self, request, context: ServicerContext):
+        """Создание связи: один INSERT ... ON CONFLICT DO NOTHING, повтор отклоняется уникальным индексом"""
+        try:
+            data = _relation_create(request)
+        except ValidationError as exc:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(error_detail(exc))
+            return glossary_pb2.CreateRelationResponse()
+        with Session(engine) as session:
+            try:
+                relation = insert_relation(session, data)
+            except tuple(RELATION_ERRORS) as exc:
+                context.set_code(RELATION_ERRORS[type(exc)])
+                context.set_details(str(exc))
+                return glossary_pb2.CreateRelationResponse()
+        return glossary_pb2.CreateRelationResponse(relation=_relation_message(relation))
+    
+    def ListRelations(self, request, context: ServicerContext):
+        """Страница связей (один JOIN-запрос)"""
+        with Session(read_engine) as session:
+            try:
+                relations, next_cursor = fetch_relations_page(
+                    session, request.after or None, clamp_limit(request.limit),
+                    relation_types=list(request.relation_types)
+                )
+            except InvalidCursor as exc:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(exc))
+                return glossary_pb2.ListRelationsResponse()
+        return _relations_response(relations, next_cursor)
+    
+    def GetTermRelations(self, request, context: ServicerContext):
+        """Исходящие и входящие связи термина"""
+        with Session(read_engine) as session:
+            term_id = session.exec(select(Term.id).where(Term.keyword == request.keyword)).first()
+            if term_id is None:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(_not_found_details(request.keyword))
+                return glossary_pb2.ListRelationsResponse()
+            try:
+                relations, next_cursor = fetch_relations_page(
+                    session, request.after or None, clamp_limit(request.limit),
+                    term_id=term_id, relation_types=list(request.relation_types)
+                )
+            except InvalidCursor as exc:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(exc))
+                return glossary_pb2.ListRelationsResponse()
+        return _relations_response(relations, next_cursor)
+    
+    def DeleteRelation(self, request, context: ServicerContext):
+        """Удаление связи по id"""
+        with Session(engine) as session:
+            relation = session.get(TermRelation, request.id)
+            if not relation:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"Relation {request.id} not found")
+                return glossary_pb2.DeleteRelationResponse(success=False, message="Relation not found")
+            session.delete(relation)
+            session.commit()
+        return glossary_pb2.DeleteRelationResponse(success=True, message=f"Relation {request.id} deleted successfully")
+    
+    def StreamGraph(self, request, context: ServicerContext) -> Iterator["glossary_pb2.GraphChunk"]:
+        """Потоковая выгрузка графа: чанки узлов, затем чанки рёбер, сжатые gzip
+
+        Размер сообщения ограничен chunk_size (не больше MAX_STREAM_CHUNK_SIZE строк), поэтому
+        граф любого размера не упирается в лимит сообщения gRPC, а память сервера не растёт с ним.
+        version - версия глоссария на начало выгрузки: изменения, сделанные во время потока,
+        клиент дочитывает через GET /graph/changes?since=version
+        """
+        chunk_size = _stream_chunk_size(request)
+        context.set_compression(grpc.Compression.Gzip)
+        with Session(read_engine) as session:
+            version = read_version(session)
+            for query, build in _graph_chunks(version):
+                result = session.exec(query.execution_options(yield_per=chunk_size))
+                for rows in result.partitions():
+                    if not context.is_active():
+                        return
+                    yield build(rows)
 
 
-def serve(port: int = 50051):
+class ChangeFeedInterceptor(grpc.ServerInterceptor):
+    """Перед каждым RPC применяет изменения, закоммиченные другими процессами"""
+
+    def intercept_service(self, continuation, handler_call_details):
+        change_feed.poll()
+        return continuation(handler_call_details)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Задержка, размер ответа, код завершения, SQL-запросы и число RPC в обработке по методам
+
+    Число SQL-запросов и время в БД возвращаются клиенту в trailing metadata server-timing
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method
+        if handler.unary_unary:
+            return handler._replace(unary_unary=_measure_unary(method, handler.unary_unary))
+        if handler.stream_unary:
+            return handler._replace(stream_unary=_measure_unary(method, handler.stream_unary))
+        if handler.unary_stream:
+            return handler._replace(unary_stream=_measure_stream(method, handler.unary_stream))
+        return handler._replace(stream_stream=_measure_stream(method, handler.stream_stream))
+
+
+def _measure_unary(method: str, behavior):
+    def wrapper(request, context):
+        in_flight = metrics.grpc_in_flight.labels(method)
+        in_flight.inc()
+        queries = QueryStats(method)
+        started = time.perf_counter()
+        response, failed = None, True
+        try:
+            with track_queries(queries):
+                response = behavior(request, context)
+            failed = False
+            return response
+        finally:
+            trailing_metadata(context, queries)
+            size = response.ByteSize() if response is not None else 0
+            metrics.record_rpc(method, metrics.rpc_code(context, failed), time.perf_counter() - started, size, queries.count)
+            in_flight.dec()
+    return wrapper
+
+
+def _measure_stream(method: str, behavior):
+    def wrapper(request, context):
+        in_flight = metrics.grpc_in_flight.labels(method)
+        in_flight.inc()
+        queries = QueryStats(method)
+        started = time.perf_counter()
+        size, failed = 0, True
+        try:
+            responses = behavior(request, context)
+            while True:
+                with track_queries(queries):
+                    response = next(responses, None)
+                if response is None:
+                    break
+                size += response.ByteSize()
+                yield response
+            failed = False
+            trailing_metadata(context, queries)
+        finally:
+            # finally выполняется и при отмене потока клиентом (GeneratorExit)
+            metrics.record_rpc(method, metrics.rpc_code(context, failed), time.perf_counter() - started, size, queries.count)
+            in_flight.dec()
+    return wrapper
+
+
+def start_metrics_server(port: int = GRPC_METRICS_PORT) -> None:
+    """HTTP /metrics рядом с gRPC сервером"""
+    metrics.registry.start_flusher()
+    if port:
+        metrics.start_metrics_server(port)
+        print(f"Metrics available on http://0.0.0.0:{port}/metrics")
+
+
+def serve(port: int = 50051, max_workers: int = GRPC_MAX_WORKERS):
     """Запуск gRPC сервера"""
     # Инициализация БД
     init_db()
+    change_feed.start(read_engine)
+    with Session(read_engine) as session:
+        keyword_index.build(session)
+        trigram_index.build(session)
     
     # Создание gRPC сервера
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        interceptors=[MetricsInterceptor(), ChangeFeedInterceptor()],
+        options=GRPC_SERVER_OPTIONS
+    )
     
     if glossary_pb2_grpc:
         glossary_pb2_grpc.add_GlossaryServiceServicer_to_server(
@@ -188,6 +606,8 @@ def serve(port: int = 50051):
     server.add_insecure_port(f'[::]:{port}')
     server.start()
     print(f"gRPC server started on port {port}")
+    start_metrics_server()
+    changelog_pruner.start()
     
     try:
         server.wait_for_termination()
@@ -195,5 +615,66 @@ def serve(port: int = 50051):
         server.stop(0)
 
 
+
+def _run(mode: str, port: int, max_workers: int, max_concurrency: int) -> None:
+    from .grpc_aio_server import serve_aio
+
+    if mode == "aio":
+        try:
+            asyncio.run(serve_aio(port, max_concurrency))
+        except KeyboardInterrupt:
+            pass
+    else:
+        serve(port, max_workers)
+
+
+def serve_processes(processes: int, mode: str, port: int, max_workers: int, max_concurrency: int) -> None:
+    """Несколько процессов сервера на одном порту
+
+    gRPC нельзя использовать после fork, поэтому процессы запускаются через spawn и каждый
+    создаёт свой сервер; кэши и индексы процессов согласуются через журнал изменений в БД
+    """
+    init_db()
+    # Каждый процесс отдаёт на общем порту метрик сумму по всем процессам
+    if metrics.registry.directory is None:
+        os.environ["GLOSSARY_METRICS_DIR"] = tempfile.mkdtemp(prefix="glossary-metrics-")
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_run, args=(mode, port, max_workers, max_concurrency), name=f"grpc-{index}")
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+
+def main():
+    """Точка входа: выбор реализации сервера для сравнительных замеров"""
+    from .grpc_aio_server import GRPC_MAX_CONCURRENT_RPCS
+    
+    parser = argparse.ArgumentParser(description="Glossary gRPC server")
+    parser.add_argument("--mode", choices=["threaded", "aio"], default=GRPC_SERVER_MODE)
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--max-workers", type=int, default=GRPC_MAX_WORKERS,
+                        help="размер пула потоков (threaded)")
+    parser.add_argument("--max-concurrency", type=int, default=GRPC_MAX_CONCURRENT_RPCS,
+                        help="максимум одновременных RPC (aio)")
+    parser.add_argument("--processes", type=int, default=GRPC_PROCESSES,
+                        help="число процессов сервера на одном порту (SO_REUSEPORT)")
+    args = parser.parse_args()
+    
+    if args.processes > 1:
+        serve_processes(args.processes, args.mode, args.port, args.max_workers, args.max_concurrency)
+    else:
+        _run(args.mode, args.port, args.max_workers, args.max_concurrency)
+
+
 if __name__ == '__main__':
-    serve()
+    main()
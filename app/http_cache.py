@@ -0,0 +1,236 @@
+"""
+Условные GET и сжатие больших ответов на чтение
+
+Тело ответа зависит только от версии глоссария и параметров запроса, поэтому сильный ETag
+строится из версии: клиенту с актуальной копией отвечаем 304 по версии, известной процессу,
+без обращения к БД. Сериализованное тело и его сжатые варианты (gzip, brotli) кэшируются
+по (ключ запроса, версия), так что горячие ответы не сериализуются и не сжимаются повторно.
+У каждого кодирования свой ETag ("v12-...", "v12-...-gzip"), как требуется для сильных валидаторов.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .versioning import glossary_version
+
+try:
+	import brotli
+except ImportError:  # сжатие brotli необязательно: pip install '.[compression]'
+	brotli = None
+
+# Тела меньше этого размера не сжимаются
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+# Суммарный размер закэшированных тел (все кодирования)
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Порядок предпочтения при равных q в Accept-Encoding
+_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+
+@dataclass
+class Representation:
+	key: str
+	version: int
+	tag: str  # ETag без кодирования и кавычек
+	body: bytes
+	headers: dict[str, str] = field(default_factory=dict)
+	encoded: dict[str, bytes] = field(default_factory=dict)
+
+	@property
+	def size(self) -> int:
+		return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+
+class ResponseCache:
+	"""LRU (ключ запроса) -> представление последней версии, ограниченный суммарным размером тел"""
+
+	def __init__(self, max_bytes: int = RESPONSE_CACHE_BYTES) -> None:
+		self.max_bytes = max_bytes
+		self._data: "OrderedDict[str, Representation]" = OrderedDict()
+		self._size = 0
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, key: str, version: int) -> Optional[Representation]:
+		with self._lock:
+			entry = self._data.get(key)
+			if entry is None or entry.version != version:
+				self.misses += 1
+				return None
+			self._data.move_to_end(key)
+			self.hits += 1
+			return entry
+
+	def put(self, entry: Representation) -> None:
+		with self._lock:
+			previous = self._data.get(entry.key)
+			# Ответ, прочитанный до записи, не должен вытеснять более новую версию
+			if previous is not None and previous.version > entry.version:
+				return
+			self._discard(entry.key)
+			if entry.size > self.max_bytes:
+				return
+			self._data[entry.key] = entry
+			self._size += entry.size
+			self._evict()
+
+	def encode(self, entry: Representation, encoding: str) -> bytes:
+		"""Сжатое тело; сжимается один раз на версию"""
+		data = entry.encoded.get(encoding)
+		if data is not None:
+			return data
+		data = _compress(entry.body, encoding)
+		with self._lock:
+			if encoding not in entry.encoded:
+				entry.encoded[encoding] = data
+				if self._data.get(entry.key) is entry:
+					self._size += len(data)
+					self._evict()
+		return data
+
+	def clear(self) -> None:
+		with self._lock:
+			self._data.clear()
+			self._size = 0
+
+	def stats(self) -> dict:
+		with self._lock:
+			return {"entries": len(self._data), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+	def _discard(self, key: str) -> None:
+		entry = self._data.pop(key, None)
+		if entry is not None:
+			self._size -= entry.size
+
+	def _evict(self) -> None:
+		while self._size > self.max_bytes and self._data:
+			_, entry = self._data.popitem(last=False)
+			self._size -= entry.size
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+	if encoding == "br":
+		return brotli.compress(body, quality=BROTLI_QUALITY)
+	return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+	"""Лучшее поддерживаемое кодирование из Accept-Encoding или None (без сжатия)"""
+	if not accept_encoding:
+		return None
+	weights: dict[str, float] = {}
+	for part in accept_encoding.split(","):
+		name, _, params = part.strip().partition(";")
+		quality = 1.0
+		params = params.strip()
+		if params.startswith("q="):
+			try:
+				quality = float(params[2:])
+			except ValueError:
+				quality = 0.0
+		weights[name.strip().lower()] = quality
+	best, best_quality = None, 0.0
+	for encoding in _ENCODINGS:
+		quality = weights.get(encoding, weights.get("*", 0.0))
+		if quality > best_quality:
+			best, best_quality = encoding, quality
+	return best
+
+
+def variant_tag(version: int, variant: str = "") -> str:
+	"""Основа ETag: версия данных и (для запросов с параметрами) хэш параметров"""
+	if not variant:
+		return f"v{version}"
+	return f"v{version}-{hashlib.blake2s(variant.encode(), digest_size=6).hexdigest()}"
+
+
+def _etag(tag: str, encoding: Optional[str]) -> str:
+	return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def _matching_etag(request: Request, tag: str) -> Optional[str]:
+	"""ETag из If-None-Match, относящийся к той же версии (в любом кодировании)"""
+	header = request.headers.get("if-none-match")
+	if not header:
+		return None
+	for value in header.split(","):
+		value = value.strip()
+		if value == "*":
+			return _etag(tag, None)
+		if value.startswith("W/"):
+			value = value[2:]
+		if value == _etag(tag, None) or any(value == _etag(tag, encoding) for encoding in ("br", "gzip")):
+			return value
+	return None
+
+
+def _base_headers(version: int) -> dict[str, str]:
+	return {
+		"X-Glossary-Version": str(version),
+		# Браузер хранит копию, но всегда перепроверяет её через If-None-Match
+		"Cache-Control": "no-cache",
+		"Vary": "Accept-Encoding",
+	}
+
+
+def not_modified(request: Request, version: int, variant: str = "") -> Optional[Response]:
+	etag = _matching_etag(request, variant_tag(version, variant))
+	if etag is None:
+		return None
+	return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **_base_headers(version)})
+
+
+def render(request: Request, entry: Representation) -> Response:
+	encoding = negotiate_encoding(request.headers.get("accept-encoding")) if len(entry.body) >= COMPRESS_MIN_SIZE else None
+	headers = {"ETag": _etag(entry.tag, encoding), **_base_headers(entry.version), **entry.headers}
+	if encoding is None:
+		return Response(content=entry.body, media_type="application/json", headers=headers)
+	headers["Content-Encoding"] = encoding
+	return Response(content=response_cache.encode(entry, encoding), media_type="application/json", headers=headers)
+
+
+# Построитель ответа: (версия, тело JSON, дополнительные заголовки); читает через сессию cached_json
+Builder = Callable[[], Awaitable[tuple[int, bytes, dict[str, str]]]]
+
+
+async def cached_json(request: Request, session: AsyncSession, name: str, build: Builder, variant: str = "") -> Response:
+	"""Ответ с ETag версии: 304, готовое тело из кэша или новое тело от build
+
+	build выполняется в одной транзакции чтения session, поэтому версия соответствует данным.
+	variant - каноническая запись параметров запроса, от которых зависит тело
+	"""
+	key = f"{name}?{variant}"
+	known = glossary_version.value
+	if known is not None:
+		response = not_modified(request, known, variant)
+		if response is not None:
+			return response
+		entry = response_cache.get(key, known)
+		if entry is not None:
+			return render(request, entry)
+
+	# sqlite3 не начинает транзакцию перед SELECT: без явного BEGIN каждый запрос build
+	# читал бы свой снимок и версия могла бы не совпасть с данными
+	connection = await session.connection()
+	await connection.exec_driver_sql("BEGIN")
+	try:
+		version, body, headers = await build()
+	finally:
+		await session.rollback()
+	glossary_version.advance(version)
+	entry = Representation(key=key, version=version, tag=variant_tag(version, variant), body=body, headers=headers)
+	response_cache.put(entry)
+	return not_modified(request, version, variant) or render(request, entry)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,490 @@
+"""
+Раскладка семантического графа на сервере и выборка видимой области
+
+Координаты узлов рассчитываются один раз для всех клиентов (NumPy/SciPy) и хранятся в памяти
+процесса. Каждая компонента связности раскладывается силовым алгоритмом Фрухтермана-Рейнгольда:
+малые - с точным отталкиванием всех пар, большие - от спектрального начального приближения
+с отталкиванием от случайной выборки узлов. Компоненты упаковываются по строкам, одиночные
+термины - сеткой под ними.
+
+После записи новые узлы сразу получают приблизительные координаты (рядом с соседом или в
+конце сетки одиночных), а полный пересчёт выполняется в фоновом потоке, когда поток изменений
+затихнет на LAYOUT_DEBOUNCE секунд; до его окончания запросы получают прежнюю раскладку
+с признаком stale.
+"""
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix, csr_matrix, diags
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import ArpackError, ArpackNoConvergence, eigsh
+from sqlmodel import Session, select
+
+from .db import read_engine
+from .events import ChangeSet, subscribe, subscribe_reset
+from .models import Term, TermRelation
+from .versioning import read_version
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_DEBOUNCE = float(os.getenv("LAYOUT_DEBOUNCE", "2.0"))
+LAYOUT_ITERATIONS = int(os.getenv("LAYOUT_ITERATIONS", "60"))
+# Компоненты до этого размера считаются с точным отталкиванием O(n^2)
+LAYOUT_EXACT_MAX_NODES = int(os.getenv("LAYOUT_EXACT_MAX_NODES", "1000"))
+# Размер выборки для отталкивания в больших компонентах
+LAYOUT_REPULSION_SAMPLES = 64
+# Расстояние между соседними узлами в единицах раскладки
+NODE_SPACING = 1.0
+COMPONENT_PADDING = 2.0
+
+Edge = tuple[int, int, str]  # (source_id, target_id, relation_type)
+Bounds = tuple[float, float, float, float]  # (x0, y0, x1, y1)
+
+
+# --- расчёт раскладки ---
+
+def _repulsion(pos: np.ndarray, others: np.ndarray, scale: float, k2: float, chunk: int = 16384) -> np.ndarray:
+	"""Сила отталкивания k^2/d от узлов others (по частям, чтобы ограничить память)
+
+	sum_j (p - q_j) * w_j = p * sum_j w_j - W @ q, где w_j = k^2 / |p - q_j|^2: вместо
+	тензора разностей n x m x 2 считаются две матрицы n x m через умножение матриц
+	"""
+	disp = np.empty_like(pos)
+	others_norm = (others ** 2).sum(axis=1)
+	for start in range(0, len(pos), chunk):
+		part = pos[start:start + chunk]
+		dist2 = (part ** 2).sum(axis=1)[:, None] + others_norm[None, :] - 2 * (part @ others.T)
+		weights = k2 / np.maximum(dist2, 1e-4)
+		disp[start:start + chunk] = (part * weights.sum(axis=1)[:, None] - weights @ others) * scale
+	return disp
+
+
+def _force_layout(pos: np.ndarray, rows: np.ndarray, cols: np.ndarray, rng: np.random.Generator,
+				  iterations: int = LAYOUT_ITERATIONS) -> np.ndarray:
+	"""Фрухтерман-Рейнгольд; rows/cols - обе ориентации каждого ребра"""
+	n = len(pos)
+	k = NODE_SPACING
+	temperature = max(np.ptp(pos, axis=0).max(), k) / 10
+	cooling = 0.01 ** (1 / max(iterations, 1))
+	exact = n <= LAYOUT_EXACT_MAX_NODES
+	for _ in range(iterations):
+		if exact:
+			disp = _repulsion(pos, pos, 1.0, k * k)
+		else:
+			sample = rng.choice(n, size=LAYOUT_REPULSION_SAMPLES, replace=False)
+			disp = _repulsion(pos, pos[sample], n / LAYOUT_REPULSION_SAMPLES, k * k)
+		# Притяжение d^2/k вдоль рёбер
+		delta = pos[rows] - pos[cols]
+		pull = delta * (np.sqrt((delta ** 2).sum(axis=-1)) / k)[:, None]
+		disp[:, 0] -= np.bincount(rows, weights=pull[:, 0], minlength=n)
+		disp[:, 1] -= np.bincount(rows, weights=pull[:, 1], minlength=n)
+		length = np.maximum(np.sqrt((disp ** 2).sum(axis=-1)), 1e-9)
+		pos += disp * (np.minimum(length, temperature) / length)[:, None]
+		temperature *= cooling
+	return pos
+
+
+def _spectral(adjacency: csr_matrix, rng: np.random.Generator) -> Optional[np.ndarray]:
+	"""Два первых нетривиальных собственных вектора нормированной матрицы смежности"""
+	degree = np.asarray(adjacency.sum(axis=1)).ravel()
+	inv_sqrt = diags(1 / np.sqrt(degree))
+	try:
+		_, vectors = eigsh(inv_sqrt @ adjacency @ inv_sqrt, k=3, which="LA", tol=1e-3,
+						   v0=rng.random(adjacency.shape[0]))
+	except (ArpackError, ArpackNoConvergence):
+		return None
+	return vectors[:, :2] / np.sqrt(degree)[:, None]
+
+
+def _component_layout(adjacency: csr_matrix, rng: np.random.Generator) -> np.ndarray:
+	n = adjacency.shape[0]
+	if n == 1:
+		return np.zeros((1, 2))
+	if n == 2:
+		return np.array([[-NODE_SPACING / 2, 0.0], [NODE_SPACING / 2, 0.0]])
+	radius = math.sqrt(n) * NODE_SPACING
+	pos = _spectral(adjacency, rng) if n > LAYOUT_EXACT_MAX_NODES else None
+	if pos is None:
+		pos = rng.random((n, 2)) - 0.5
+	pos = (pos - pos.mean(axis=0)) / max(np.abs(pos).max(), 1e-9) * radius
+	coo = adjacency.tocoo()
+	return _force_layout(pos, coo.row, coo.col, rng)
+
+
+def compute_layout(node_ids: np.ndarray, sources: np.ndarray, targets: np.ndarray,
+				   seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+	"""Координаты (n x 2) для отсортированных node_ids и степень каждого узла"""
+	n = len(node_ids)
+	if n == 0:
+		return np.zeros((0, 2)), np.zeros(0)
+	rng = np.random.default_rng(seed)
+	src = np.searchsorted(node_ids, sources)
+	tgt = np.searchsorted(node_ids, targets)
+	keep = src != tgt
+	src, tgt = src[keep], tgt[keep]
+	adjacency = coo_matrix((np.ones(len(src)), (src, tgt)), shape=(n, n)).tocsr()
+	adjacency = (adjacency + adjacency.T).tocsr()
+	adjacency.data[:] = 1.0
+	degree = np.diff(adjacency.indptr).astype(float)
+
+	_, labels = connected_components(adjacency, directed=False)
+	sizes = np.bincount(labels)
+	members = np.argsort(labels, kind="stable")
+	offsets = np.concatenate(([0], np.cumsum(sizes)))
+	positions = np.zeros((n, 2))
+
+	# Компоненты от больших к малым упаковываются по строкам ширины width
+	placed = []
+	for label in np.argsort(-sizes, kind="stable"):
+		if sizes[label] == 1:
+			break
+		idx = members[offsets[label]:offsets[label + 1]]
+		local = _component_layout(adjacency[idx][:, idx], rng)
+		local -= local.min(axis=0)
+		placed.append((idx, local))
+	singles = np.flatnonzero(sizes[labels] == 1)
+	total_area = sum(float(np.prod(local.max(axis=0) + COMPONENT_PADDING)) for _, local in placed)
+	total_area += len(singles) * (NODE_SPACING * 2) ** 2
+	widest = max((float(local[:, 0].max()) + COMPONENT_PADDING for _, local in placed), default=0.0)
+	width = max(math.sqrt(total_area), widest, NODE_SPACING * 2)
+
+	x = y = row_height = 0.0
+	for idx, local in placed:
+		w, h = local.max(axis=0) + COMPONENT_PADDING
+		if x > 0 and x + w > width:
+			x, y, row_height = 0.0, y + row_height, 0.0
+		positions[idx] = local + (x, y)
+		x += w
+		row_height = max(row_height, h)
+	y += row_height
+
+	if len(singles):
+		step = NODE_SPACING * 2
+		columns = max(1, int(width // step))
+		order = np.arange(len(singles))
+		positions[singles, 0] = (order % columns) * step
+		positions[singles, 1] = y + (order // columns) * step
+	return positions, degree
+
+
+# --- кэш раскладки ---
+
+@dataclass
+class Viewport:
+	"""Результат запроса области: все поля взяты из одной раскладки"""
+	version: int
+	bounds: Bounds
+	stale: bool
+	nodes: list[tuple[int, float, float, float]]  # (id, x, y, важность)
+	edges: list[Edge]
+	total: int  # узлов в области
+
+
+@dataclass
+class LayoutSnapshot:
+	version: int  # версия глоссария, для которой рассчитана раскладка
+	ids: np.ndarray  # id узлов по убыванию важности
+	xs: np.ndarray
+	ys: np.ndarray
+	importance: np.ndarray
+	edge_sources: np.ndarray
+	edge_targets: np.ndarray
+	edge_types: list[str]
+	bounds: Bounds
+	sorted_ids: np.ndarray  # для поиска строки узла по id
+	sorted_rows: np.ndarray
+
+	def position(self, node: int) -> Optional[tuple[float, float]]:
+		at = int(np.searchsorted(self.sorted_ids, node))
+		if at == len(self.sorted_ids) or self.sorted_ids[at] != node:
+			return None
+		row = self.sorted_rows[at]
+		return float(self.xs[row]), float(self.ys[row])
+
+
+class GraphLayout:
+	def __init__(self) -> None:
+		self._lock = threading.RLock()
+		self._build_lock = threading.Lock()
+		self._building: Optional[Future] = None  # первый расчёт, который ждут запросы
+		self._snapshot: Optional[LayoutSnapshot] = None
+		# Изменения после расчёта: значения - номер изменения, чтобы после пересчёта
+		# оставить только то, что пришло во время него
+		self._seq = 0
+		self._extra: dict[int, tuple[float, float, float, int]] = {}  # id -> (x, y, важность, seq)
+		self._deleted: dict[int, int] = {}
+		self._edges_added: dict[Edge, int] = {}
+		self._edges_removed: dict[Edge, int] = {}
+		self._dirty = threading.Condition(self._lock)
+		self._pending = False
+		self._last_change = 0.0
+		self._worker: Optional[threading.Thread] = None
+		self._stopping = False
+
+	@property
+	def built(self) -> bool:
+		return self._snapshot is not None
+
+	@property
+	def stale(self) -> bool:
+		return self._pending or bool(self._extra or self._deleted or self._edges_added or self._edges_removed)
+
+	def build(self, session: Session) -> None:
+		"""Полный пересчёт раскладки по текущему состоянию БД"""
+		with self._build_lock:
+			self._build(session)
+
+	async def ensure_built(self) -> None:
+		"""Дождаться первой раскладки, не блокируя цикл событий
+
+		Расчёт идёт в пуле потоков на сессии read_engine, одновременные запросы ждут один Future.
+		Если раскладка уже есть, запрос сразу получает её, даже устаревшую: пересчёт идёт в фоне
+		"""
+		if self._snapshot is not None:
+			return
+		with self._lock:
+			future = self._building
+			if future is None:
+				future = self._building = Future()
+				asyncio.get_running_loop().run_in_executor(None, self._build_first, future)
+		await asyncio.wrap_future(future)
+
+	def _build_first(self, future: Future) -> None:
+		try:
+			# Если первую раскладку уже считает фоновый поток, расчёт не повторяется
+			with self._build_lock:
+				if self._snapshot is None:
+					with Session(read_engine) as session:
+						self._build(session)
+		except BaseException as exc:
+			future.set_exception(exc)
+		else:
+			future.set_result(None)
+		finally:
+			with self._lock:
+				self._building = None
+
+	def rebuild(self, session: Session) -> None:
+		"""Полный пересчёт после пропущенных изменений: в фоновом потоке, если он запущен"""
+		with self._lock:
+			if self._worker is not None:
+				self._pending = True
+				self._dirty.notify()
+				return
+		if self._snapshot is not None:
+			self.build(session)
+
+	def _build(self, session: Session) -> None:
+		with self._lock:
+			started_seq = self._seq
+			self._pending = False
+		version = read_version(session)
+		node_ids = np.fromiter(session.exec(select(Term.id).order_by(Term.id)), dtype=np.int64)
+		relations = session.exec(
+			select(TermRelation.source_id, TermRelation.target_id, TermRelation.relation_type)
+		).all()
+		sources = np.fromiter((row[0] for row in relations), dtype=np.int64, count=len(relations))
+		targets = np.fromiter((row[1] for row in relations), dtype=np.int64, count=len(relations))
+		positions, degree = compute_layout(node_ids, sources, targets)
+
+		order = np.lexsort((node_ids, -degree))
+		bounds = (0.0, 0.0, 0.0, 0.0) if not len(node_ids) else (
+			float(positions[:, 0].min()), float(positions[:, 1].min()),
+			float(positions[:, 0].max()), float(positions[:, 1].max())
+		)
+		snapshot = LayoutSnapshot(
+			version=version,
+			ids=node_ids[order],
+			xs=positions[order, 0],
+			ys=positions[order, 1],
+			importance=degree[order],
+			edge_sources=sources,
+			edge_targets=targets,
+			edge_types=[row[2] for row in relations],
+			bounds=bounds,
+			sorted_ids=node_ids,
+			sorted_rows=np.argsort(order),
+		)
+		with self._lock:
+			self._snapshot = snapshot
+			self._extra = {k: v for k, v in self._extra.items() if v[3] > started_seq}
+			self._deleted = {k: v for k, v in self._deleted.items() if v > started_seq}
+			self._edges_added = {k: v for k, v in self._edges_added.items() if v > started_seq}
+			self._edges_removed = {k: v for k, v in self._edges_removed.items() if v > started_seq}
+
+	# --- инкрементальные обновления ---
+
+	def on_changes(self, changes: ChangeSet) -> None:
+		if not (changes.terms_added or changes.terms_deleted or changes.relations_added or changes.relations_deleted):
+			return
+		with self._lock:
+			self._seq += 1
+			seq = self._seq
+			for term_id in changes.terms_deleted:
+				self._extra.pop(term_id, None)
+				self._deleted[term_id] = seq
+			for term_id in changes.terms_added:
+				self._deleted.pop(term_id, None)
+				self._extra[term_id] = (*self._orphan_position(), 0.0, seq)
+			for relation_id, source, target, relation_type in changes.relations_deleted:
+				edge = (source, target, relation_type)
+				self._edges_added.pop(edge, None)
+				self._edges_removed[edge] = seq
+			for relation_id, source, target, relation_type in changes.relations_added:
+				edge = (source, target, relation_type)
+				self._edges_removed.pop(edge, None)
+				self._edges_added[edge] = seq
+				self._attach(source, target, seq)
+				self._attach(target, source, seq)
+			self._pending = True
+			self._last_change = time.monotonic()
+			self._dirty.notify()
+
+	def _position(self, node: int) -> Optional[tuple[float, float]]:
+		if node in self._extra:
+			return self._extra[node][:2]
+		if self._snapshot is None or node in self._deleted:
+			return None
+		return self._snapshot.position(node)
+
+	def _orphan_position(self) -> tuple[float, float]:
+		"""Место в конце сетки одиночных терминов (ниже текущей раскладки)"""
+		x0, _, x1, y1 = self._snapshot.bounds if self._snapshot else (0.0, 0.0, 0.0, 0.0)
+		step = NODE_SPACING * 2
+		columns = max(1, int((x1 - x0) // step) + 1)
+		slot = len(self._extra)
+		return x0 + (slot % columns) * step, y1 + step * (1 + slot // columns)
+
+	def _attach(self, node: int, neighbor: int, seq: int) -> None:
+		"""Новый узел без связей переносится к соседу до полного пересчёта"""
+		extra = self._extra.get(node)
+		anchor = self._position(neighbor)
+		if extra is None or anchor is None:
+			if extra is not None:
+				self._extra[node] = (extra[0], extra[1], extra[2] + 1, seq)
+			return
+		angle = (node * 2.399963) % (2 * math.pi)  # золотой угол: соседи не накладываются
+		self._extra[node] = (
+			anchor[0] + NODE_SPACING * math.cos(angle),
+			anchor[1] + NODE_SPACING * math.sin(angle),
+			extra[2] + 1,
+			seq,
+		)
+
+	# --- фоновый пересчёт ---
+
+	def start(self, initial: bool = True) -> None:
+		"""Запуск фонового потока пересчёта; initial - сразу рассчитать раскладку"""
+		with self._lock:
+			if self._worker is not None:
+				return
+			self._stopping = False
+			self._pending = self._pending or initial
+			self._worker = threading.Thread(target=self._run, name="graph-layout", daemon=True)
+			self._worker.start()
+
+	def stop(self) -> None:
+		with self._lock:
+			worker, self._worker = self._worker, None
+			self._stopping = True
+			self._dirty.notify()
+		if worker is not None:
+			worker.join(timeout=5)
+
+	def _run(self) -> None:
+		while True:
+			with self._lock:
+				while not self._pending and not self._stopping:
+					self._dirty.wait()
+				if self._stopping:
+					return
+				# Пересчёт начинается, когда изменения перестали поступать
+				quiet = LAYOUT_DEBOUNCE - (time.monotonic() - self._last_change)
+				if quiet > 0 and self._snapshot is not None:
+					self._dirty.wait(timeout=quiet)
+					continue
+			try:
+				with Session(read_engine) as session:
+					self.build(session)
+			except Exception:
+				logger.exception("Graph layout computation failed")
+				with self._lock:
+					self._pending = True
+				time.sleep(LAYOUT_DEBOUNCE)
+
+	# --- запросы ---
+
+	def viewport(self, bounds: Optional[Bounds], limit: int) -> Viewport:
+		"""Не более limit самых важных узлов в прямоугольнике (или во всём графе), рёбра между ними и число узлов в области
+
+		Раскладка и изменения после неё читаются под одной блокировкой: фоновый пересчёт
+		не может подменить раскладку посреди запроса
+		"""
+		with self._lock:
+			snapshot = self._snapshot
+			stale = self.stale
+			extra = dict(self._extra)
+			deleted = set(self._deleted)
+			edges_added = set(self._edges_added)
+			edges_removed = set(self._edges_removed)
+
+		mask = np.ones(len(snapshot.ids), dtype=bool)
+		if bounds is not None:
+			x0, y0, x1, y1 = bounds
+			mask &= (snapshot.xs >= x0) & (snapshot.xs <= x1) & (snapshot.ys >= y0) & (snapshot.ys <= y1)
+		if extra or deleted:
+			mask &= ~np.isin(snapshot.ids, np.fromiter(set(extra) | deleted, dtype=np.int64))
+		rows = np.flatnonzero(mask)
+
+		extra_nodes = [
+			(node, x, y, importance) for node, (x, y, importance, _) in extra.items()
+			if bounds is None or (bounds[0] <= x <= bounds[2] and bounds[1] <= y <= bounds[3])
+		]
+		total = len(rows) + len(extra_nodes)
+		top = rows[:limit]
+		nodes = [
+			(int(node), float(x), float(y), float(importance))
+			for node, x, y, importance in zip(
+				snapshot.ids[top], snapshot.xs[top], snapshot.ys[top], snapshot.importance[top]
+			)
+		]
+		if extra_nodes:
+			nodes = sorted(nodes + extra_nodes, key=lambda node: (-node[3], node[0]))[:limit]
+
+		selected = np.fromiter((node[0] for node in nodes), dtype=np.int64, count=len(nodes))
+		edge_rows = np.flatnonzero(
+			np.isin(snapshot.edge_sources, selected) & np.isin(snapshot.edge_targets, selected)
+		)
+		edges = {
+			(int(snapshot.edge_sources[row]), int(snapshot.edge_targets[row]), snapshot.edge_types[row])
+			for row in edge_rows
+		}
+		selected_set = set(selected.tolist())
+		edges = (edges - edges_removed) | {
+			edge for edge in edges_added if edge[0] in selected_set and edge[1] in selected_set
+		}
+		return Viewport(
+			version=snapshot.version,
+			bounds=snapshot.bounds,
+			stale=stale,
+			nodes=nodes,
+			edges=sorted(edges),
+			total=total
+		)
+
+	@property
+	def snapshot(self) -> Optional[LayoutSnapshot]:
+		return self._snapshot
+
+
+graph_layout = GraphLayout()
+subscribe(graph_layout.on_changes)
+subscribe_reset(graph_layout.rebuild)
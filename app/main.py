@@ -3,18 +3,65 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from .routers import terms, graph
-from .db import init_db
+from sqlmodel import Session
+
+from .cache import term_cache
+from .db import init_db, read_engine
+from .events import change_feed
+from .fuzzy import trigram_index
+from .graph_index import graph_index
+from .http_cache import response_cache
+from .layout import graph_layout
+from .metrics import CONTENT_TYPE, MetricsMiddleware, registry as metrics_registry
+from .suggest import keyword_index
+from .versioning import changelog_pruner, glossary_version
 
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
 	init_db()
+	changelog_pruner.prune()
+	# Позиция в журнале запоминается до сборки индексов: всё, что запишут другие воркеры
+	# после этого момента, будет применено к индексам перед обработкой запросов
+	change_feed.start(read_engine)
+	with Session(read_engine) as session:
+		graph_index.build(session)
+		keyword_index.build(session)
+		trigram_index.build(session)
+		glossary_version.load(session)
+	# Раскладка графа считается в фоновом потоке, первые запросы /graph/layout ждут её готовности
+	graph_layout.start()
+	changelog_pruner.start()
+	metrics_registry.start_flusher()
 	yield
+	changelog_pruner.stop()
+	graph_layout.stop()
+	change_feed.stop()
+
+
+class ChangeFeedMiddleware:
+	"""Перед каждым запросом применяет изменения, закоммиченные другими процессами
+
+	poll обращается к БД и при чужих изменениях обновляет индексы, поэтому выполняется
+	в пуле потоков, а не в цикле событий
+	"""
+
+	def __init__(self, app) -> None:
+		self.app = app
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] == "http":
+			await run_in_threadpool(change_feed.poll)
+		await self.app(scope, receive, send)
 
 
 app = FastAPI(title="Glossary API", version="0.1.0", lifespan=lifespan)
+app.add_middleware(ChangeFeedMiddleware)
+# Добавлен последним - внешний слой: в задержку входит и применение изменений других процессов
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(terms.router, prefix="/terms", tags=["terms"])
 app.include_router(graph.router, prefix="/graph", tags=["graph"])
@@ -42,3 +89,21 @@ def read_root():
 @app.get("/health")
 def health_check():
 	return {"status": "ok"}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+	"""Счётчики попаданий/промахов кэша терминов и кэша готовых ответов"""
+	return {**term_cache.stats(), "responses": response_cache.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+	"""Метрики в текстовом формате Prometheus"""
+	return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/metrics/summary")
+def metrics_summary():
+	"""Число запросов и перцентили p50/p90/p99 задержки и размера ответа по маршрутам и RPC"""
+	return metrics_registry.summary()
@@ -0,0 +1,435 @@
+"""
+Встроенные метрики REST и gRPC в текстовом формате Prometheus
+
+Задержка и размер ответа пишутся в гистограммы с фиксированными границами корзин: запись -
+поиск корзины (bisect) и три инкремента под собственной блокировкой ряда, без общей
+блокировки на весь реестр. Перцентили считаются по корзинам (как histogram_quantile в
+Prometheus) и не требуют хранить отдельные замеры.
+
+При нескольких процессах (uvicorn --workers, gRPC --processes) у каждого процесса свой реестр.
+Если задан GLOSSARY_METRICS_DIR, процессы раз в METRICS_FLUSH_INTERVAL секунд сохраняют снимок
+в этот каталог, а /metrics любого процесса отдаёт сумму по всем работающим процессам.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from .query_stats import QueryStats, track_queries
+
+# Границы корзин задержки, секунды (0.1 мс ... 10 с)
+LATENCY_BUCKETS = (
+	0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Границы корзин размера ответа, байты (64 Б ... 16 МБ)
+SIZE_BUCKETS = tuple(float(64 * 4 ** power) for power in range(10))
+# Границы корзин числа SQL-запросов на запрос/RPC
+QUERY_BUCKETS = (1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+QUANTILES = (0.5, 0.9, 0.99)
+
+METRICS_DIR = os.getenv("GLOSSARY_METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+	__slots__ = ("value", "_lock")
+
+	def __init__(self) -> None:
+		self.value = 0.0
+		self._lock = threading.Lock()
+
+	def inc(self, amount: float = 1.0) -> None:
+		with self._lock:
+			self.value += amount
+
+	def dec(self, amount: float = 1.0) -> None:
+		self.inc(-amount)
+
+	def snapshot(self) -> float:
+		return self.value
+
+
+class Histogram:
+	__slots__ = ("bounds", "counts", "sum", "_lock")
+
+	def __init__(self, bounds: tuple[float, ...]) -> None:
+		self.bounds = bounds
+		self.counts = [0] * (len(bounds) + 1)  # последняя корзина - больше всех границ (+Inf)
+		self.sum = 0.0
+		self._lock = threading.Lock()
+
+	def observe(self, value: float) -> None:
+		index = bisect_left(self.bounds, value)
+		with self._lock:
+			self.counts[index] += 1
+			self.sum += value
+
+	def snapshot(self) -> list:
+		with self._lock:
+			return [list(self.counts), self.sum]
+
+
+def quantile(bounds: tuple[float, ...], counts: list[int], q: float) -> Optional[float]:
+	"""Оценка перцентиля по корзинам: линейная интерполяция внутри корзины"""
+	total = sum(counts)
+	if not total:
+		return None
+	rank = q * total
+	seen = 0
+	for index, count in enumerate(counts):
+		if count and seen + count >= rank:
+			if index == len(bounds):
+				return bounds[-1]
+			lower = bounds[index - 1] if index else 0.0
+			return lower + (bounds[index] - lower) * (rank - seen) / count
+		seen += count
+	return bounds[-1]
+
+
+class Family:
+	"""Метрика с рядами по значениям меток"""
+
+	def __init__(self, name: str, help_text: str, kind: str, labelnames: tuple[str, ...],
+				 bounds: Optional[tuple[float, ...]] = None) -> None:
+		self.name = name
+		self.help = help_text
+		self.kind = kind  # counter, gauge или histogram
+		self.labelnames = labelnames
+		self.bounds = bounds
+		self._series: dict[tuple[str, ...], object] = {}
+		self._lock = threading.Lock()
+
+	def labels(self, *values: str):
+		series = self._series.get(values)
+		if series is None:
+			with self._lock:
+				series = self._series.get(values)
+				if series is None:
+					series = Histogram(self.bounds) if self.kind == "histogram" else Counter()
+					self._series[values] = series
+		return series
+
+	def snapshot(self) -> dict:
+		with self._lock:
+			items = list(self._series.items())
+		return {
+			"kind": self.kind,
+			"help": self.help,
+			"labels": list(self.labelnames),
+			"bounds": list(self.bounds) if self.bounds else None,
+			"series": [[list(values), series.snapshot()] for values, series in items],
+		}
+
+
+def _merge(target: dict, source: dict) -> None:
+	for name, family in source.items():
+		merged = target.setdefault(name, {**family, "series": {}})
+		for values, data in family["series"]:
+			key = tuple(values)
+			if family["kind"] == "histogram":
+				counts, total = merged["series"].get(key, ([0] * len(data[0]), 0.0))
+				merged["series"][key] = ([a + b for a, b in zip(counts, data[0])], total + data[1])
+			else:
+				merged["series"][key] = merged["series"].get(key, 0.0) + data
+
+
+def _pid_alive(pid: int) -> bool:
+	try:
+		os.kill(pid, 0)
+	except ProcessLookupError:
+		return False
+	except PermissionError:
+		pass
+	return True
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: list[str], values: list[str], extra: str = "") -> str:
+	pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+	if extra:
+		pairs.append(extra)
+	return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+	if value == float("inf"):
+		return "+Inf"
+	return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Registry:
+	def __init__(self, directory: Optional[str] = METRICS_DIR) -> None:
+		self._families: dict[str, Family] = {}
+		self._lock = threading.Lock()
+		self.directory = Path(directory) if directory else None
+		self._flusher: Optional[threading.Thread] = None
+
+	def _family(self, name: str, help_text: str, kind: str, labelnames: tuple[str, ...],
+				bounds: Optional[tuple[float, ...]] = None) -> Family:
+		with self._lock:
+			family = self._families.get(name)
+			if family is None:
+				family = self._families[name] = Family(name, help_text, kind, labelnames, bounds)
+			return family
+
+	def counter(self, name: str, help_text: str, labelnames: tuple[str, ...]) -> Family:
+		return self._family(name, help_text, "counter", labelnames)
+
+	def gauge(self, name: str, help_text: str, labelnames: tuple[str, ...]) -> Family:
+		return self._family(name, help_text, "gauge", labelnames)
+
+	def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...], bounds: tuple[float, ...]) -> Family:
+		return self._family(name, help_text, "histogram", labelnames, bounds)
+
+	def snapshot(self) -> dict:
+		with self._lock:
+			families = list(self._families.values())
+		return {family.name: family.snapshot() for family in families}
+
+	# --- несколько процессов ---
+
+	def start_flusher(self) -> None:
+		"""Фоновое сохранение снимка процесса раз в METRICS_FLUSH_INTERVAL секунд"""
+		if self.directory is None or self._flusher is not None:
+			return
+		self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+		self._flusher.start()
+
+	def _flush_loop(self) -> None:
+		while True:
+			time.sleep(METRICS_FLUSH_INTERVAL)
+			try:
+				self.flush()
+			except OSError:
+				logger.exception("Metrics flush failed")
+
+	def flush(self) -> None:
+		if self.directory is None:
+			return
+		self.directory.mkdir(parents=True, exist_ok=True)
+		path = self.directory / f"{os.getpid()}.json"
+		temporary = path.with_suffix(".tmp")
+		temporary.write_text(json.dumps(self.snapshot()))
+		os.replace(temporary, path)
+
+	def collect(self) -> dict:
+		"""Снимок этого процесса, сложенный со снимками остальных процессов из каталога"""
+		merged: dict = {}
+		_merge(merged, self.snapshot())
+		if self.directory is not None and self.directory.exists():
+			for path in self.directory.glob("*.json"):
+				pid = int(path.stem) if path.stem.isdigit() else None
+				# Снимки завершившихся процессов (в том числе от прошлых запусков) не учитываются:
+				# для Prometheus это выглядит как сброс счётчиков, rate() это учитывает
+				if pid is None or pid == os.getpid() or not _pid_alive(pid):
+					continue
+				try:
+					_merge(merged, json.loads(path.read_text()))
+				except (OSError, ValueError):
+					continue
+		return merged
+
+	# --- выдача ---
+
+	def render(self) -> str:
+		"""Все метрики в текстовом формате Prometheus"""
+		lines = []
+		for name, family in sorted(self.collect().items()):
+			lines.append(f"# HELP {name} {family['help']}")
+			lines.append(f"# TYPE {name} {family['kind']}")
+			labelnames = family["labels"]
+			for values, data in sorted(family["series"].items()):
+				values = list(values)
+				if family["kind"] != "histogram":
+					lines.append(f"{name}{_labels(labelnames, values)} {_number(data)}")
+					continue
+				counts, total = data
+				cumulative = 0
+				for bound, count in zip([*family["bounds"], float("inf")], counts):
+					cumulative += count
+					le = 'le="' + _number(bound) + '"'
+					lines.append(f"{name}_bucket{_labels(labelnames, values, le)} {cumulative}")
+				lines.append(f"{name}_sum{_labels(labelnames, values)} {_number(total)}")
+				lines.append(f"{name}_count{_labels(labelnames, values)} {cumulative}")
+		return "\n".join(lines) + "\n"
+
+	def summary(self) -> dict:
+		"""Число замеров и перцентили по каждому ряду гистограмм (для быстрых проверок без Prometheus)"""
+		result = {}
+		for name, family in sorted(self.collect().items()):
+			if family["kind"] != "histogram":
+				continue
+			bounds = tuple(family["bounds"])
+			rows = []
+			for values, (counts, total) in sorted(family["series"].items()):
+				count = sum(counts)
+				rows.append({
+					**dict(zip(family["labels"], values)),
+					"count": count,
+					"mean": total / count if count else None,
+					**{f"p{round(q * 100)}": quantile(bounds, counts, q) for q in QUANTILES},
+				})
+			result[name] = rows
+		return result
+
+
+registry = Registry()
+
+# --- REST ---
+
+http_duration = registry.histogram(
+	"glossary_http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route"), LATENCY_BUCKETS
+)
+http_response_size = registry.histogram(
+	"glossary_http_response_size_bytes", "Размер тела HTTP-ответа", ("method", "route"), SIZE_BUCKETS
+)
+http_responses = registry.counter(
+	"glossary_http_responses_total", "HTTP-ответы по коду статуса", ("method", "route", "status")
+)
+http_db_queries = registry.histogram(
+	"glossary_http_db_queries", "Число SQL-запросов на HTTP-запрос", ("method", "route"), QUERY_BUCKETS
+)
+http_in_flight = registry.gauge(
+	"glossary_http_requests_in_flight", "HTTP-запросы в обработке", ("method",)
+)
+
+# --- gRPC ---
+
+grpc_duration = registry.histogram(
+	"glossary_grpc_server_handling_seconds", "Время обработки RPC", ("method",), LATENCY_BUCKETS
+)
+grpc_response_size = registry.histogram(
+	"glossary_grpc_response_size_bytes", "Размер ответа RPC (сумма сообщений потока)", ("method",), SIZE_BUCKETS
+)
+grpc_handled = registry.counter(
+	"glossary_grpc_server_handled_total", "Завершённые RPC по коду статуса", ("method", "code")
+)
+grpc_db_queries = registry.histogram(
+	"glossary_grpc_db_queries", "Число SQL-запросов на RPC", ("method",), QUERY_BUCKETS
+)
+grpc_in_flight = registry.gauge(
+	"glossary_grpc_server_in_flight", "RPC в обработке", ("method",)
+)
+
+
+def route_name(scope) -> str:
+	"""Шаблон маршрута (/terms/{keyword}) вместо пути: число рядов не зависит от запросов
+
+	Маршрутизатор записывает найденный маршрут в scope["route"]; у маршрутов подключённого
+	роутера шаблон задан без префикса, поэтому префикс восстанавливается по фактическому пути
+	"""
+	route = scope.get("route")
+	if route is None or not hasattr(route, "path_format"):
+		return "unmatched"
+	path = scope["path"]
+	params = scope.get("path_params", {})
+	relative = route.path_format
+	for name, convertor in route.param_convertors.items():
+		relative = relative.replace("{" + name + "}", convertor.to_string(params[name]))
+	if not path.endswith(relative):
+		return route.path_format
+	return path[:len(path) - len(relative)] + route.path_format
+
+
+class MetricsMiddleware:
+	"""ASGI middleware: задержка, размер ответа, коды статусов и SQL-запросы по маршрутам, число запросов в обработке
+
+	Число SQL-запросов и время в БД до начала ответа добавляются в заголовок Server-Timing
+	"""
+
+	def __init__(self, app) -> None:
+		self.app = app
+
+	async def __call__(self, scope, receive, send):
+		if scope["type"] != "http":
+			await self.app(scope, receive, send)
+			return
+		method = scope["method"]
+		in_flight = http_in_flight.labels(method)
+		status = 500
+		size = 0
+
+		with track_queries(QueryStats(lambda: f"{method} {route_name(scope)}")) as queries:
+			async def send_wrapper(message):
+				nonlocal status, size
+				if message["type"] == "http.response.start":
+					status = message["status"]
+					headers = [*message.get("headers", []), (b"server-timing", queries.server_timing().encode())]
+					message = {**message, "headers": headers}
+				elif message["type"] == "http.response.body":
+					size += len(message.get("body", b""))
+				await send(message)
+
+			in_flight.inc()
+			started = time.perf_counter()
+			try:
+				await self.app(scope, receive, send_wrapper)
+			finally:
+				# Маршрут известен только после маршрутизации: scope дополняется по ходу обработки
+				route = route_name(scope)
+				http_duration.labels(method, route).observe(time.perf_counter() - started)
+				http_response_size.labels(method, route).observe(size)
+				http_responses.labels(method, route, str(status)).inc()
+				http_db_queries.labels(method, route).observe(queries.count)
+				in_flight.dec()
+
+
+def rpc_code(context, failed: bool) -> str:
+	"""Код завершения RPC: установленный обработчиком (abort, set_code) или OK/UNKNOWN"""
+	code = context.code()
+	if code is None:
+		return "UNKNOWN" if failed else "OK"
+	return getattr(code, "name", str(code))
+
+
+def record_rpc(method: str, code: str, elapsed: float, size: int, queries: int) -> None:
+	grpc_duration.labels(method).observe(elapsed)
+	grpc_db_queries.labels(method).observe(queries)
+	grpc_response_size.labels(method).observe(size)
+	grpc_handled.labels(method, code).inc()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+	def do_GET(self):
+		if self.path.split("?")[0] != "/metrics":
+			self.send_error(404)
+			return
+		body = registry.render().encode()
+		self.send_response(200)
+		self.send_header("Content-Type", CONTENT_TYPE)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass
+
+
+class _ReusePortHTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+
+	def server_bind(self):
+		# Процессы gRPC сервера на одном порту делят и порт метрик; данные сводятся через GLOSSARY_METRICS_DIR
+		if hasattr(socket, "SO_REUSEPORT"):
+			self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+		super().server_bind()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+	"""HTTP-сервер /metrics в фоновом потоке (для процессов без FastAPI, например gRPC)"""
+	server = _ReusePortHTTPServer((host, port), _MetricsHandler)
+	threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+	return server
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -12,27 +13,50 @@ class Term(SQLModel, table=True):
 	# Связи, где этот термин является источником
 	outgoing_relations: list["TermRelation"] = Relationship(
 		back_populates="source_term",
-		sa_relationship_kwargs={"cascade_delete": True}
+		cascade_delete=True,
+		sa_relationship_kwargs={"foreign_keys": "[TermRelation.source_id]"}
 	)
 	# Связи, где этот термин является целевым
 	incoming_relations: list["TermRelation"] = Relationship(
 		back_populates="target_term",
-		sa_relationship_kwargs={"cascade_delete": True}
+		cascade_delete=True,
+		sa_relationship_kwargs={"foreign_keys": "[TermRelation.target_id]"}
 	)
 
 
 class TermRelation(SQLModel, table=True):
 	"""Модель для представления связей между терминами в семантическом графе"""
+	__table_args__ = (
+		# Уникальность комбинации source_id, target_id, relation_type (цель ON CONFLICT при создании связи)
+		Index("ix_termrelation_edge", "source_id", "target_id", "relation_type", unique=True),
+		# Покрывающие индексы исходящих и входящих связей термина с фильтром по типу
+		Index("ix_termrelation_source_type", "source_id", "relation_type", "target_id"),
+		Index("ix_termrelation_target_type", "target_id", "relation_type", "source_id"),
+	)
+
 	id: Optional[int] = Field(default=None, primary_key=True)
-	source_id: int = Field(foreign_key="term.id", index=True)
-	target_id: int = Field(foreign_key="term.id", index=True)
+	source_id: int = Field(foreign_key="term.id")
+	target_id: int = Field(foreign_key="term.id")
 	relation_type: str = Field(default="related", max_length=64, description="Тип связи (related, synonym, antonym, part_of, etc.)")
 	description: Optional[str] = Field(default=None, max_length=512, description="Описание связи")
 	
 	# Отношения
-	source_term: Term = Relationship(back_populates="outgoing_relations")
-	target_term: Term = Relationship(back_populates="incoming_relations")
-	
-	class Config:
-		# Уникальность комбинации source_id, target_id, relation_type
-		pass
\ No newline at end of file
+	source_term: Term = Relationship(
+		back_populates="outgoing_relations",
+		sa_relationship_kwargs={"foreign_keys": "[TermRelation.source_id]"}
+	)
+	target_term: Term = Relationship(
+		back_populates="incoming_relations",
+		sa_relationship_kwargs={"foreign_keys": "[TermRelation.target_id]"}
+	)
+
+
+class ChangeLog(SQLModel, table=True):
+	"""Журнал изменений терминов и связей; version - монотонная версия данных глоссария"""
+	__table_args__ = {"sqlite_autoincrement": True}
+
+	version: Optional[int] = Field(default=None, primary_key=True)
+	entity: str = Field(max_length=16, description="term или relation")
+	entity_id: int = Field(index=True)
+	op: str = Field(max_length=8, description="insert, update или delete")
+	data: Optional[str] = Field(default=None, description="JSON с ключевыми словами термина или концами связи")
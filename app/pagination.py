@@ -0,0 +1,63 @@
+"""
+Keyset-пагинация терминов по Term.keyword, общая для REST и gRPC
+"""
+import base64
+import binascii
+from typing import Optional
+
+from sqlalchemy import Row, func
+from sqlmodel import Session, select
+
+from .cache import term_count_cache
+from .models import Term
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+	"""Курсор не удалось декодировать"""
+
+
+def encode_cursor(keyword: str) -> str:
+	return base64.urlsafe_b64encode(keyword.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+	try:
+		padded = cursor + "=" * (-len(cursor) % 4)
+		return base64.b64decode(padded.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+	except (binascii.Error, UnicodeError, ValueError) as exc:
+		raise InvalidCursor(f"Invalid cursor: {cursor!r}") from exc
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+	if not limit or limit <= 0:
+		return DEFAULT_PAGE_SIZE
+	return min(limit, MAX_PAGE_SIZE)
+
+
+def fetch_terms_page(session: Session, after: Optional[str], limit: int) -> tuple[list[Row], Optional[str]]:
+	"""Страница терминов после курсора и курсор следующей страницы (None, если страница последняя)
+
+	Возвращаются строки (id, keyword, description, source) без ORM-объектов: поля доступны
+	как атрибуты, а кортежи сериализуются напрямую (см. serialization)
+	"""
+	query = select(Term.id, Term.keyword, Term.description, Term.source).order_by(Term.keyword)
+	if after:
+		query = query.where(Term.keyword > decode_cursor(after))
+	# Берём на одну запись больше, чтобы понять, есть ли следующая страница
+	terms = list(session.exec(query.limit(limit + 1)).all())
+	if len(terms) > limit:
+		terms = terms[:limit]
+		return terms, encode_cursor(terms[-1].keyword)
+	return terms, None
+
+
+def count_terms(session: Session) -> int:
+	"""COUNT(*) по таблице терминов с кэшированием до ближайшей записи"""
+	total = term_count_cache.get()
+	if total is None:
+		total = session.exec(select(func.count()).select_from(Term)).one()
+		term_count_cache.set(total)
+	return total
@@ -0,0 +1,80 @@
+"""
+Учёт SQL-запросов в пределах HTTP-запроса или RPC
+
+Обработчики событий движка (before/after_cursor_execute) считают выполненные запросы и время
+в БД и записывают их в QueryStats текущего запроса - он передаётся через contextvars, поэтому
+доступен и в потоках пула, и в greenlet-ах aiosqlite. Итог отдаётся клиенту в заголовке
+Server-Timing (gRPC - в trailing metadata server-timing), запросы дольше SLOW_QUERY_MS
+пишутся в лог вместе с маршрутом или методом RPC.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Порог медленного запроса в мс; 0 отключает лог
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+	# Маршрут или метод RPC; для REST вычисляется при первом обращении, после маршрутизации
+	route: Union[str, Callable[[], str]] = "-"
+	count: int = 0
+	duration: float = 0.0  # секунды
+
+	@property
+	def route_name(self) -> str:
+		return self.route() if callable(self.route) else self.route
+
+	def server_timing(self) -> str:
+		return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("glossary_query_stats", default=None)
+
+
+@contextmanager
+def track_queries(stats: QueryStats) -> Iterator[QueryStats]:
+	"""Учитывать в stats запросы к БД, выполненные внутри блока (в том числе в run_sync и потоках пула)
+
+	Для потоковых ответов блок охватывает получение каждого сообщения, а не весь поток:
+	генератор может быть закрыт в другом контексте
+	"""
+	token = _current.set(stats)
+	try:
+		yield stats
+	finally:
+		_current.reset(token)
+
+
+def trailing_metadata(context, stats: QueryStats) -> None:
+	"""Добавить server-timing в trailing metadata RPC"""
+	context.set_trailing_metadata((*(context.trailing_metadata() or ()), ("server-timing", stats.server_timing())))
+
+
+def install_query_hooks(sync_engine: Engine) -> None:
+	@event.listens_for(sync_engine, "before_cursor_execute")
+	def _start(_connection, _cursor, _statement, _parameters, context, _executemany):
+		if _current.get() is not None:
+			context._glossary_started = time.perf_counter()
+
+	@event.listens_for(sync_engine, "after_cursor_execute")
+	def _finish(_connection, _cursor, statement, _parameters, context, _executemany):
+		stats = _current.get()
+		started = getattr(context, "_glossary_started", None)
+		if stats is None or started is None:
+			return
+		elapsed = time.perf_counter() - started
+		stats.count += 1
+		stats.duration += elapsed
+		if SLOW_QUERY_MS > 0 and elapsed * 1000 >= SLOW_QUERY_MS:
+			logger.warning("Slow query %.1f ms in %s: %s", elapsed * 1000, stats.route_name, " ".join(statement.split()))
@@ -0,0 +1,153 @@
+"""
+Связи между терминами: создание, выборка вместе с ключевыми словами обоих терминов одним
+JOIN-запросом и индексы таблицы termrelation
+
+Уникальность (source_id, target_id, relation_type) обеспечивает индекс ix_termrelation_edge,
+поэтому связь создаётся одним INSERT ... ON CONFLICT DO NOTHING без предварительной проверки
+и одновременные запросы не создают дубликатов.
+"""
+import logging
+from typing import Optional, Sequence
+
+from sqlalchemy import Row, delete, func, or_, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from .events import record_relations_added, record_relations_deleted
+from .models import Term, TermRelation
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+from .schemas import TermRelationCreate, TermRelationRead
+
+logger = logging.getLogger(__name__)
+
+# Индексы по отдельным source_id и target_id из прежней схемы: их заменили составные индексы
+_LEGACY_INDEXES = ("ix_termrelation_source_id", "ix_termrelation_target_id")
+# Столбцы уникального индекса - цель ON CONFLICT
+EDGE_COLUMNS = (TermRelation.source_id, TermRelation.target_id, TermRelation.relation_type)
+
+SourceTerm = aliased(Term, name="source_term")
+TargetTerm = aliased(Term, name="target_term")
+
+
+def relations_query(term_id: Optional[int] = None, relation_types: Optional[Sequence[str]] = None):
+	"""SELECT связей с keyword источника и цели; опционально только связи термина и заданных типов"""
+	query = (
+		select(
+			TermRelation.id,
+			TermRelation.source_id,
+			TermRelation.target_id,
+			TermRelation.relation_type,
+			TermRelation.description,
+			SourceTerm.keyword.label("source_keyword"),
+			TargetTerm.keyword.label("target_keyword"),
+		)
+		.join(SourceTerm, SourceTerm.id == TermRelation.source_id)
+		.join(TargetTerm, TargetTerm.id == TermRelation.target_id)
+	)
+	if term_id is not None:
+		query = query.where(or_(TermRelation.source_id == term_id, TermRelation.target_id == term_id))
+	if relation_types:
+		query = query.where(TermRelation.relation_type.in_(relation_types))
+	return query
+
+
+def _decode_relation_cursor(after: str) -> int:
+	value = decode_cursor(after)
+	if not value.isdigit():
+		raise InvalidCursor(f"Invalid cursor: {after!r}")
+	return int(value)
+
+
+def fetch_relations_page(
+	session: Session,
+	after: Optional[str],
+	limit: int,
+	term_id: Optional[int] = None,
+	relation_types: Optional[Sequence[str]] = None,
+) -> tuple[list[Row], Optional[str]]:
+	"""Страница связей в порядке id и курсор следующей страницы (None на последней)
+
+	Строки содержат поля TermRelationRead в том же порядке
+	"""
+	query = relations_query(term_id, relation_types).order_by(TermRelation.id)
+	if after:
+		query = query.where(TermRelation.id > _decode_relation_cursor(after))
+	rows = session.exec(query.limit(limit + 1)).all()
+	relations = rows[:limit]
+	next_cursor = encode_cursor(str(relations[-1].id)) if len(rows) > limit else None
+	return relations, next_cursor
+
+
+class TermNotFound(LookupError):
+	pass
+
+
+class SelfRelation(ValueError):
+	pass
+
+
+class RelationExists(Exception):
+	pass
+
+
+def init_relation_indexes(engine: Engine) -> None:
+	"""Индексы связей в БД, созданной до их появления
+
+	Перед созданием уникального индекса удаляются повторы (source_id, target_id, relation_type),
+	остаётся связь с наименьшим id; удаление записывается в журнал изменений
+	"""
+	with Session(engine) as session:
+		exists = session.exec(
+			text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ix_termrelation_edge'")
+		).first()
+		if exists:
+			return
+		kept = select(func.min(TermRelation.id)).group_by(*EDGE_COLUMNS)
+		duplicates = session.exec(
+			select(TermRelation.id, *EDGE_COLUMNS).where(TermRelation.id.not_in(kept))
+		).all()
+		if duplicates:
+			logger.warning("Removing %d duplicate relations before creating a unique index", len(duplicates))
+			session.exec(delete(TermRelation).where(TermRelation.id.not_in(kept)))
+			record_relations_deleted(session, [tuple(row) for row in duplicates])
+		connection = session.connection()
+		for index in TermRelation.__table__.indexes:
+			index.create(connection, checkfirst=True)
+		for name in _LEGACY_INDEXES:
+			connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+		session.commit()
+
+
+def insert_relation(session: Session, data: TermRelationCreate) -> TermRelationRead:
+	"""Создание связи: оба термина одним запросом и INSERT ... ON CONFLICT DO NOTHING RETURNING id"""
+	keywords = (data.source_keyword, data.target_keyword)
+	ids = dict(session.exec(select(Term.keyword, Term.id).where(Term.keyword.in_(keywords))).all())
+	for role, keyword in zip(("Source", "Target"), keywords):
+		if keyword not in ids:
+			raise TermNotFound(f"{role} term '{keyword}' not found")
+	source_id, target_id = ids[data.source_keyword], ids[data.target_keyword]
+	if source_id == target_id:
+		raise SelfRelation("Source and target terms cannot be the same")
+
+	relation_id = session.exec(
+		insert(TermRelation)
+		.values(source_id=source_id, target_id=target_id, relation_type=data.relation_type, description=data.description)
+		.on_conflict_do_nothing(index_elements=EDGE_COLUMNS)
+		.returning(TermRelation.id)
+	).scalar()
+	if relation_id is None:
+		session.rollback()
+		raise RelationExists("Relation already exists")
+	record_relations_added(session, [(relation_id, source_id, target_id, data.relation_type)])
+	session.commit()
+	return TermRelationRead(
+		id=relation_id,
+		source_id=source_id,
+		target_id=target_id,
+		relation_type=data.relation_type,
+		description=data.description,
+		source_keyword=data.source_keyword,
+		target_keyword=data.target_keyword
+	)
@@ -1,170 +1,343 @@
-from typing import List
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db import get_session
+from ..analytics import DEFAULT_ANALYTICS_LIMIT, MAX_ANALYTICS_LIMIT, graph_analytics
+from ..batch import IN_CHUNK_SIZE
+from ..db import get_async_read_session, get_async_session
+from ..graph_index import Edge, graph_index
+from ..http_cache import cached_json
+from ..layout import graph_layout
 from ..models import Term, TermRelation
-from ..schemas import TermRelationCreate, TermRelationRead, GraphData, GraphNode, GraphEdge
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from ..relations import (
+	RelationExists, SelfRelation, TermNotFound, fetch_relations_page, insert_relation, relations_query,
+)
+from ..serialization import RELATION_FIELDS, graph_json, rows_json
+from ..schemas import (
+	TermRelationCreate, TermRelationRead, GraphData, GraphCentrality, GraphComponent, GraphComponents,
+	GraphChanges, GraphLayoutView, GraphLink, GraphNeighborhood, GraphNodeRef, GraphPath, ImportResult, LayoutNode,
+	TermCentrality,
+)
+from ..transfer import NDJSON_MEDIA_TYPE, NDJSON_REQUEST, export_ndjson, import_ndjson, insert_relations_batch
+from ..versioning import VersionTooOld, fetch_changes, read_version
 
 router = APIRouter()
 
+Direction = Literal["out", "in", "both"]
+
+
+async def _term_id(session: AsyncSession, keyword: str) -> int:
+	term_id = (await session.exec(select(Term.id).where(Term.keyword == keyword))).first()
+	if term_id is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Term '{keyword}' not found")
+	return term_id
+
+
+async def _keywords(session: AsyncSession, ids: list[int]) -> dict[int, str]:
+	keywords: dict[int, str] = {}
+	for start in range(0, len(ids), IN_CHUNK_SIZE):
+		chunk = ids[start:start + IN_CHUNK_SIZE]
+		keywords.update((await session.exec(select(Term.id, Term.keyword).where(Term.id.in_(chunk)))).all())
+	return keywords
+
+
+def _links(edges: list[Edge]) -> list[GraphLink]:
+	return [GraphLink(source=source, target=target, relation_type=relation_type) for source, target, relation_type in edges]
+
 
 @router.post("/relations/", response_model=TermRelationRead, status_code=status.HTTP_201_CREATED)
-def create_relation(data: TermRelationCreate, session: Session = Depends(get_session)) -> TermRelation:
-	"""Создание связи между терминами"""
-	source_term = session.exec(select(Term).where(Term.keyword == data.source_keyword)).first()
-	if not source_term:
-		raise HTTPException(
-			status_code=status.HTTP_404_NOT_FOUND,
-			detail=f"Source term '{data.source_keyword}' not found"
-		)
-	
-	target_term = session.exec(select(Term).where(Term.keyword == data.target_keyword)).first()
-	if not target_term:
-		raise HTTPException(
-			status_code=status.HTTP_404_NOT_FOUND,
-			detail=f"Target term '{data.target_keyword}' not found"
-		)
-	
-	if source_term.id == target_term.id:
-		raise HTTPException(
-			status_code=status.HTTP_400_BAD_REQUEST,
-			detail="Source and target terms cannot be the same"
-		)
-	
-	# Проверка на существующую связь
-	existing = session.exec(
-		select(TermRelation).where(
-			TermRelation.source_id == source_term.id,
-			TermRelation.target_id == target_term.id,
-			TermRelation.relation_type == data.relation_type
-		)
-	).first()
-	if existing:
-		raise HTTPException(
-			status_code=status.HTTP_409_CONFLICT,
-			detail="Relation already exists"
+async def create_relation(data: TermRelationCreate, session: AsyncSession = Depends(get_async_session)) -> TermRelationRead:
+	"""Создание связи между терминами; повтор связи отклоняется уникальным индексом (409)"""
+	try:
+		return await session.run_sync(insert_relation, data)
+	except TermNotFound as exc:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+	except SelfRelation as exc:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+	except RelationExists as exc:
+		raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+
+def _relations_response(relations, next_cursor: Optional[str]) -> Response:
+	headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else {}
+	return Response(content=rows_json(RELATION_FIELDS, relations), media_type="application/json", headers=headers)
+
+
+@router.get("/relations/", response_model=List[TermRelationRead])
+async def list_relations(
+	relation_type: Optional[List[str]] = Query(default=None, description="Фильтр по типам связей"),
+	after: Optional[str] = Query(default=None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+	limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+	"""Получение списка связей (один JOIN-запрос на страницу)"""
+	try:
+		relations, next_cursor = await session.run_sync(
+			fetch_relations_page, after, limit, relation_types=relation_type
 		)
-	
-	relation = TermRelation(
-		source_id=source_term.id,
-		target_id=target_term.id,
-		relation_type=data.relation_type,
-		description=data.description
-	)
-	session.add(relation)
-	session.commit()
-	session.refresh(relation)
-	
-	# Загружаем связанные термины для ответа
-	session.refresh(relation.source_term)
-	session.refresh(relation.target_term)
-	
-	result = TermRelationRead(
-		id=relation.id,
-		source_id=relation.source_id,
-		target_id=relation.target_id,
-		relation_type=relation.relation_type,
-		description=relation.description,
-		source_keyword=relation.source_term.keyword,
-		target_keyword=relation.target_term.keyword
+	except InvalidCursor as exc:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+	return _relations_response(relations, next_cursor)
+
+
+@router.get(
+	"/relations/-/export",
+	response_class=StreamingResponse,
+	responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "Связи в формате TermRelationRead, по строке на связь"}},
+)
+async def export_relations() -> StreamingResponse:
+	"""Выгрузка всех связей в NDJSON потоком, в порядке id"""
+	return StreamingResponse(
+		export_ndjson(relations_query().order_by(TermRelation.id), RELATION_FIELDS),
+		media_type=NDJSON_MEDIA_TYPE,
+		headers={"Content-Disposition": 'attachment; filename="relations.ndjson"'}
 	)
-	return result
 
 
-@router.get("/relations/", response_model=List[TermRelationRead])
-def list_relations(session: Session = Depends(get_session)) -> List[TermRelationRead]:
-	"""Получение списка всех связей"""
-	relations = session.exec(select(TermRelation)).all()
-	result = []
-	for relation in relations:
-		session.refresh(relation.source_term)
-		session.refresh(relation.target_term)
-		result.append(TermRelationRead(
-			id=relation.id,
-			source_id=relation.source_id,
-			target_id=relation.target_id,
-			relation_type=relation.relation_type,
-			description=relation.description,
-			source_keyword=relation.source_term.keyword,
-			target_keyword=relation.target_term.keyword
-		))
-	return result
+@router.post("/relations/-/import", response_model=ImportResult, openapi_extra=NDJSON_REQUEST)
+async def import_relations(request: Request, session: AsyncSession = Depends(get_async_session)) -> ImportResult:
+	"""Импорт связей из NDJSON (объекты TermRelationCreate по строке) пакетами, с ошибками по номерам строк"""
+	return await import_ndjson(request.stream(), session, insert_relations_batch)
 
 
 @router.get("/relations/{term_keyword}", response_model=List[TermRelationRead])
-def get_term_relations(term_keyword: str, session: Session = Depends(get_session)) -> List[TermRelationRead]:
-	"""Получение всех связей для конкретного термина"""
-	term = session.exec(select(Term).where(Term.keyword == term_keyword)).first()
-	if not term:
+async def get_term_relations(
+	term_keyword: str,
+	relation_type: Optional[List[str]] = Query(default=None, description="Фильтр по типам связей"),
+	after: Optional[str] = Query(default=None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+	limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+	"""Получение всех связей для конкретного термина (исходящих и входящих) одним запросом"""
+	term_id = (await session.exec(select(Term.id).where(Term.keyword == term_keyword))).first()
+	if term_id is None:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Term not found")
-	
-	# Получаем исходящие и входящие связи
-	outgoing = session.exec(
-		select(TermRelation).where(TermRelation.source_id == term.id)
-	).all()
-	incoming = session.exec(
-		select(TermRelation).where(TermRelation.target_id == term.id)
-	).all()
-	
-	result = []
-	for relation in outgoing + incoming:
-		session.refresh(relation.source_term)
-		session.refresh(relation.target_term)
-		result.append(TermRelationRead(
-			id=relation.id,
-			source_id=relation.source_id,
-			target_id=relation.target_id,
-			relation_type=relation.relation_type,
-			description=relation.description,
-			source_keyword=relation.source_term.keyword,
-			target_keyword=relation.target_term.keyword
-		))
-	return result
+
+	try:
+		relations, next_cursor = await session.run_sync(
+			fetch_relations_page, after, limit, term_id=term_id, relation_types=relation_type
+		)
+	except InvalidCursor as exc:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+	return _relations_response(relations, next_cursor)
 
 
 @router.delete("/relations/{relation_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_relation(relation_id: int, session: Session = Depends(get_session)) -> None:
+async def delete_relation(relation_id: int, session: AsyncSession = Depends(get_async_session)) -> None:
 	"""Удаление связи"""
-	relation = session.get(TermRelation, relation_id)
+	relation = await session.get(TermRelation, relation_id)
 	if not relation:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Relation not found")
-	session.delete(relation)
-	session.commit()
+	await session.delete(relation)
+	await session.commit()
 	return None
 
 
 @router.get("/graph", response_model=GraphData)
-def get_graph_data(session: Session = Depends(get_session)) -> GraphData:
-	"""Получение данных графа для визуализации"""
-	# Получаем все термины
-	terms = session.exec(select(Term)).all()
-	
-	# Получаем все связи
-	relations = session.exec(select(TermRelation)).all()
-	
-	# Формируем узлы
-	nodes = [
-		GraphNode(
-			id=term.id,
-			keyword=term.keyword,
-			description=term.description,
-			source=term.source
-		)
-		for term in terms
-	]
-	
-	# Формируем рёбра
-	edges = [
-		GraphEdge(
-			id=relation.id,
-			source=relation.source_id,
-			target=relation.target_id,
-			relation_type=relation.relation_type,
-			description=relation.description
-		)
-		for relation in relations
-	]
-	
-	return GraphData(nodes=nodes, edges=edges)
+async def get_graph_data(
+	request: Request,
+	session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+	"""Получение данных графа для визуализации
+
+	ETag - версия глоссария: клиент с актуальной копией получает 304 без чтения таблиц,
+	тело (и его сжатые варианты) кэшируется до следующего изменения
+	"""
+	async def build() -> tuple[int, bytes, dict[str, str]]:
+		# cached_json выполняет build в одной транзакции чтения, поэтому версия соответствует данным
+		version = await session.run_sync(read_version)
+
+		# Строки сериализуются напрямую, без GraphNode/GraphEdge на каждую запись
+		terms = (await session.exec(select(Term.id, Term.keyword, Term.description, Term.source))).all()
+		relations = (await session.exec(select(
+			TermRelation.id,
+			TermRelation.source_id,
+			TermRelation.target_id,
+			TermRelation.relation_type,
+			TermRelation.description,
+		))).all()
+		return version, graph_json(terms, relations), {}
+
+	return await cached_json(request, session, "graph", build)
+
+
+@router.get("/neighbors/{keyword}", response_model=GraphNeighborhood)
+async def get_neighbors(
+	keyword: str,
+	depth: int = Query(default=1, ge=1, le=5),
+	types: Optional[List[str]] = Query(default=None, description="Типы связей для обхода (по умолчанию все)"),
+	direction: Direction = Query(default="both"),
+	limit: int = Query(default=1000, ge=1, le=10000, description="Максимум узлов в ответе"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphNeighborhood:
+	"""Окрестность термина радиуса depth по индексу смежности в памяти"""
+	await session.run_sync(graph_index.ensure_built)
+	root_id = await _term_id(session, keyword)
+	distances, edges, truncated = graph_index.neighborhood(root_id, depth, types, direction, limit)
+	keywords = await _keywords(session, list(distances))
+	return GraphNeighborhood(
+		root=keyword,
+		nodes=[
+			GraphNodeRef(id=node, keyword=keywords[node], depth=distance)
+			for node, distance in distances.items() if node in keywords
+		],
+		edges=_links(edges),
+		truncated=truncated
+	)
+
+
+@router.get("/path", response_model=GraphPath)
+async def get_path(
+	source: str = Query(alias="from"),
+	target: str = Query(alias="to"),
+	types: Optional[List[str]] = Query(default=None, description="Типы связей для обхода (по умолчанию все)"),
+	direction: Direction = Query(default="both"),
+	max_depth: int = Query(default=10, ge=1, le=50),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphPath:
+	"""Кратчайший путь между терминами (двунаправленный BFS по индексу в памяти)"""
+	await session.run_sync(graph_index.ensure_built)
+	source_id = await _term_id(session, source)
+	target_id = await _term_id(session, target)
+	path = graph_index.shortest_path(source_id, target_id, types, direction, max_depth)
+	if path is None:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Path not found")
+	nodes, edges = path
+	keywords = await _keywords(session, nodes)
+	return GraphPath(
+		length=len(edges),
+		nodes=[GraphNodeRef(id=node, keyword=keywords.get(node, ""), depth=index) for index, node in enumerate(nodes)],
+		edges=_links(edges)
+	)
+
+
+async def _central_terms(session: AsyncSession, metric: str, offset: int, limit: int) -> GraphCentrality:
+	metrics = await graph_analytics.metrics()
+	order = metrics.degree_order if metric == "degree" else metrics.pagerank_order
+	rows = order[offset:offset + limit].tolist()
+	keywords = await _keywords(session, [int(metrics.ids[row]) for row in rows])
+	terms = []
+	for row in rows:
+		term_id = int(metrics.ids[row])
+		if term_id not in keywords:
+			continue
+		terms.append(TermCentrality(
+			id=term_id,
+			keyword=keywords[term_id],
+			in_degree=int(metrics.in_degree[row]),
+			out_degree=int(metrics.out_degree[row]),
+			degree=int(metrics.in_degree[row] + metrics.out_degree[row]),
+			pagerank=float(metrics.pagerank[row]),
+			component=int(metrics.component[row]),
+		))
+	return GraphCentrality(version=metrics.version, metric=metric, total=len(metrics.ids), edges=metrics.edges, terms=terms)
+
+
+@router.get("/analytics/degree", response_model=GraphCentrality)
+async def get_degree_ranking(
+	limit: int = Query(default=DEFAULT_ANALYTICS_LIMIT, ge=1, le=MAX_ANALYTICS_LIMIT),
+	offset: int = Query(default=0, ge=0),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphCentrality:
+	"""Термины по убыванию числа связей (входящих и исходящих)"""
+	return await _central_terms(session, "degree", offset, limit)
+
+
+@router.get("/analytics/pagerank", response_model=GraphCentrality)
+async def get_pagerank_ranking(
+	limit: int = Query(default=DEFAULT_ANALYTICS_LIMIT, ge=1, le=MAX_ANALYTICS_LIMIT),
+	offset: int = Query(default=0, ge=0),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphCentrality:
+	"""Термины по убыванию PageRank (связь source -> target передаёт вес target)"""
+	return await _central_terms(session, "pagerank", offset, limit)
+
+
+@router.get("/analytics/components", response_model=GraphComponents)
+async def get_components(
+	min_size: int = Query(default=1, ge=1),
+	max_size: Optional[int] = Query(default=None, ge=1, description="Например, max_size=5 - только мелкие оторванные кластеры"),
+	limit: int = Query(default=DEFAULT_ANALYTICS_LIMIT, ge=1, le=MAX_ANALYTICS_LIMIT),
+	offset: int = Query(default=0, ge=0),
+	members: int = Query(default=20, ge=0, le=1000, description="Сколько ключевых слов перечислять для каждой компоненты"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphComponents:
+	"""Компоненты связности по убыванию размера"""
+	metrics = await graph_analytics.metrics()
+	sizes = metrics.component_sizes
+	selected = np.flatnonzero((sizes >= min_size) & (sizes <= (max_size or len(metrics.ids))))
+	page = selected[offset:offset + limit].tolist()
+	listed = {index: metrics.members(index)[:members].tolist() for index in page}
+	keywords = await _keywords(session, [term_id for ids in listed.values() for term_id in ids])
+	return GraphComponents(
+		version=metrics.version,
+		count=len(sizes),
+		largest=int(sizes[0]) if len(sizes) else 0,
+		isolated=int((sizes == 1).sum()),
+		matched=len(selected),
+		components=[
+			GraphComponent(
+				index=index,
+				size=int(sizes[index]),
+				keywords=[keywords[term_id] for term_id in ids if term_id in keywords],
+				truncated=int(sizes[index]) > len(ids),
+			)
+			for index, ids in listed.items()
+		]
+	)
+
+
+@router.get("/layout", response_model=GraphLayoutView)
+async def get_layout(
+	x0: Optional[float] = Query(default=None, description="Левая граница области"),
+	y0: Optional[float] = Query(default=None, description="Верхняя граница области"),
+	x1: Optional[float] = Query(default=None, description="Правая граница области"),
+	y1: Optional[float] = Query(default=None, description="Нижняя граница области"),
+	limit: int = Query(default=500, ge=1, le=10000, description="Максимум узлов; при превышении - самые важные"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphLayoutView:
+	"""Узлы с координатами серверной раскладки внутри прямоугольника (или во всём графе) и рёбра между ними
+
+	Уровень детализации задаётся limit: на мелком масштабе клиент запрашивает всю раскладку
+	с небольшим limit и получает самые важные узлы, при приближении - видимую область
+	"""
+	bounds = (x0, y0, x1, y1)
+	if any(value is None for value in bounds):
+		if any(value is not None for value in bounds):
+			raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="x0, y0, x1 and y1 must be given together")
+		bounds = None
+	elif x0 > x1 or y0 > y1:
+		raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty viewport")
+
+	await graph_layout.ensure_built()
+	view = graph_layout.viewport(bounds, limit)
+	keywords = await _keywords(session, [node[0] for node in view.nodes])
+	return GraphLayoutView(
+		version=view.version,
+		stale=view.stale,
+		bounds=list(view.bounds),
+		total=view.total,
+		truncated=view.total > len(view.nodes),
+		nodes=[
+			LayoutNode(id=node, keyword=keywords[node], x=x, y=y, importance=importance)
+			for node, x, y, importance in view.nodes if node in keywords
+		],
+		edges=_links(view.edges)
+	)
+
+
+@router.get("/changes", response_model=GraphChanges)
+async def get_graph_changes(
+	since: int = Query(ge=0, description="Версия графа, которая уже есть у клиента (X-Glossary-Version)"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> GraphChanges:
+	"""Изменения узлов и рёбер после версии since"""
+	try:
+		return await session.run_sync(fetch_changes, since)
+	except VersionTooOld as exc:
+		raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(exc))
@@ -1,48 +1,179 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db import get_session
+from ..batch import batch_get_terms, bulk_create_terms, bulk_delete_terms
+from ..cache import term_cache
+from ..db import get_async_read_session, get_async_session
+from ..fuzzy import DEFAULT_FUZZY_LIMIT, DEFAULT_SIMILARITY, DID_YOU_MEAN_LIMIT, MAX_FUZZY_LIMIT, trigram_index
+from ..http_cache import cached_json
 from ..models import Term
-from ..schemas import TermCreate, TermUpdate, TermRead
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, count_terms, fetch_terms_page
+from ..schemas import (
+	BulkResult, FuzzyMatch, ImportResult, KeywordBatch, TermBatchRead, TermBulkCreate, TermCreate, TermFuzzyResult, TermUpdate,
+	TermRead, TermSearchResult, TermSuggestions,
+)
+from ..search import search_terms
+from ..serialization import TERM_FIELDS, rows_json
+from ..suggest import DEFAULT_SUGGEST_LIMIT, MAX_SUGGEST_LIMIT, keyword_index
+from ..transfer import NDJSON_MEDIA_TYPE, NDJSON_REQUEST, export_ndjson, import_ndjson, insert_terms_batch
+from ..versioning import read_version
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TermRead])
-def list_terms(session: Session = Depends(get_session)) -> List[Term]:
-	return session.exec(select(Term).order_by(Term.keyword)).all()
+async def list_terms(
+	request: Request,
+	after: Optional[str] = Query(default=None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+	limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+	include_total: bool = Query(default=True, description="Вернуть общее количество в X-Total-Count"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> Response:
+	"""Страница терминов; ETag - версия глоссария и параметры страницы"""
+	async def build() -> tuple[int, bytes, dict[str, str]]:
+		version = await session.run_sync(read_version)
+		try:
+			terms, next_cursor = await session.run_sync(fetch_terms_page, after, limit)
+		except InvalidCursor as exc:
+			raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+		headers = {}
+		if next_cursor is not None:
+			headers["X-Next-Cursor"] = next_cursor
+		if include_total:
+			headers["X-Total-Count"] = str(await session.run_sync(count_terms))
+		return version, rows_json(TERM_FIELDS, terms), headers
 
+	variant = f"after={after or ''}&limit={limit}&include_total={int(include_total)}"
+	return await cached_json(request, session, "terms", build, variant)
 
-@router.get("/{keyword}", response_model=TermRead)
-def get_term(keyword: str, session: Session = Depends(get_session)) -> Term:
-	term = session.exec(select(Term).where(Term.keyword == keyword)).first()
+
+@router.get("/-/search", response_model=TermSearchResult)
+async def search(
+	q: str = Query(min_length=1, max_length=256, description="Слова для поиска в keyword и description"),
+	limit: int = Query(default=20, ge=1, le=100),
+	offset: int = Query(default=0, ge=0, le=10000),
+	highlight: bool = Query(default=True, description="Добавить выделение совпадений <mark>...</mark>"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> TermSearchResult:
+	"""Полнотекстовый поиск (FTS5, ранжирование BM25)"""
+	hits, next_offset = await session.run_sync(search_terms, q, limit, offset, highlight)
+	return TermSearchResult(query=q, hits=hits, next_offset=next_offset)
+
+
+@router.get("/-/suggest", response_model=TermSuggestions)
+async def suggest(
+	prefix: str = Query(min_length=1, max_length=128, description="Начало ключевого слова (без учёта регистра)"),
+	limit: int = Query(default=DEFAULT_SUGGEST_LIMIT, ge=1, le=MAX_SUGGEST_LIMIT),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> TermSuggestions:
+	"""Автодополнение ключевых слов из индекса в памяти, без обращения к БД"""
+	await session.run_sync(keyword_index.ensure_built)
+	return TermSuggestions(prefix=prefix, suggestions=keyword_index.suggest(prefix, limit))
+
+
+@router.get("/-/fuzzy", response_model=TermFuzzyResult)
+async def fuzzy(
+	q: str = Query(min_length=1, max_length=128, description="Ключевое слово, возможно с опечаткой"),
+	limit: int = Query(default=DEFAULT_FUZZY_LIMIT, ge=1, le=MAX_FUZZY_LIMIT),
+	threshold: float = Query(default=DEFAULT_SIMILARITY, ge=0.05, le=1.0, description="Минимальное сходство"),
+	session: AsyncSession = Depends(get_async_read_session),
+) -> TermFuzzyResult:
+	"""Нечёткий поиск ключевых слов по триграммам, по убыванию сходства"""
+	await session.run_sync(trigram_index.ensure_built)
+	matches = trigram_index.search(q, limit, threshold)
+	return TermFuzzyResult(
+		query=q,
+		matches=[FuzzyMatch(keyword=keyword, similarity=similarity) for keyword, similarity in matches]
+	)
+
+
+@router.get(
+	"/-/export",
+	response_class=StreamingResponse,
+	responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "Термины в формате TermRead, по строке на термин"}},
+)
+async def export_terms() -> StreamingResponse:
+	"""Выгрузка всех терминов в NDJSON потоком, в порядке id"""
+	query = select(Term.id, Term.keyword, Term.description, Term.source).order_by(Term.id)
+	return StreamingResponse(
+		export_ndjson(query, TERM_FIELDS),
+		media_type=NDJSON_MEDIA_TYPE,
+		headers={"Content-Disposition": 'attachment; filename="terms.ndjson"'}
+	)
+
+
+@router.post("/-/import", response_model=ImportResult, openapi_extra=NDJSON_REQUEST)
+async def import_terms(request: Request, session: AsyncSession = Depends(get_async_session)) -> ImportResult:
+	"""Импорт терминов из NDJSON (объекты TermCreate по строке) пакетами, с ошибками по номерам строк"""
+	return await import_ndjson(request.stream(), session, insert_terms_batch)
+
+
+@router.get(
+	"/{keyword}",
+	response_model=TermRead,
+	responses={404: {"description": "Термин не найден; did_you_mean - похожие ключевые слова"}},
+)
+async def get_term(keyword: str, session: AsyncSession = Depends(get_async_read_session)) -> TermRead:
+	cached = term_cache.get(keyword)
+	if cached is not None:
+		return cached
+	generation = term_cache.generation
+	term = (await session.exec(select(Term).where(Term.keyword == keyword))).first()
 	if not term:
-		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Term not found")
-	return term
+		await session.run_sync(trigram_index.ensure_built)
+		candidates = [match for match, _ in trigram_index.search(keyword, DID_YOU_MEAN_LIMIT)]
+		return JSONResponse(
+			status_code=status.HTTP_404_NOT_FOUND,
+			content={"detail": "Term not found", "did_you_mean": candidates}
+		)
+	result = TermRead.model_validate(term)
+	term_cache.set(keyword, result, generation)
+	return result
 
 
 @router.post("/", response_model=TermRead, status_code=status.HTTP_201_CREATED)
-def create_term(data: TermCreate, session: Session = Depends(get_session)) -> Term:
-	existing = session.exec(select(Term).where(Term.keyword == data.keyword)).first()
+async def create_term(data: TermCreate, session: AsyncSession = Depends(get_async_session)) -> Term:
+	existing = (await session.exec(select(Term).where(Term.keyword == data.keyword))).first()
 	if existing:
 		raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Term already exists")
 	term = Term(keyword=data.keyword, description=data.description, source=data.source)
 	session.add(term)
-	session.commit()
-	session.refresh(term)
+	await session.commit()
+	await session.refresh(term)
 	return term
 
 
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create(data: TermBulkCreate, session: AsyncSession = Depends(get_async_session)) -> BulkResult:
+	"""Пакетное создание терминов в одной транзакции с результатом по каждому элементу"""
+	return BulkResult(results=await session.run_sync(bulk_create_terms, data.terms))
+
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete(data: KeywordBatch, session: AsyncSession = Depends(get_async_session)) -> BulkResult:
+	"""Пакетное удаление терминов по ключевым словам"""
+	return BulkResult(results=await session.run_sync(bulk_delete_terms, data.keywords))
+
+
+@router.post("/batch-get", response_model=TermBatchRead)
+async def batch_get(data: KeywordBatch, session: AsyncSession = Depends(get_async_read_session)) -> TermBatchRead:
+	"""Получение нескольких терминов за один запрос"""
+	terms, missing = await session.run_sync(batch_get_terms, data.keywords)
+	return TermBatchRead(terms=terms, missing=missing)
+
+
 @router.put("/{keyword}", response_model=TermRead)
-def update_term(keyword: str, data: TermUpdate, session: Session = Depends(get_session)) -> Term:
-	term = session.exec(select(Term).where(Term.keyword == keyword)).first()
+async def update_term(keyword: str, data: TermUpdate, session: AsyncSession = Depends(get_async_session)) -> Term:
+	term = (await session.exec(select(Term).where(Term.keyword == keyword))).first()
 	if not term:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Term not found")
 
 	if data.keyword is not None:
-		conflict = session.exec(select(Term).where(Term.keyword == data.keyword, Term.id != term.id)).first()
+		conflict = (await session.exec(select(Term).where(Term.keyword == data.keyword, Term.id != term.id))).first()
 		if conflict:
 			raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Keyword already in use")
 		term.keyword = data.keyword
@@ -52,16 +183,16 @@ def update_term(keyword: str, data: TermUpdate, session: Session = Depends(get_s
 		term.source = data.source
 
 	session.add(term)
-	session.commit()
-	session.refresh(term)
+	await session.commit()
+	await session.refresh(term)
 	return term
 
 
 @router.delete("/{keyword}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_term(keyword: str, session: Session = Depends(get_session)) -> None:
-	term = session.exec(select(Term).where(Term.keyword == keyword)).first()
+async def delete_term(keyword: str, session: AsyncSession = Depends(get_async_session)) -> None:
+	term = (await session.exec(select(Term).where(Term.keyword == keyword))).first()
 	if not term:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Term not found")
-	session.delete(term)
-	session.commit()
+	await session.delete(term)
+	await session.commit()
 	return None
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -23,6 +23,80 @@ class TermRead(BaseModel):
 	source: Optional[str] = None
 
 
+class TermSearchHit(TermRead):
+	"""Результат полнотекстового поиска"""
+	score: float = Field(description="Релевантность BM25, больше - лучше")
+	keyword_highlight: Optional[str] = Field(default=None, description="keyword с выделенными совпадениями")
+	snippet: Optional[str] = Field(default=None, description="Фрагмент description с выделенными совпадениями")
+
+
+class TermSearchResult(BaseModel):
+	query: str
+	hits: list[TermSearchHit]
+	next_offset: Optional[int] = Field(default=None, description="offset следующей страницы, если она есть")
+
+
+class TermSuggestions(BaseModel):
+	prefix: str
+	suggestions: list[str] = Field(description="Ключевые слова, начинающиеся с prefix, по алфавиту")
+
+
+class FuzzyMatch(BaseModel):
+	keyword: str
+	similarity: float = Field(description="Доля общих триграмм, от 0 до 1")
+
+
+class TermFuzzyResult(BaseModel):
+	query: str
+	matches: list[FuzzyMatch]
+
+
+# Ограничение на размер одного пакетного запроса
+MAX_BATCH_SIZE = 5000
+
+
+class TermBulkCreate(BaseModel):
+	"""Пакетное создание терминов; элементы валидируются по отдельности, чтобы ошибка одного не отменяла пакет"""
+	terms: list[dict[str, Any]] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class KeywordBatch(BaseModel):
+	keywords: list[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class BulkItemResult(BaseModel):
+	"""Результат обработки одного элемента пакета"""
+	keyword: Optional[str] = None
+	status: str = Field(description="created, deleted, conflict, not_found или error")
+	term: Optional[TermRead] = None
+	detail: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+	results: list[BulkItemResult]
+
+
+class TermBatchRead(BaseModel):
+	terms: list[TermRead]
+	missing: list[str]
+
+
+class ImportFailure(BaseModel):
+	"""Строка NDJSON, которая не была импортирована"""
+	line: int = Field(description="Номер строки, с 1")
+	status: str = Field(description="conflict, not_found или error")
+	item: Optional[str] = Field(default=None, description="keyword термина или 'source -> target (type)' связи")
+	detail: str
+
+
+class ImportResult(BaseModel):
+	lines: int = Field(description="Непустых строк во входных данных")
+	created: int
+	failed: int
+	failures: list[ImportFailure] = Field(description="Первые строки с ошибками, не больше MAX_IMPORT_FAILURES")
+	truncated: bool = Field(default=False, description="Строк с ошибками больше, чем перечислено в failures")
+
+
 class TermRelationCreate(BaseModel):
 	source_keyword: str = Field(min_length=1, max_length=128, description="Ключевое слово термина-источника")
 	target_keyword: str = Field(min_length=1, max_length=128, description="Ключевое слово термина-цели")
@@ -61,4 +135,98 @@ class GraphEdge(BaseModel):
 class GraphData(BaseModel):
 	"""Данные графа для фронтенда"""
 	nodes: list[GraphNode]
-	edges: list[GraphEdge]
\ No newline at end of file
+	edges: list[GraphEdge]
+
+
+class GraphNodeRef(BaseModel):
+	"""Узел результата обхода графа"""
+	id: int
+	keyword: str
+	depth: int = Field(description="Расстояние от начального узла")
+
+
+class GraphLink(BaseModel):
+	"""Ребро результата обхода графа"""
+	source: int
+	target: int
+	relation_type: str
+
+
+class GraphNeighborhood(BaseModel):
+	root: str
+	nodes: list[GraphNodeRef]
+	edges: list[GraphLink]
+	truncated: bool = Field(description="Окрестность обрезана по limit")
+
+
+class GraphPath(BaseModel):
+	length: int
+	nodes: list[GraphNodeRef]
+	edges: list[GraphLink]
+
+
+class TermCentrality(BaseModel):
+	id: int
+	keyword: str
+	in_degree: int
+	out_degree: int
+	degree: int
+	pagerank: float
+	component: int = Field(description="Номер компоненты связности (0 - самая большая)")
+
+
+class GraphCentrality(BaseModel):
+	"""Самые центральные термины по выбранной метрике"""
+	version: int
+	metric: str
+	total: int = Field(description="Всего терминов")
+	edges: int
+	terms: list[TermCentrality]
+
+
+class GraphComponent(BaseModel):
+	index: int = Field(description="Номер компоненты (по убыванию размера)")
+	size: int
+	keywords: list[str]
+	truncated: bool = Field(description="Перечислены не все термины компоненты")
+
+
+class GraphComponents(BaseModel):
+	"""Компоненты слабой связности: основной граф и оторванные от него кластеры"""
+	version: int
+	count: int = Field(description="Всего компонент")
+	largest: int = Field(description="Размер самой большой компоненты")
+	isolated: int = Field(description="Терминов без связей")
+	matched: int = Field(description="Компонент, подходящих под фильтр размера")
+	components: list[GraphComponent]
+
+
+class LayoutNode(BaseModel):
+	"""Узел с координатами серверной раскладки"""
+	id: int
+	keyword: str
+	x: float
+	y: float
+	importance: float = Field(description="Важность узла (число соседей); при ограничении limit отдаются самые важные")
+
+
+class GraphLayoutView(BaseModel):
+	"""Узлы и рёбра видимой области графа"""
+	version: int = Field(description="Версия глоссария, для которой рассчитана раскладка")
+	stale: bool = Field(description="После расчёта были изменения: новые узлы размещены приблизительно, идёт пересчёт")
+	bounds: list[float] = Field(description="Границы всей раскладки [x0, y0, x1, y1]")
+	total: int = Field(description="Сколько узлов попало в область")
+	truncated: bool
+	nodes: list[LayoutNode]
+	edges: list[GraphLink]
+
+
+class GraphChanges(BaseModel):
+	"""Изменения графа между версиями since и version"""
+	since: int
+	version: int
+	nodes_added: list[GraphNode]
+	nodes_updated: list[GraphNode]
+	nodes_deleted: list[int]
+	edges_added: list[GraphEdge]
+	edges_deleted: list[int]
@@ -0,0 +1,126 @@
+"""
+Полнотекстовый поиск по терминам на SQLite FTS5
+
+term_fts - внешняя FTS5-таблица над term (content='term'), синхронизируется триггерами,
+поэтому в индекс попадают и ORM-записи, и пакетные Core-запросы. Ранжирование - BM25
+с большим весом совпадений в keyword.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from .schemas import TermSearchHit
+
+# Вес совпадения в keyword относительно description
+KEYWORD_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+# prefix='2 3' - отдельные индексы коротких префиксов, чтобы запрос "ку*" не перебирал весь словарь
+_FTS_DDL = [
+	"""
+	CREATE VIRTUAL TABLE IF NOT EXISTS term_fts USING fts5(
+		keyword, description,
+		content='term', content_rowid='id',
+		tokenize='unicode61 remove_diacritics 2',
+		prefix='2 3'
+	)
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS term_fts_insert AFTER INSERT ON term BEGIN
+		INSERT INTO term_fts(rowid, keyword, description) VALUES (new.id, new.keyword, new.description);
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS term_fts_delete AFTER DELETE ON term BEGIN
+		INSERT INTO term_fts(term_fts, rowid, keyword, description) VALUES ('delete', old.id, old.keyword, old.description);
+	END
+	""",
+	"""
+	CREATE TRIGGER IF NOT EXISTS term_fts_update AFTER UPDATE OF keyword, description ON term BEGIN
+		INSERT INTO term_fts(term_fts, rowid, keyword, description) VALUES ('delete', old.id, old.keyword, old.description);
+		INSERT INTO term_fts(rowid, keyword, description) VALUES (new.id, new.keyword, new.description);
+	END
+	""",
+]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def init_search(engine: Engine) -> None:
+	"""Создание FTS5-таблицы и триггеров; при первом создании индекс заполняется из term"""
+	with engine.begin() as connection:
+		exists = connection.execute(
+			text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'term_fts'")
+		).first()
+		for ddl in _FTS_DDL:
+			connection.execute(text(ddl))
+		# Ранжирование по умолчанию для ORDER BY rank (использует оптимизированный путь FTS5)
+		connection.execute(text(
+			f"INSERT INTO term_fts(term_fts, rank) VALUES ('rank', 'bm25({KEYWORD_WEIGHT}, {DESCRIPTION_WEIGHT})')"
+		))
+		if not exists:
+			connection.execute(text("INSERT INTO term_fts(term_fts) VALUES ('rebuild')"))
+
+
+def build_match_query(query: str) -> Optional[str]:
+	"""Пользовательский ввод -> выражение MATCH: все слова обязательны, последнее - как префикс"""
+	tokens = _TOKEN_RE.findall(query)
+	if not tokens:
+		return None
+	quoted = ['"' + token.replace('"', '""') + '"' for token in tokens]
+	quoted[-1] += "*"
+	return " ".join(quoted)
+
+
+def search_terms(
+	session: Session,
+	query: str,
+	limit: int,
+	offset: int = 0,
+	highlight: bool = True,
+) -> tuple[list[TermSearchHit], Optional[int]]:
+	"""Страница результатов по убыванию релевантности и смещение следующей страницы"""
+	match = build_match_query(query)
+	if match is None:
+		return [], None
+
+	columns = "term.id, term.keyword, term.description, term.source, term_fts.rank"
+	if highlight:
+		columns += (
+			", highlight(term_fts, 0, :open, :close)"
+			", snippet(term_fts, 1, :open, :close, '…', 24)"
+		)
+	rows = session.exec(
+		text(
+			f"SELECT {columns} FROM term_fts JOIN term ON term.id = term_fts.rowid "
+			"WHERE term_fts MATCH :match ORDER BY term_fts.rank LIMIT :limit OFFSET :offset"
+		),
+		params={
+			"match": match,
+			"limit": limit + 1,
+			"offset": offset,
+			"open": HIGHLIGHT_OPEN,
+			"close": HIGHLIGHT_CLOSE,
+		},
+	).all()
+
+	hits = [
+		TermSearchHit(
+			id=row[0],
+			keyword=row[1],
+			description=row[2],
+			source=row[3],
+			# bm25 в FTS5 отрицателен: чем меньше, тем релевантнее
+			score=-row[4],
+			keyword_highlight=row[5] if highlight else None,
+			snippet=row[6] if highlight else None,
+		)
+		for row in rows[:limit]
+	]
+	next_offset = offset + limit if len(rows) > limit else None
+	return hits, next_offset
@@ -0,0 +1,42 @@
+"""
+Сериализация больших списков прямо из строк SQL в JSON-байты
+
+Списки терминов, связей и граф отдаются без создания Pydantic-модели на каждую строку:
+кортежи строк превращаются в словари с полями в порядке схем (TermRead, TermRelationRead,
+GraphNode, GraphEdge) и сериализуются orjson. Формат ответа совпадает со схемами.
+"""
+import json
+from typing import Any, Iterable, Sequence
+
+try:
+	import orjson
+except ImportError:  # без orjson используется стандартный json (медленнее, тот же формат)
+	orjson = None
+
+TERM_FIELDS = ("id", "keyword", "description", "source")
+RELATION_FIELDS = ("id", "source_id", "target_id", "relation_type", "description", "source_keyword", "target_keyword")
+GRAPH_NODE_FIELDS = TERM_FIELDS
+GRAPH_EDGE_FIELDS = ("id", "source", "target", "relation_type", "description")
+
+
+def dumps(value: Any) -> bytes:
+	if orjson is not None:
+		return orjson.dumps(value)
+	return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def row_dicts(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+	return [dict(zip(fields, row)) for row in rows]
+
+
+def rows_json(fields: Sequence[str], rows: Iterable[Sequence[Any]]) -> bytes:
+	"""JSON-массив объектов из кортежей строк (порядок значений - как в fields)"""
+	return dumps(row_dicts(fields, rows))
+
+
+def graph_json(term_rows: Iterable[Sequence[Any]], relation_rows: Iterable[Sequence[Any]]) -> bytes:
+	"""Тело GraphData из строк (id, keyword, description, source) и (id, source_id, target_id, relation_type, description)"""
+	return dumps({
+		"nodes": row_dicts(GRAPH_NODE_FIELDS, term_rows),
+		"edges": row_dicts(GRAPH_EDGE_FIELDS, relation_rows),
+	})
@@ -0,0 +1,171 @@
+"""
+Индекс автодополнения ключевых слов в памяти процесса
+
+Ключевые слова хранятся в отсортированном по casefold() массиве; подсказки для префикса -
+непрерывный отрезок массива, который находится двоичным поиском, поэтому время запроса
+O(log n + limit) и не зависит от числа подходящих терминов. Индекс собирается из таблицы term
+при старте и обновляется по событиям изменения терминов.
+"""
+import threading
+from bisect import bisect_left
+from typing import Iterable
+
+from sqlmodel import Session, select
+
+from .events import ChangeSet, subscribe, subscribe_reset
+from .models import Term
+
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+# Пакеты от этого размера вливаются в индекс одним проходом, меньшие - вставкой по одному
+MERGE_MIN_BATCH = 64
+
+
+class KeywordIndex:
+	def __init__(self) -> None:
+		self._lock = threading.RLock()
+		self._build_lock = threading.Lock()
+		self._built = False
+		self._building = False
+		self._queued: list[ChangeSet] = []
+		# Параллельные массивы: ключ сортировки (casefold) и исходное ключевое слово.
+		# Если keyword уже в нижнем регистре, оба массива ссылаются на одну строку
+		self._keys: list[str] = []
+		self._keywords: list[str] = []
+
+	@property
+	def built(self) -> bool:
+		return self._built
+
+	def __len__(self) -> int:
+		return len(self._keys)
+
+	def build(self, session: Session) -> None:
+		"""Полная сборка индекса из таблицы терминов"""
+		with self._lock:
+			self._building = True
+			self._queued = []
+		try:
+			keywords = list(session.exec(select(Term.keyword).execution_options(yield_per=10000)))
+			keywords.sort()
+			keywords.sort(key=str.casefold)
+		except Exception:
+			with self._lock:
+				self._building = False
+			raise
+
+		with self._lock:
+			self._keywords = keywords
+			self._keys = [_entry(keyword)[0] for keyword in keywords]
+			self._built = True
+			self._building = False
+			for changes in self._queued:
+				self._apply(changes)
+			self._queued = []
+
+	def ensure_built(self, session: Session) -> None:
+		if self._built:
+			return
+		with self._build_lock:
+			if not self._built:
+				self.build(session)
+
+	def rebuild(self, session: Session) -> None:
+		"""Пересборка после пропущенных изменений; несобранный индекс соберётся при первом запросе"""
+		if self._built:
+			with self._build_lock:
+				self.build(session)
+
+	def suggest(self, prefix: str, limit: int = DEFAULT_SUGGEST_LIMIT) -> list[str]:
+		"""Не более limit ключевых слов, начинающихся с prefix (без учёта регистра), по алфавиту"""
+		key = prefix.casefold()
+		with self._lock:
+			start = bisect_left(self._keys, key)
+			end = min(start + limit, len(self._keys))
+			result = []
+			for position in range(start, end):
+				if not self._keys[position].startswith(key):
+					break
+				result.append(self._keywords[position])
+			return result
+
+	# --- инкрементальные обновления ---
+
+	def on_changes(self, changes: ChangeSet) -> None:
+		with self._lock:
+			if self._building:
+				self._queued.append(changes)
+			elif self._built:
+				self._apply(changes)
+
+	def _apply(self, changes: ChangeSet) -> None:
+		self.remove(changes.terms_deleted.values())
+		self.remove(old for old, new in changes.terms_updated.values() if old != new)
+		self.add(new for old, new in changes.terms_updated.values() if old != new)
+		self.add(changes.terms_added.values())
+
+	def _position(self, key: str, keyword: str, start: int = 0) -> int:
+		position = bisect_left(self._keys, key, start)
+		while position < len(self._keys) and self._keys[position] == key and self._keywords[position] < keyword:
+			position += 1
+		return position
+
+	def _found(self, position: int, key: str, keyword: str) -> bool:
+		return position < len(self._keys) and self._keys[position] == key and self._keywords[position] == keyword
+
+	def add(self, keywords: Iterable[str]) -> None:
+		entries = sorted(set(map(_entry, keywords)))
+		with self._lock:
+			if len(entries) < MERGE_MIN_BATCH:
+				for key, keyword in entries:
+					position = self._position(key, keyword)
+					if not self._found(position, key, keyword):
+						self._keys.insert(position, key)
+						self._keywords.insert(position, keyword)
+				return
+			# Отсортированный пакет вливается за один проход: отрезки между вставками копируются срезами
+			keys, words, start = [], [], 0
+			for key, keyword in entries:
+				position = self._position(key, keyword, start)
+				if self._found(position, key, keyword):
+					continue
+				keys += self._keys[start:position]
+				words += self._keywords[start:position]
+				keys.append(key)
+				words.append(keyword)
+				start = position
+			keys += self._keys[start:]
+			words += self._keywords[start:]
+			self._keys, self._keywords = keys, words
+
+	def remove(self, keywords: Iterable[str]) -> None:
+		entries = sorted(set(map(_entry, keywords)))
+		with self._lock:
+			if len(entries) < MERGE_MIN_BATCH:
+				for key, keyword in entries:
+					position = self._position(key, keyword)
+					if self._found(position, key, keyword):
+						del self._keys[position]
+						del self._keywords[position]
+				return
+			keys, words, start = [], [], 0
+			for key, keyword in entries:
+				position = self._position(key, keyword, start)
+				if not self._found(position, key, keyword):
+					continue
+				keys += self._keys[start:position]
+				words += self._keywords[start:position]
+				start = position + 1
+			keys += self._keys[start:]
+			words += self._keywords[start:]
+			self._keys, self._keywords = keys, words
+
+
+def _entry(keyword: str) -> tuple[str, str]:
+	key = keyword.casefold()
+	return (keyword, keyword) if key == keyword else (key, keyword)
+
+
+keyword_index = KeywordIndex()
+subscribe(keyword_index.on_changes)
+subscribe_reset(keyword_index.rebuild)
@@ -0,0 +1,265 @@
+"""
+Импорт и экспорт терминов и связей в NDJSON (один JSON-объект на строку)
+
+Импорт читает тело запроса по мере поступления: строки разбираются по одной, накапливаются
+в пакеты по IMPORT_BATCH_SIZE и вставляются одним многострочным INSERT на пакет, каждый пакет -
+отдельная транзакция. Поэтому память и длительность блокировки записи не зависят от размера
+файла, а при обрыве соединения остаются уже закоммиченные пакеты. Ошибки возвращаются
+по номерам строк.
+
+Экспорт отдаёт строки по мере чтения серверного курсора (yield_per), без списка всех записей.
+Формат строк экспорта - TermRead и TermRelationRead, поэтому выгрузку можно импортировать
+обратно (лишние поля вроде id игнорируются).
+"""
+import json
+import os
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Optional, Sequence
+
+from pydantic import ValidationError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .batch import error_detail, in_chunks
+from .db import async_read_engine
+from .events import record_relations_added, record_terms_added
+from .models import Term, TermRelation
+from .relations import EDGE_COLUMNS
+from .schemas import ImportFailure, ImportResult, TermCreate, TermRelationCreate
+from .serialization import dumps
+
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+IMPORT_BATCH_SIZE = int(os.getenv("GLOSSARY_IMPORT_BATCH_SIZE", "1000"))
+EXPORT_CHUNK_SIZE = 1000
+# Строка длиннее не разбирается: термин с максимальными полями занимает несколько КБ
+MAX_LINE_BYTES = 64 * 1024
+MAX_IMPORT_FAILURES = 1000
+# Тело запросов импорта в OpenAPI: обработчики читают его сами, без модели FastAPI
+NDJSON_REQUEST = {
+	"requestBody": {"required": True, "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}}}
+}
+
+# (номер строки, статус, термин или связь, подробности); статус created - строка импортирована
+Outcome = tuple[int, str, Optional[str], Optional[str]]
+Batch = list[tuple[int, dict[str, Any]]]
+
+
+async def ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+	"""(номер строки, строка) по мере поступления тела; вместо слишком длинной строки - None"""
+	buffer = bytearray()
+	number = 0
+	overflow = False
+	async for chunk in chunks:
+		start = 0
+		while (end := chunk.find(b"\n", start)) >= 0:
+			number += 1
+			if not overflow:
+				buffer += chunk[start:end]
+			yield number, None if overflow or len(buffer) > MAX_LINE_BYTES else bytes(buffer)
+			buffer.clear()
+			overflow = False
+			start = end + 1
+		if not overflow:
+			buffer += chunk[start:]
+			# Остаток строки до перевода строки пропускается, не накапливаясь в памяти
+			if len(buffer) > MAX_LINE_BYTES:
+				overflow = True
+				buffer.clear()
+	if overflow or buffer.strip():
+		yield number + 1, None if overflow else bytes(buffer)
+
+
+def _loads(line: bytes) -> Any:
+	return orjson.loads(line) if orjson is not None else json.loads(line)
+
+
+class ImportReport:
+	def __init__(self) -> None:
+		self.lines = 0
+		self.created = 0
+		self.failed = 0
+		self.failures: list[ImportFailure] = []
+
+	def fail(self, line: int, status: str, item: Optional[str], detail: str) -> None:
+		self.failed += 1
+		if len(self.failures) < MAX_IMPORT_FAILURES:
+			self.failures.append(ImportFailure(line=line, status=status, item=item, detail=detail))
+
+	def parse(self, number: int, line: Optional[bytes]) -> Optional[dict[str, Any]]:
+		"""Объект строки; пустые строки пропускаются, ошибки разбора попадают в отчёт"""
+		if line is not None and not line.strip():
+			return None
+		self.lines += 1
+		if line is None:
+			self.fail(number, "error", None, f"Line is longer than {MAX_LINE_BYTES} bytes")
+			return None
+		try:
+			item = _loads(line)
+		except ValueError as exc:
+			self.fail(number, "error", None, f"Invalid JSON: {exc}")
+			return None
+		if not isinstance(item, dict):
+			self.fail(number, "error", None, "Line must be a JSON object")
+			return None
+		return item
+
+	def add(self, outcomes: list[Outcome]) -> None:
+		for line, status, item, detail in sorted(outcomes, key=lambda outcome: outcome[0]):
+			if status == "created":
+				self.created += 1
+			else:
+				self.fail(line, status, item, detail)
+
+	def result(self) -> ImportResult:
+		return ImportResult(
+			lines=self.lines,
+			created=self.created,
+			failed=self.failed,
+			failures=self.failures,
+			truncated=self.failed > len(self.failures)
+		)
+
+
+async def import_ndjson(
+	chunks: AsyncIterable[bytes],
+	session: AsyncSession,
+	insert_batch: Callable[[Session, Batch], list[Outcome]],
+) -> ImportResult:
+	"""Разбор тела NDJSON и вставка пакетами по IMPORT_BATCH_SIZE строк"""
+	report = ImportReport()
+	batch: Batch = []
+	async for number, line in ndjson_lines(chunks):
+		item = report.parse(number, line)
+		if item is None:
+			continue
+		batch.append((number, item))
+		if len(batch) >= IMPORT_BATCH_SIZE:
+			report.add(await session.run_sync(insert_batch, batch))
+			batch = []
+	if batch:
+		report.add(await session.run_sync(insert_batch, batch))
+	return report.result()
+
+
+def _validated(batch: Batch, schema, outcomes: list[Outcome], item_name: Callable[[dict], Optional[str]]) -> list:
+	valid = []
+	for line, item in batch:
+		try:
+			valid.append((line, schema.model_validate(item)))
+		except ValidationError as exc:
+			outcomes.append((line, "error", item_name(item), error_detail(exc)))
+	return valid
+
+
+def _keyword(item: dict) -> Optional[str]:
+	keyword = item.get("keyword")
+	return keyword if isinstance(keyword, str) else None
+
+
+def insert_terms_batch(session: Session, batch: Batch) -> list[Outcome]:
+	"""Вставка пакета терминов одной транзакцией; существующие ключевые слова - conflict
+
+	Существующие термины отсекает уникальный индекс (ON CONFLICT DO NOTHING), поэтому
+	одновременная запись того же keyword другим запросом не откатывает весь пакет
+	"""
+	outcomes: list[Outcome] = []
+	valid = _validated(batch, TermCreate, outcomes, _keyword)
+	rows, lines = [], {}
+	for line, data in valid:
+		if data.keyword in lines:
+			outcomes.append((line, "conflict", data.keyword, "Term already exists"))
+			continue
+		lines[data.keyword] = line
+		rows.append({"keyword": data.keyword, "description": data.description, "source": data.source})
+
+	if rows:
+		inserted = dict(session.exec(
+			sqlite_insert(Term)
+			.on_conflict_do_nothing(index_elements=[Term.keyword])
+			.returning(Term.id, Term.keyword),
+			params=rows
+		).all())
+		created = set(inserted.values())
+		for keyword, line in lines.items():
+			if keyword in created:
+				outcomes.append((line, "created", keyword, None))
+			else:
+				outcomes.append((line, "conflict", keyword, "Term already exists"))
+		record_terms_added(session, inserted)
+		session.commit()
+	return outcomes
+
+
+def _relation_name(item: dict) -> Optional[str]:
+	source, target = item.get("source_keyword"), item.get("target_keyword")
+	if not isinstance(source, str) or not isinstance(target, str):
+		return None
+	return f"{source} -> {target} ({item.get('relation_type', 'related')})"
+
+
+def insert_relations_batch(session: Session, batch: Batch) -> list[Outcome]:
+	"""Вставка пакета связей одной транзакцией; концы ищутся по ключевым словам одним IN на чанк"""
+	outcomes: list[Outcome] = []
+	valid = _validated(batch, TermRelationCreate, outcomes, _relation_name)
+	keywords = list({keyword for _, data in valid for keyword in (data.source_keyword, data.target_keyword)})
+	ids: dict[str, int] = {}
+	for chunk in in_chunks(keywords):
+		ids.update(session.exec(select(Term.keyword, Term.id).where(Term.keyword.in_(chunk))).all())
+
+	candidates = []
+	for line, data in valid:
+		name = f"{data.source_keyword} -> {data.target_keyword} ({data.relation_type})"
+		for role, keyword in (("Source", data.source_keyword), ("Target", data.target_keyword)):
+			if keyword not in ids:
+				outcomes.append((line, "not_found", name, f"{role} term '{keyword}' not found"))
+				break
+		else:
+			if ids[data.source_keyword] == ids[data.target_keyword]:
+				outcomes.append((line, "error", name, "Source and target terms cannot be the same"))
+			else:
+				candidates.append((line, name, (ids[data.source_keyword], ids[data.target_keyword], data.relation_type), data))
+
+	# Повторы внутри пакета отсекаются здесь, с уже существующими связями - уникальным индексом
+	rows, lines = [], {}
+	for line, name, key, data in candidates:
+		if key in lines:
+			outcomes.append((line, "conflict", name, "Relation already exists"))
+			continue
+		lines[key] = (line, name)
+		source_id, target_id, relation_type = key
+		rows.append({
+			"source_id": source_id, "target_id": target_id, "relation_type": relation_type, "description": data.description
+		})
+
+	if rows:
+		inserted = session.exec(
+			sqlite_insert(TermRelation)
+			.on_conflict_do_nothing(index_elements=EDGE_COLUMNS)
+			.returning(TermRelation.id, *EDGE_COLUMNS),
+			params=rows
+		).all()
+		created = {tuple(row[1:]) for row in inserted}
+		for key, (line, name) in lines.items():
+			if key in created:
+				outcomes.append((line, "created", name, None))
+			else:
+				outcomes.append((line, "conflict", name, "Relation already exists"))
+		record_relations_added(session, [tuple(row) for row in inserted])
+		session.commit()
+	return outcomes
+
+
+async def export_ndjson(query, fields: Sequence[str]) -> AsyncIterator[bytes]:
+	"""Строки NDJSON по мере чтения серверного курсора, чанками по EXPORT_CHUNK_SIZE строк
+
+	Сессия открывается в самом генераторе: она должна жить, пока отправляется тело ответа
+	"""
+	async with AsyncSession(async_read_engine) as session:
+		result = await session.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+		async for rows in result.partitions():
+			yield b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in rows)
@@ -0,0 +1,175 @@
+"""
+Версия данных глоссария и выборка изменений графа начиная с версии клиента
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from .batch import IN_CHUNK_SIZE
+from .db import engine
+from .events import ChangeSet, subscribe, subscribe_reset
+from .models import ChangeLog, Term, TermRelation
+from .schemas import GraphChanges, GraphEdge, GraphNode
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних версий хранится в changelog; более старым клиентам нужна полная загрузка графа
+CHANGELOG_RETENTION = int(os.getenv("CHANGELOG_RETENTION", "100000"))
+# Как часто (в секундах) фоновый поток чистит changelog
+CHANGELOG_PRUNE_SECONDS = float(os.getenv("CHANGELOG_PRUNE_SECONDS", "300"))
+
+
+class VersionTooOld(Exception):
+	"""Изменения с запрошенной версии уже удалены из журнала"""
+
+
+class GlossaryVersion:
+	"""Последняя известная процессу версия глоссария; обновляется после каждого commit с изменениями"""
+
+	def __init__(self) -> None:
+		self._lock = threading.Lock()
+		self._value: Optional[int] = None
+
+	@property
+	def value(self) -> Optional[int]:
+		return self._value
+
+	def load(self, session: Session) -> int:
+		version = read_version(session)
+		self.advance(version)
+		return version
+
+	def current(self, session: Session) -> int:
+		"""Версия без обращения к БД, если она уже известна процессу"""
+		value = self._value
+		return value if value is not None else self.load(session)
+
+	def advance(self, version: Optional[int]) -> None:
+		if version is None:
+			return
+		with self._lock:
+			if self._value is None or version > self._value:
+				self._value = version
+
+	def on_changes(self, changes: ChangeSet) -> None:
+		self.advance(changes.version)
+
+
+class ChangelogPruner:
+	"""Очистка changelog в фоновом потоке раз в CHANGELOG_PRUNE_SECONDS, вне транзакций запросов"""
+
+	def __init__(self, interval: float = CHANGELOG_PRUNE_SECONDS) -> None:
+		self.interval = interval
+		self._stopping = threading.Event()
+		self._worker: Optional[threading.Thread] = None
+
+	def start(self) -> None:
+		if self._worker is not None:
+			return
+		self._stopping.clear()
+		self._worker = threading.Thread(target=self._run, name="changelog-prune", daemon=True)
+		self._worker.start()
+
+	def stop(self) -> None:
+		worker, self._worker = self._worker, None
+		self._stopping.set()
+		if worker is not None:
+			worker.join(timeout=5)
+
+	def _run(self) -> None:
+		while not self._stopping.wait(self.interval):
+			self.prune()
+
+	def prune(self) -> None:
+		try:
+			with Session(engine) as session:
+				prune_changelog(session)
+		except Exception:
+			logger.exception("Changelog pruning failed")
+
+
+def read_version(session: Session) -> int:
+	return session.exec(select(func.coalesce(func.max(ChangeLog.version), 0))).one()
+
+
+def prune_changelog(session: Session, retention: int = CHANGELOG_RETENTION) -> None:
+	latest = read_version(session)
+	session.exec(delete(ChangeLog).where(ChangeLog.version <= latest - retention))
+	session.commit()
+
+
+def _rows_by_id(session: Session, model, ids: list[int]) -> dict:
+	found = {}
+	for start in range(0, len(ids), IN_CHUNK_SIZE):
+		chunk = ids[start:start + IN_CHUNK_SIZE]
+		found.update({row.id: row for row in session.exec(select(model).where(model.id.in_(chunk))).all()})
+	return found
+
+
+def fetch_changes(session: Session, since: int) -> GraphChanges:
+	"""Узлы и рёбра, добавленные, изменённые или удалённые после версии since"""
+	latest = read_version(session)
+	oldest = session.exec(select(func.min(ChangeLog.version))).one()
+	if since > latest or (oldest is not None and since < oldest - 1):
+		raise VersionTooOld(f"Changes since version {since} are not available (current version {latest})")
+
+	# entity -> id -> (первая операция, последняя операция)
+	ops: dict[str, dict[int, tuple[str, str]]] = {"term": {}, "relation": {}}
+	entries = session.exec(
+		select(ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op)
+		.where(ChangeLog.version > since, ChangeLog.version <= latest)
+		.order_by(ChangeLog.version)
+	)
+	for entity, entity_id, op in entries:
+		first = ops[entity].get(entity_id, (op, op))[0]
+		ops[entity][entity_id] = (first, op)
+
+	def classify(entity: str) -> tuple[list[int], list[int], list[int]]:
+		added, updated, deleted = [], [], []
+		for entity_id, (first, last) in ops[entity].items():
+			if last == "delete":
+				# Созданное и удалённое в пределах интервала клиенту не интересно
+				if first != "insert":
+					deleted.append(entity_id)
+			elif first == "insert":
+				added.append(entity_id)
+			else:
+				updated.append(entity_id)
+		return added, updated, deleted
+
+	terms_added, terms_updated, terms_deleted = classify("term")
+	relations_added, relations_updated, relations_deleted = classify("relation")
+	terms = _rows_by_id(session, Term, terms_added + terms_updated)
+	relations = _rows_by_id(session, TermRelation, relations_added + relations_updated)
+
+	def node(term: Term) -> GraphNode:
+		return GraphNode(id=term.id, keyword=term.keyword, description=term.description, source=term.source)
+
+	def edge(relation: TermRelation) -> GraphEdge:
+		return GraphEdge(
+			id=relation.id,
+			source=relation.source_id,
+			target=relation.target_id,
+			relation_type=relation.relation_type,
+			description=relation.description
+		)
+
+	return GraphChanges(
+		since=since,
+		version=latest,
+		nodes_added=[node(terms[i]) for i in terms_added if i in terms],
+		nodes_updated=[node(terms[i]) for i in terms_updated if i in terms],
+		nodes_deleted=terms_deleted,
+		edges_added=[edge(relations[i]) for i in relations_added + relations_updated if i in relations],
+		edges_deleted=relations_deleted
+	)
+
+
+glossary_version = GlossaryVersion()
+subscribe(glossary_version.on_changes)
+subscribe_reset(glossary_version.load)
+changelog_pruner = ChangelogPruner()
@@ -0,0 +1 @@
+"""Набор бенчмарков глоссария: генератор синтетических данных и замеры обработчиков REST и gRPC"""
@@ -0,0 +1,576 @@
+"""
+Микробенчмарки обработчиков REST (app/routers) и методов GlossaryServicer на синтетических данных
+
+Для каждого размера набора данных (по умолчанию 10k и 100k терминов, 2 связи на термин)
+генератор benchmarks.synthetic создаёт БД (кэшируется в benchmarks/.data), и в отдельном
+процессе на её копии запускается приложение:
+- REST вызывается в том же процессе через ASGI-транспорт httpx - с middleware, валидацией и
+  сериализацией, без сети;
+- методы GlossaryServicer вызываются напрямую, ответ сериализуется в protobuf.
+
+По каждому сценарию записываются медиана, p90 и p99 задержки, пиковый объём выделенной
+памяти за вызов (tracemalloc, отдельный прогон) и число SQL-запросов (Server-Timing).
+Результаты сохраняются в JSON и сравниваются с benchmarks/baseline.json.
+
+Примеры:
+  python -m benchmarks.suite                            # сравнение с базовой линией
+  python -m benchmarks.suite --sizes 1000000 --filter /terms/
+  python -m benchmarks.suite --save-baseline            # обновить benchmarks/baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from types import GeneratorType
+from typing import Any, Awaitable, Callable, Optional
+from unittest import mock
+from urllib.parse import quote
+
+from .synthetic import GENERATOR_VERSION, RELATION_TYPES, WORDS, generate, write_database
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+RESULTS = Path(__file__).resolve().parent / "results" / "latest.json"
+
+DEFAULT_SIZES = "10000,100000"
+# Раскладка графа на больших наборах считается минутами, её сценарий пропускается
+LAYOUT_MAX_TERMS = 200_000
+BATCH = 100  # элементов в одном пакетном запросе
+
+_QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Settings:
+    warmup: int = 5
+    min_iterations: int = 5
+    max_iterations: int = 200
+    min_time: float = 1.0  # секунды замеров на сценарий, если не набрано max_iterations
+    alloc_samples: int = 10
+
+
+# --- сценарии ---
+
+# REST: (method, url, params, json); gRPC: (method, request)
+Call = tuple
+
+
+@dataclass
+class Case:
+    name: str
+    protocol: str  # rest или grpc
+    # Аргументы count вызовов; может готовить данные через приложение (не входит в замер)
+    calls: Callable[["Bench", int], Awaitable[list[Call]]]
+    writes: bool = False  # изменяет данные: выполняется после читающих сценариев
+    max_terms: Optional[int] = None
+
+
+class Bench:
+    """Состояние прогона: клиент, servicer, ключевые слова набора данных и генератор случайных чисел"""
+
+    def __init__(self, client, servicer, glossary_pb2, keywords: list[str], relations: int, seed: int) -> None:
+        self.client = client
+        self.servicer = servicer
+        self.pb = glossary_pb2
+        self.keywords = keywords
+        self.relations = relations
+        self.rng = random.Random(seed)
+        self._unique = 0
+
+    def keyword(self) -> str:
+        return self.rng.choice(self.keywords)
+
+    def fresh(self, prefix: str, count: int) -> list[str]:
+        """Ключевые слова, которых нет в наборе данных"""
+        start, self._unique = self._unique, self._unique + count
+        return [f"bench {prefix} {index}" for index in range(start, start + count)]
+
+    async def create(self, keywords: list[str]) -> None:
+        for start in range(0, len(keywords), 5000):
+            chunk = keywords[start:start + 5000]
+            response = await self.client.post(
+                "/terms/bulk", json={"terms": [{"keyword": keyword, "description": "benchmark"} for keyword in chunk]}
+            )
+            response.raise_for_status()
+
+
+def _path(keyword: str) -> str:
+    return quote(keyword, safe="")
+
+
+def _typo(keyword: str, rng: random.Random) -> str:
+    position = rng.randrange(len(keyword))
+    return keyword[:position] + keyword[position + 1:]
+
+
+def _rest(name: str, build: Callable[[Bench], Call], **options) -> Case:
+    async def calls(bench: Bench, count: int) -> list[Call]:
+        return [build(bench) for _ in range(count)]
+    return Case(name, "rest", calls, **options)
+
+
+def _grpc(name: str, build: Callable[[Bench], Any], **options) -> Case:
+    async def calls(bench: Bench, count: int) -> list[Call]:
+        return [(name, build(bench)) for _ in range(count)]
+    return Case(name, "grpc", calls, **options)
+
+
+def _search_query(bench: Bench) -> str:
+    return bench.rng.choice(WORDS) if bench.rng.random() < 0.5 else bench.keyword().split()[0].lower()
+
+
+def _list_after(bench: Bench) -> str:
+    from app.pagination import encode_cursor
+    return encode_cursor(bench.keyword())
+
+
+async def _delete_terms(bench: Bench, count: int) -> list[Call]:
+    keywords = bench.fresh("delete", count)
+    await bench.create(keywords)
+    return [("DELETE", f"/terms/{_path(keyword)}", None, None) for keyword in keywords]
+
+
+async def _bulk_delete(bench: Bench, count: int) -> list[Call]:
+    keywords = bench.fresh("bulk-delete", count * BATCH)
+    await bench.create(keywords)
+    return [("POST", "/terms/bulk-delete", None, {"keywords": keywords[i:i + BATCH]}) for i in range(0, len(keywords), BATCH)]
+
+
+async def _create_terms(bench: Bench, count: int) -> list[Call]:
+    return [
+        ("POST", "/terms/", None, {"keyword": keyword, "description": "benchmark"})
+        for keyword in bench.fresh("create", count)
+    ]
+
+
+async def _bulk_create(bench: Bench, count: int) -> list[Call]:
+    keywords = bench.fresh("bulk", count * BATCH)
+    return [
+        ("POST", "/terms/bulk", None, {"terms": [{"keyword": keyword, "description": "benchmark"} for keyword in keywords[i:i + BATCH]]})
+        for i in range(0, len(keywords), BATCH)
+    ]
+
+
+async def _create_relations(bench: Bench, count: int) -> list[Call]:
+    # Тип связи, которого нет в наборе данных, - каждая пара создаётся впервые
+    pairs = [bench.rng.sample(bench.keywords, 2) for _ in range(count)]
+    return [
+        ("POST", "/graph/relations/", None, {"source_keyword": source, "target_keyword": target, "relation_type": f"bench-{index}"})
+        for index, (source, target) in enumerate(pairs)
+    ]
+
+
+async def _delete_relations(bench: Bench, count: int) -> list[Call]:
+    ids = bench.rng.sample(range(1, bench.relations + 1), min(count, bench.relations))
+    return [("DELETE", f"/graph/relations/{relation_id}", None, None) for relation_id in ids]
+
+
+async def _graph_changes(bench: Bench, count: int) -> list[Call]:
+    version = int((await bench.client.get("/terms/", params={"limit": 1})).headers["X-Glossary-Version"])
+    return [("GET", "/graph/changes", {"since": max(0, version - 100)}, None)] * count
+
+
+async def _grpc_delete(bench: Bench, count: int) -> list[Call]:
+    keywords = bench.fresh("rpc-delete", count)
+    await bench.create(keywords)
+    return [("DeleteTerm", bench.pb.DeleteTermRequest(keyword=keyword)) for keyword in keywords]
+
+
+async def _grpc_bulk_delete(bench: Bench, count: int) -> list[Call]:
+    keywords = bench.fresh("rpc-bulk-delete", count * BATCH)
+    await bench.create(keywords)
+    return [
+        ("BulkDeleteTerms", bench.pb.BulkDeleteTermsRequest(keywords=keywords[i:i + BATCH]))
+        for i in range(0, len(keywords), BATCH)
+    ]
+
+
+async def _grpc_create(bench: Bench, count: int) -> list[Call]:
+    return [
+        ("CreateTerm", bench.pb.CreateTermRequest(keyword=keyword, description="benchmark"))
+        for keyword in bench.fresh("rpc-create", count)
+    ]
+
+
+async def _grpc_bulk_create(bench: Bench, count: int) -> list[Call]:
+    keywords = bench.fresh("rpc-bulk", count * BATCH)
+    pb = bench.pb
+    return [
+        ("BulkCreateTerms", pb.BulkCreateTermsRequest(terms=[
+            pb.CreateTermRequest(keyword=keyword, description="benchmark") for keyword in keywords[i:i + BATCH]
+        ]))
+        for i in range(0, len(keywords), BATCH)
+    ]
+
+
+def cases() -> list[Case]:
+    return [
+        # REST, чтение
+        _rest("GET /terms/", lambda b: ("GET", "/terms/", {"limit": 50, "after": _list_after(b)}, None)),
+        _rest("GET /terms/-/search", lambda b: ("GET", "/terms/-/search", {"q": _search_query(b), "limit": 20}, None)),
+        _rest("GET /terms/-/suggest", lambda b: ("GET", "/terms/-/suggest", {"prefix": b.keyword()[:3]}, None)),
+        _rest("GET /terms/-/fuzzy", lambda b: ("GET", "/terms/-/fuzzy", {"q": _typo(b.keyword(), b.rng)}, None)),
+        _rest("GET /terms/{keyword}", lambda b: ("GET", f"/terms/{_path(b.keyword())}", None, None)),
+        _rest("POST /terms/batch-get", lambda b: ("POST", "/terms/batch-get", None, {"keywords": b.rng.sample(b.keywords, BATCH)})),
+        _rest("GET /graph/relations/", lambda b: ("GET", "/graph/relations/", {"limit": 100, "relation_type": b.rng.choice(RELATION_TYPES)}, None)),
+        _rest("GET /graph/relations/{term_keyword}", lambda b: ("GET", f"/graph/relations/{_path(b.keyword())}", None, None)),
+        _rest("GET /graph/graph", lambda b: ("GET", "/graph/graph", None, None)),
+        _rest("GET /graph/neighbors/{keyword}", lambda b: ("GET", f"/graph/neighbors/{_path(b.keyword())}", {"depth": 2}, None)),
+        _rest("GET /graph/path", lambda b: ("GET", "/graph/path", {"from": b.keyword(), "to": b.keyword(), "max_depth": 6}, None)),
+        _rest("GET /graph/analytics/degree", lambda b: ("GET", "/graph/analytics/degree", {"offset": b.rng.randrange(1000)}, None)),
+        _rest("GET /graph/analytics/pagerank", lambda b: ("GET", "/graph/analytics/pagerank", {"offset": b.rng.randrange(1000)}, None)),
+        _rest("GET /graph/analytics/components", lambda b: ("GET", "/graph/analytics/components", {"limit": 20}, None)),
+        _rest("GET /graph/layout", lambda b: ("GET", "/graph/layout", {"limit": 500}, None), max_terms=LAYOUT_MAX_TERMS),
+        # gRPC, чтение
+        _grpc("ListTerms", lambda b: b.pb.ListTermsRequest(limit=50, after=_list_after(b))),
+        _grpc("StreamTerms", lambda b: b.pb.StreamTermsRequest()),
+        _grpc("GetTerm", lambda b: b.pb.GetTermRequest(keyword=b.keyword())),
+        _grpc("BatchGetTerms", lambda b: b.pb.BatchGetTermsRequest(keywords=b.rng.sample(b.keywords, BATCH))),
+        _grpc("SearchTerms", lambda b: b.pb.SearchTermsRequest(query=_search_query(b), limit=20)),
+        _grpc("SuggestTerms", lambda b: b.pb.SuggestTermsRequest(prefix=b.keyword()[:3])),
+        # REST, запись
+        Case("POST /terms/", "rest", _create_terms, writes=True),
+        Case("POST /terms/bulk", "rest", _bulk_create, writes=True),
+        _rest(
+            "PUT /terms/{keyword}",
+            lambda b: ("PUT", f"/terms/{_path(b.keyword())}", None, {"description": f"updated {b.rng.random()}"}),
+            writes=True,
+        ),
+        Case("DELETE /terms/{keyword}", "rest", _delete_terms, writes=True),
+        Case("POST /terms/bulk-delete", "rest", _bulk_delete, writes=True),
+        Case("POST /graph/relations/", "rest", _create_relations, writes=True),
+        Case("DELETE /graph/relations/{relation_id}", "rest", _delete_relations, writes=True),
+        Case("GET /graph/changes", "rest", _graph_changes, writes=True),
+        # gRPC, запись
+        Case("CreateTerm", "grpc", _grpc_create, writes=True),
+        Case("BulkCreateTerms", "grpc", _grpc_bulk_create, writes=True),
+        _grpc(
+            "UpdateTerm",
+            lambda b: b.pb.UpdateTermRequest(keyword=b.keyword(), description=f"updated {b.rng.random()}"),
+            writes=True,
+        ),
+        Case("DeleteTerm", "grpc", _grpc_delete, writes=True),
+        Case("BulkDeleteTerms", "grpc", _grpc_bulk_delete, writes=True),
+    ]
+
+
+# --- выполнение ---
+
+class _Aborted(Exception):
+    pass
+
+
+class BenchContext:
+    """Минимальный ServicerContext для прямого вызова методов servicer"""
+
+    def __init__(self) -> None:
+        self._code = None
+
+    def set_code(self, code) -> None:
+        self._code = code
+
+    def set_details(self, _details) -> None:
+        pass
+
+    def code(self):
+        return self._code
+
+    def is_active(self) -> bool:
+        return True
+
+    def abort(self, code, _details):
+        self._code = code
+        raise _Aborted(code)
+
+
+async def _call_rest(bench: Bench, call: Call) -> tuple[int, bool]:
+    method, url, params, body = call
+    response = await bench.client.request(method, url, params=params, json=body)
+    if response.status_code >= 500:
+        raise RuntimeError(f"{method} {url}: {response.status_code} {response.text[:200]}")
+    match = _QUERIES_RE.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0, response.status_code >= 400
+
+
+def _call_grpc(bench: Bench, call: Call) -> tuple[int, bool]:
+    from app.query_stats import QueryStats, track_queries
+
+    method, request = call
+    context = BenchContext()
+    queries = QueryStats(method)
+    with track_queries(queries):
+        try:
+            result = getattr(bench.servicer, method)(request, context)
+            for message in (result if isinstance(result, GeneratorType) else (result,)):
+                message.SerializeToString()
+        except _Aborted:
+            pass
+    return queries.count, context.code() is not None
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_case(bench: Bench, case: Case, settings: Settings) -> dict:
+    total = settings.warmup + settings.max_iterations + settings.alloc_samples
+    calls = await case.calls(bench, total)
+
+    async def call(arguments: Call) -> tuple[int, bool]:
+        if case.protocol == "rest":
+            return await _call_rest(bench, arguments)
+        return _call_grpc(bench, arguments)
+
+    # Разогрев и прогон tracemalloc тоже ограничены min_time: тяжёлые сценарии (выгрузка
+    # всех терминов) на 1M занимают секунды на вызов
+    position = 0
+    budget_end = time.perf_counter() + settings.min_time
+    while position < settings.warmup and (position == 0 or time.perf_counter() < budget_end):
+        await call(calls[position])
+        position += 1
+
+    samples, queries, errors = [], [], 0
+    budget_end = time.perf_counter() + settings.min_time
+    while position < len(calls) - settings.alloc_samples and len(samples) < settings.max_iterations:
+        if len(samples) >= settings.min_iterations and time.perf_counter() > budget_end:
+            break
+        started = time.perf_counter()
+        count, failed = await call(calls[position])
+        samples.append(time.perf_counter() - started)
+        queries.append(count)
+        errors += failed
+        position += 1
+
+    # Пик выделенной памяти за вызов; tracemalloc замедляет выполнение, поэтому отдельный прогон
+    allocations = []
+    tracemalloc.start()
+    try:
+        budget_end = time.perf_counter() + settings.min_time
+        for arguments in calls[position:position + settings.alloc_samples]:
+            if allocations and time.perf_counter() > budget_end:
+                break
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await call(arguments)
+            allocations.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "protocol": case.protocol,
+        "iterations": len(samples),
+        "median_ms": round(_percentile(samples, 0.5) * 1000, 4),
+        "p90_ms": round(_percentile(samples, 0.9) * 1000, 4),
+        "p99_ms": round(_percentile(samples, 0.99) * 1000, 4),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4),
+        "alloc_kb": round(_percentile(allocations, 0.5) / 1024, 1) if allocations else None,
+        "queries": _percentile(queries, 0.5),
+        "error_rate": round(errors / len(samples), 3),
+    }
+
+
+async def run_worker(size: int, relations: int, seed: int, settings: Settings, pattern: Optional[str]) -> dict:
+    """Замеры в процессе, где GLOSSARY_DATABASE_URL указывает на копию набора данных"""
+    import httpx
+    from sqlmodel import Session, select
+
+    from app.db import read_engine
+    from app.grpc_server import GlossaryServicer, glossary_pb2
+    from app.layout import graph_layout
+    from app.main import app
+    from app.models import Term
+
+    with Session(read_engine) as session:
+        keywords = list(session.exec(select(Term.keyword).order_by(Term.id)))
+
+    results = {}
+    # Фоновый пересчёт раскладки отнимал бы процессор у замеров: раскладка считается
+    # синхронно при первом (разогревочном) запросе /graph/layout
+    with mock.patch.object(graph_layout, "start"):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                bench = Bench(client, GlossaryServicer() if glossary_pb2 else None, glossary_pb2, keywords, relations, seed)
+                selected = [
+                    case for case in cases()
+                    if (case.max_terms is None or size <= case.max_terms)
+                    and (case.protocol == "rest" or glossary_pb2 is not None)
+                    and (not pattern or pattern in case.name)
+                ]
+                for case in sorted(selected, key=lambda case: case.writes):
+                    started = time.perf_counter()
+                    results[_label(case)] = result = await run_case(bench, case, settings)
+                    print(
+                        f"  {_label(case):<44}{result['median_ms']:>10.3f} ms{result['p99_ms']:>11.3f} ms p99"
+                        f"{result['alloc_kb'] or 0:>10.1f} KB{result['queries']:>5} q  ({time.perf_counter() - started:.1f}s)",
+                        file=sys.stderr,
+                    )
+    return results
+
+
+def _label(case: Case) -> str:
+    return case.name if case.protocol == "rest" else f"gRPC {case.name}"
+
+
+# --- наборы данных и сравнение ---
+
+def dataset_path(size: int, relations_per_term: float, seed: int) -> Path:
+    """Путь к сгенерированной БД; генерируется один раз для набора параметров"""
+    path = DATA_DIR / f"glossary-{size}-{relations_per_term:g}-{seed}-v{GENERATOR_VERSION}.db"
+    if not path.exists():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        dataset = generate(size, relations_per_term, seed)
+        temporary = path.with_suffix(".tmp")
+        write_database(dataset, temporary)
+        temporary.replace(path)
+        print(f"generated {path.name} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Таблица изменений относительно базовой линии; возвращает список регрессий"""
+    regressions = []
+
+    def delta(old, new) -> str:
+        if not old or new is None:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.0f}%"
+
+    print(f"\n{'scenario':<52}{'median, ms':>22}{'Δ':>7}{'alloc, KB':>22}{'Δ':>7}{'queries':>10}")
+    for size, scenarios in current["results"].items():
+        old_scenarios = baseline.get("results", {}).get(size, {})
+        for name, result in scenarios.items():
+            old = old_scenarios.get(name)
+            label = f"[{int(size) // 1000}k] {name}"
+            if old is None:
+                print(f"{label:<52}{'new':>22}{'':>7}{result['alloc_kb'] or 0:>22.1f}{'':>7}{result['queries']:>10}")
+                continue
+            flags = []
+            if old["median_ms"] and result["median_ms"] > old["median_ms"] * (1 + threshold):
+                flags.append("latency")
+            if old.get("alloc_kb") and result["alloc_kb"] and result["alloc_kb"] > old["alloc_kb"] * (1 + threshold):
+                flags.append("alloc")
+            if result["queries"] > old["queries"]:
+                flags.append("queries")
+            if flags:
+                regressions.append(f"{label}: {', '.join(flags)}")
+            print(
+                f"{label:<52}{old['median_ms']:>10.3f} → {result['median_ms']:>9.3f}{delta(old['median_ms'], result['median_ms']):>7}"
+                f"{old.get('alloc_kb') or 0:>10.1f} → {result['alloc_kb'] or 0:>9.1f}{delta(old.get('alloc_kb'), result['alloc_kb']):>7}"
+                f"{old['queries']:>5} → {result['queries']:<3}{'  !' if flags else ''}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Glossary handler benchmark suite")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="размеры наборов данных через запятую (число терминов)")
+    parser.add_argument("--relations-per-term", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--filter", help="только сценарии, в названии которых есть подстрока")
+    parser.add_argument("--min-time", type=float, default=Settings.min_time, help="секунд замеров на сценарий")
+    parser.add_argument("--max-iterations", type=int, default=Settings.max_iterations)
+    parser.add_argument("--output", type=Path, default=RESULTS)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты в --baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимый рост медианы и памяти (доля)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="код выхода 1 при регрессиях")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--relations", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    settings = Settings(min_time=args.min_time, max_iterations=args.max_iterations)
+
+    if args.worker:
+        results = asyncio.run(run_worker(args.size, args.relations, args.seed, settings, args.filter))
+        args.worker.write_text(json.dumps(results))
+        return
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "db_profile": os.getenv("GLOSSARY_DB_PROFILE", "production"),
+            "relations_per_term": args.relations_per_term,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for size in (int(value) for value in args.sizes.split(",")):
+        source = dataset_path(size, args.relations_per_term, args.seed)
+        workdir = Path(tempfile.mkdtemp(prefix="glossary-bench-"))
+        try:
+            database = workdir / "glossary.db"
+            shutil.copyfile(source, database)
+            with closing(sqlite3.connect(database)) as connection:
+                relations = connection.execute("SELECT count(*) FROM termrelation").fetchone()[0]
+            env = {
+                **os.environ,
+                "GLOSSARY_DATABASE_URL": f"sqlite:///{database}",
+                "GLOSSARY_DB_PROFILE": report["meta"]["db_profile"],
+                "GLOSSARY_METRICS_DIR": "",
+                "SLOW_QUERY_MS": "0",
+            }
+            print(f"{size} terms, {relations} relations:", file=sys.stderr)
+            output = workdir / "results.json"
+            command = [
+                sys.executable, "-m", "benchmarks.suite", "--worker", str(output), "--size", str(size),
+                "--relations", str(relations), "--seed", str(args.seed),
+                "--min-time", str(args.min_time), "--max-iterations", str(args.max_iterations),
+            ]
+            if args.filter:
+                command += ["--filter", args.filter]
+            subprocess.run(command, cwd=ROOT, env=env, check=True)
+            report["results"][str(size)] = json.loads(output.read_text())
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    print(f"results written to {args.output}", file=sys.stderr)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+        print(f"baseline saved to {args.baseline}", file=sys.stderr)
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}, run with --save-baseline", file=sys.stderr)
+        return
+    regressions = compare(json.loads(args.baseline.read_text()), report, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions over {args.threshold:.0%}:\n  " + "\n  ".join(regressions))
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
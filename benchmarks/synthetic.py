@@ -0,0 +1,198 @@
+"""
+Генератор синтетического глоссария для бенчмарков и нагрузочных тестов
+
+Данные полностью определяются seed:
+- ключевые слова - сочетания 1-3 технических корней ("Cache", "Socket Index", ...), поэтому
+  у префиксов автодополнения и у нечёткого поиска реалистичная плотность совпадений;
+- длины описаний распределены логнормально (медиана ~180 символов, до 2048);
+- концы связей выбираются с плотностью ~1/ранг (как у реальных графов понятий: немногие
+  термины связаны с очень многими), без петель и повторов (source, target, type).
+
+Строки вставляются напрямую через sqlite3 до создания FTS-индекса, индекс строится одним
+rebuild в init_search - так 1M терминов генерируются за десятки секунд, а не за часы.
+
+Пример: python -m benchmarks.synthetic --terms 100000 --output glossary.db
+"""
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+# Версия формата данных: меняется вместе с генератором, входит в имя кэша наборов данных
+GENERATOR_VERSION = 1
+
+ROOTS = (
+    "Access", "Adapter", "Agent", "Aggregate", "Alert", "Algorithm", "Alias", "Allocator", "Anchor", "API",
+    "Archive", "Array", "Assembly", "Async", "Atom", "Audit", "Auth", "Backend", "Backoff", "Backup",
+    "Balancer", "Barrier", "Batch", "Binary", "Bitmap", "Block", "Bloom", "Branch", "Broker", "Browser",
+    "Bucket", "Buffer", "Build", "Bundle", "Bus", "Byte", "Cache", "Callback", "Canary", "Capacity",
+    "Certificate", "Channel", "Checkpoint", "Checksum", "Chunk", "Cipher", "Circuit", "Class", "Client", "Clock",
+    "Cluster", "Codec", "Collector", "Column", "Commit", "Compiler", "Component", "Compression", "Config", "Connection",
+    "Consensus", "Consumer", "Container", "Context", "Cookie", "Coroutine", "Counter", "Cursor", "Daemon", "Dashboard",
+    "Data", "Deadlock", "Debugger", "Decoder", "Delta", "Deployment", "Digest", "Directory", "Dispatcher", "Document",
+    "Domain", "Driver", "Edge", "Encoder", "Endpoint", "Engine", "Entity", "Event", "Executor", "Exporter",
+    "Failover", "Feature", "Fiber", "Field", "File", "Filter", "Firewall", "Flag", "Flow", "Format",
+    "Frame", "Function", "Gateway", "Graph", "gRPC", "Handler", "Hash", "Header", "Heap", "Heartbeat",
+    "Host", "HTTP", "Image", "Index", "Ingress", "Instance", "Interface", "Interrupt", "Iterator", "Job",
+    "Journal", "JSON", "Kernel", "Key", "Lambda", "Latency", "Layer", "Lease", "Ledger", "Library",
+    "Limiter", "Link", "Listener", "Loader", "Lock", "Log", "Loop", "Manifest", "Map", "Matrix",
+    "Memory", "Mesh", "Message", "Metric", "Middleware", "Migration", "Mirror", "Model", "Module", "Monitor",
+    "Mutex", "Namespace", "Network", "Node", "Object", "Offset", "Operator", "Optimizer", "Packet", "Page",
+    "Parser", "Partition", "Patch", "Payload", "Peer", "Pipeline", "Plugin", "Pointer", "Policy", "Pool",
+    "Port", "Predicate", "Process", "Profile", "Protocol", "Proxy", "Queue", "Quorum", "Record", "Registry",
+    "Replica", "Repository", "Request", "Resolver", "Resource", "Response", "Router", "Runtime", "Sandbox", "Scheduler",
+    "Schema", "Scope", "Segment", "Semaphore", "Server", "Service", "Session", "Shard", "Signal", "Snapshot",
+    "Socket", "Span", "Stack", "State", "Storage", "Stream", "Subscriber", "Switch", "Table", "Task",
+    "Template", "Tenant", "Thread", "Throttle", "Token", "Topic", "Trace", "Transaction", "Tree", "Trigger",
+    "Tuple", "Vector", "Version", "View", "Volume", "WAL", "WebSocket", "Window", "Worker", "Zone",
+)
+
+# Словарь описаний: русские и английские слова, как в настоящих определениях терминов
+WORDS = (
+    "данные", "запрос", "ответ", "сервер", "клиент", "процесс", "поток", "память", "ключ", "значение",
+    "индекс", "таблица", "запись", "чтение", "кэш", "очередь", "сообщение", "событие", "обработчик", "механизм",
+    "используется", "позволяет", "хранит", "передаёт", "обеспечивает", "определяет", "содержит", "выполняет",
+    "для", "при", "между", "после", "перед", "без", "через", "в", "на", "и", "или", "не", "как", "который",
+    "быстрый", "распределённый", "асинхронный", "надёжный", "временный", "постоянный", "общий", "локальный",
+    "request", "response", "latency", "throughput", "consistency", "replication", "protocol", "storage",
+)
+
+RELATION_TYPES = ("related", "part_of", "synonym", "antonym", "example_of")
+RELATION_WEIGHTS = (0.6, 0.2, 0.1, 0.05, 0.05)
+
+DESCRIPTION_MEDIAN = 180
+SOURCE_SHARE = 0.3  # доля терминов с источником определения
+
+
+@dataclass
+class Dataset:
+    """Сгенерированные данные; id термина - позиция в keywords + 1"""
+    keywords: list[str]
+    descriptions: list[str]
+    sources: list[Optional[str]]
+    relation_sources: np.ndarray  # id терминов
+    relation_targets: np.ndarray
+    relation_types: np.ndarray  # индексы в RELATION_TYPES
+
+    @property
+    def relations(self) -> int:
+        return len(self.relation_sources)
+
+
+def _keywords(rng: np.random.Generator, count: int) -> list[str]:
+    """Уникальные ключевые слова из 1-3 корней; при совпадении добавляется номер"""
+    lengths = rng.choice((1, 2, 3), size=count, p=(0.05, 0.55, 0.4))
+    roots = rng.integers(0, len(ROOTS), size=(count, 3))
+    keywords, seen = [], set()
+    for index in range(count):
+        keyword = " ".join(ROOTS[root] for root in roots[index, :lengths[index]])
+        if keyword in seen:
+            keyword = f"{keyword} {index}"
+        seen.add(keyword)
+        keywords.append(keyword)
+    return keywords
+
+
+def _descriptions(rng: np.random.Generator, count: int) -> list[str]:
+    """Описания логнормальной длины - срезы общего текста из WORDS"""
+    text = " ".join(WORDS[index] for index in rng.integers(0, len(WORDS), size=200_000))
+    lengths = np.clip(rng.lognormal(np.log(DESCRIPTION_MEDIAN), 0.7, size=count), 20, 2048).astype(np.int64)
+    starts = rng.integers(0, len(text) - 2048, size=count)
+    return [text[start:start + length].strip() or "описание" for start, length in zip(starts.tolist(), lengths.tolist())]
+
+
+def _ranked(rng: np.random.Generator, count: int, size: int) -> np.ndarray:
+    """Номера терминов с плотностью ~1/ранг; ранги перемешаны, чтобы популярность не зависела от id"""
+    ranks = np.floor(np.power(float(count), rng.random(size))).astype(np.int64) - 1
+    return rng.permutation(count)[ranks] + 1
+
+
+def generate(terms: int, relations_per_term: float = 2.0, seed: int = 42) -> Dataset:
+    rng = np.random.default_rng(seed)
+    keywords = _keywords(rng, terms)
+    descriptions = _descriptions(rng, terms)
+    has_source = rng.random(terms) < SOURCE_SHARE
+    sources = [f"https://docs.example.com/{index + 1}" if flag else None for index, flag in enumerate(has_source.tolist())]
+
+    wanted = int(terms * relations_per_term)
+    if terms < 2 or wanted == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return Dataset(keywords, descriptions, sources, empty, empty, empty)
+    # С запасом на петли и повторы, затем уникальные (source, target, type) в порядке генерации
+    size = int(wanted * 1.2) + 16
+    source = _ranked(rng, terms, size)
+    target = _ranked(rng, terms, size)
+    kind = rng.choice(len(RELATION_TYPES), size=size, p=RELATION_WEIGHTS)
+    keep = source != target
+    source, target, kind = source[keep], target[keep], kind[keep]
+    key = (source * (terms + 1) + target) * len(RELATION_TYPES) + kind
+    _, first = np.unique(key, return_index=True)
+    first = np.sort(first)[:wanted]
+    return Dataset(keywords, descriptions, sources, source[first], target[first], kind[first])
+
+
+def write_database(dataset: Dataset, path: Path) -> None:
+    """Создать БД глоссария с данными dataset (существующий файл перезаписывается)"""
+    from sqlmodel import SQLModel, create_engine
+
+    from app import models  # noqa: F401  регистрирует таблицы в metadata
+    from app.events import init_changelog
+    from app.search import init_search
+
+    path = Path(path)
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    init_changelog(engine)
+    engine.dispose()
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=MEMORY")
+    connection.execute("PRAGMA synchronous=OFF")
+    with connection:
+        connection.executemany(
+            "INSERT INTO term (id, keyword, description, source) VALUES (?, ?, ?, ?)",
+            zip(range(1, len(dataset.keywords) + 1), dataset.keywords, dataset.descriptions, dataset.sources)
+        )
+        connection.executemany(
+            "INSERT INTO termrelation (source_id, target_id, relation_type) VALUES (?, ?, ?)",
+            zip(
+                dataset.relation_sources.tolist(),
+                dataset.relation_targets.tolist(),
+                (RELATION_TYPES[kind] for kind in dataset.relation_types.tolist()),
+            )
+        )
+    connection.execute("ANALYZE")
+    connection.close()
+
+    # FTS-таблицы ещё нет, поэтому init_search заполнит индекс одним rebuild
+    engine = create_engine(f"sqlite:///{path}")
+    init_search(engine)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic glossary database")
+    parser.add_argument("--terms", type=int, default=100_000)
+    parser.add_argument("--relations-per-term", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=Path("glossary.db"))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    dataset = generate(args.terms, args.relations_per_term, args.seed)
+    generated = time.perf_counter() - started
+    write_database(dataset, args.output)
+    print(
+        f"{args.output}: {len(dataset.keywords)} terms, {dataset.relations} relations "
+        f"(generated in {generated:.1f}s, written in {time.perf_counter() - started - generated:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
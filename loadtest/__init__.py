@@ -0,0 +1 @@
+"""Нагрузочные тесты REST и gRPC: общие сценарии locust, headless-запуски и отчёты в JSON"""
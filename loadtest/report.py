@@ -0,0 +1,68 @@
+"""
+Итоги нагрузочного теста в JSON и сравнение двух запусков
+
+Отчёт содержит по каждой операции (request_type + name) число запросов и ошибок, RPS,
+перцентили задержки и средний размер ответа; для gRPC это размер сериализованного
+сообщения, для REST - размер тела после распаковки.
+"""
+import json
+import time
+from pathlib import Path
+
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "rps", "failure_ratio")
+
+
+def _entry(stats) -> dict:
+    return {
+        "requests": stats.num_requests,
+        "failures": stats.num_failures,
+        "failure_ratio": round(stats.fail_ratio, 4),
+        "rps": round(stats.total_rps, 2),
+        "avg_ms": round(stats.avg_response_time, 2),
+        **{f"p{int(q * 100)}_ms": stats.get_response_time_percentile(q) for q in PERCENTILES},
+        "max_ms": round(stats.max_response_time, 2),
+        "avg_size": round(stats.avg_content_length, 1),
+    }
+
+
+def build_report(environment, scenario: str) -> dict:
+    stats = environment.stats
+    return {
+        "scenario": scenario,
+        "host": environment.host,
+        "user_classes": [user_class.__name__ for user_class in environment.user_classes],
+        "users": getattr(environment.parsed_options, "num_users", None),
+        "run_time": getattr(environment.parsed_options, "run_time", None),
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "operations": {
+            f"{entry.method} {entry.name}": _entry(entry)
+            for entry in sorted(stats.entries.values(), key=lambda entry: (entry.method, entry.name))
+        },
+        "total": _entry(stats.total),
+    }
+
+
+def write_report(report: dict, path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def _change(before, after) -> str:
+    if not before:
+        return f"{after}"
+    return f"{before} -> {after} ({(after - before) / before:+.0%})"
+
+
+def compare(previous: dict, current: dict) -> list[str]:
+    """Строки сравнения операций двух отчётов (перцентили, RPS, доля ошибок)"""
+    lines = []
+    for name, after in current["operations"].items():
+        before = previous["operations"].get(name)
+        if before is None:
+            lines.append(f"{name}: new")
+            continue
+        changes = ", ".join(f"{key} {_change(before[key], after[key])}" for key in COMPARED)
+        lines.append(f"{name}: {changes}")
+    return lines
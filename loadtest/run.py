@@ -0,0 +1,90 @@
+"""
+Headless-запуск сценариев locust для REST и gRPC с отчётами в JSON
+
+Для каждого протокола locust запускается отдельно с профилем нагрузки сценария (пользователи,
+скорость подъёма, длительность - их можно переопределить), отчёт пишется в
+loadtest/results/<сценарий>-<протокол>.json. Предыдущий отчёт того же сценария сохраняется
+как *.previous.json и сравнивается с новым; после запуска обоих протоколов печатается
+сравнение REST и gRPC.
+
+Пример: python -m loadtest.run --scenario workload --protocol both --run-time 1m
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from loadtest.report import compare
+from loadtest.scenarios import DEFAULT_SCENARIO, SCENARIOS
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS = Path(__file__).resolve().parent / "results"
+LOCUSTFILES = {"rest": "locustfile_rest.py", "grpc": "locustfile_grpc.py"}
+
+
+def run(scenario: str, protocol: str, host: str, args) -> Path:
+    profile = SCENARIOS[scenario]
+    report = args.output_dir / f"{scenario}-{protocol}.json"
+    if report.exists():
+        report.replace(report.with_suffix(".previous.json"))
+    command = [
+        sys.executable, "-m", "locust", "-f", LOCUSTFILES[protocol], "--headless", "--only-summary",
+        "--host", host,
+        "--users", str(args.users or profile.users),
+        "--spawn-rate", str(args.spawn_rate or profile.spawn_rate),
+        "--run-time", args.run_time or profile.run_time,
+        "--scenario", scenario,
+        "--report-json", str(report),
+    ]
+    print(f"== {scenario} / {protocol}: {' '.join(command[3:])}", flush=True)
+    # Код возврата locust ненулевой при любой ошибке запроса - отчёт всё равно нужен
+    subprocess.run(command, cwd=ROOT, check=False)
+    if not report.exists():
+        raise SystemExit(f"locust did not write {report}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run load test scenarios headless and export percentiles to JSON")
+    parser.add_argument("--scenario", action="append", choices=[*sorted(SCENARIOS), "all"])
+    parser.add_argument("--protocol", choices=("rest", "grpc", "both"), default="both")
+    parser.add_argument("--rest-host", default="http://localhost:8000")
+    parser.add_argument("--grpc-host", default="localhost:50051")
+    parser.add_argument("--users", type=int, help="override the scenario's number of users")
+    parser.add_argument("--spawn-rate", type=float, help="override the scenario's spawn rate")
+    parser.add_argument("--run-time", help="override the scenario's duration, e.g. 30s or 2m")
+    parser.add_argument("--output-dir", type=Path, default=RESULTS)
+    args = parser.parse_args()
+
+    scenarios = args.scenario or [DEFAULT_SCENARIO]
+    if "all" in scenarios:
+        scenarios = list(SCENARIOS)
+    protocols = ("rest", "grpc") if args.protocol == "both" else (args.protocol,)
+    hosts = {"rest": args.rest_host, "grpc": args.grpc_host}
+
+    for scenario in scenarios:
+        reports = {}
+        for protocol in protocols:
+            path = run(scenario, protocol, hosts[protocol], args)
+            reports[protocol] = json.loads(path.read_text(encoding="utf-8"))
+            previous = path.with_suffix(".previous.json")
+            if previous.exists():
+                print(f"-- {scenario} / {protocol} vs previous run")
+                for line in compare(json.loads(previous.read_text(encoding="utf-8")), reports[protocol]):
+                    print(f"   {line}")
+        if len(reports) == 2:
+            print(f"-- {scenario}: REST vs gRPC")
+            print(f"   {'operation':<12} {'p50 ms':>15} {'p95 ms':>15} {'p99 ms':>15} {'rps':>15} {'size':>17}")
+            rest = {key.split(" ", 1)[1]: value for key, value in reports["rest"]["operations"].items()}
+            grpc = {key.split(" ", 1)[1]: value for key, value in reports["grpc"]["operations"].items()}
+            for name in sorted(rest.keys() & grpc.keys()):
+                cells = [
+                    f"{rest[name][key]:>7g}/{grpc[name][key]:<7g}"
+                    for key in ("p50_ms", "p95_ms", "p99_ms", "rps", "avg_size")
+                ]
+                print(f"   {name:<12} {' '.join(cells)}")
+
+
+if __name__ == "__main__":
+    main()
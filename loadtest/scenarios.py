@@ -0,0 +1,115 @@
+"""
+Сценарии нагрузочного теста, общие для REST и gRPC
+
+Сценарий описывает только смесь операций, паузы и профиль нагрузки. Операции - функции,
+которые выбирают данные и вызывают одноимённый метод пользователя (RestGlossaryUser или
+GrpcUser в locustfile.py), поэтому оба протокола выполняют одну и ту же смесь на одних
+и тех же данных. Имена запросов в статистике совпадают (GetTerm, ListTerms, ...), протокол
+различается по request_type.
+
+Ключевые слова для чтения берутся из синтетического глоссария benchmarks.synthetic с теми же
+LOAD_TERMS и LOAD_SEED, что и у `make seed`, поэтому перед запуском БД нужно заполнить им.
+"""
+import os
+import random
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.pagination import encode_cursor
+
+# Параметры синтетического глоссария в тестируемой БД (см. make seed)
+LOAD_TERMS = int(os.getenv("LOAD_TERMS", "100000"))
+LOAD_SEED = int(os.getenv("LOAD_SEED", "42"))
+PAGE_SIZE = 100
+
+# Имена операций в статистике locust, одинаковые для обоих протоколов
+GET_TERM = "GetTerm"
+LIST_TERMS = "ListTerms"
+CREATE_TERM = "CreateTerm"
+UPDATE_TERM = "UpdateTerm"
+DELETE_TERM = "DeleteTerm"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    users: int
+    spawn_rate: float
+    run_time: str  # в формате locust --run-time
+    wait: tuple[float, float]  # пауза между операциями, секунды
+    weights: dict[str, int]  # операция -> вес
+
+
+# Сценарии из Load_testing_rest_vs_grpc.md
+SCENARIOS = {
+    scenario.name: scenario for scenario in (
+        Scenario("sanity", "Лёгкая нагрузка", 5, 1, "2m", (1, 3), {GET_TERM: 3, LIST_TERMS: 2}),
+        Scenario(
+            "workload", "Рабочая нагрузка", 50, 5, "5m", (1, 3),
+            {GET_TERM: 40, LIST_TERMS: 30, CREATE_TERM: 15, UPDATE_TERM: 10, DELETE_TERM: 5},
+        ),
+        Scenario(
+            "stress", "Стресс-тест", 200, 10, "10m", (0.5, 1),
+            {GET_TERM: 40, LIST_TERMS: 30, CREATE_TERM: 15, UPDATE_TERM: 10, DELETE_TERM: 5},
+        ),
+        Scenario(
+            "stability", "Тест на стабильность", 100, 5, "30m", (1, 3),
+            {GET_TERM: 1, LIST_TERMS: 1, CREATE_TERM: 1, UPDATE_TERM: 1, DELETE_TERM: 1},
+        ),
+    )
+}
+DEFAULT_SCENARIO = "workload"
+
+
+@lru_cache(maxsize=1)
+def keywords() -> tuple[str, ...]:
+    """Ключевые слова засеянного глоссария (генерируются один раз на процесс)"""
+    from benchmarks.synthetic import generate
+
+    return tuple(generate(LOAD_TERMS, 0, seed=LOAD_SEED).keywords)
+
+
+def new_keyword() -> str:
+    """Уникальное ключевое слово для создаваемого термина (уникально и между процессами)"""
+    return f"Load {uuid.uuid4().hex[:16]}"
+
+
+def get_term(user) -> None:
+    user.get_term(random.choice(keywords()))
+
+
+def list_terms(user) -> None:
+    """Страница после случайного термина: нагрузка на индекс, а не только на первую страницу"""
+    user.list_terms(encode_cursor(random.choice(keywords())), PAGE_SIZE)
+
+
+def create_term(user) -> None:
+    keyword = new_keyword()
+    if user.create_term(keyword, f"Нагрузочный термин {keyword}", "https://load.example.com"):
+        user.created.append(keyword)
+
+
+def update_term(user) -> None:
+    keyword = random.choice(keywords())
+    user.update_term(keyword, f"Обновлено нагрузочным тестом {uuid.uuid4().hex[:8]}")
+
+
+def delete_term(user) -> None:
+    """Удаляется термин, созданный этим пользователем; если таких нет - несуществующий (ответ 404 ожидаем)"""
+    user.delete_term(user.created.pop() if user.created else new_keyword())
+
+
+OPERATIONS = {
+    GET_TERM: get_term,
+    LIST_TERMS: list_terms,
+    CREATE_TERM: create_term,
+    UPDATE_TERM: update_term,
+    DELETE_TERM: delete_term,
+}
+
+
+def tasks(scenario: Scenario) -> list:
+    """Задачи locust: операция повторяется по своему весу, как в разобранном @task(weight)"""
+    return [OPERATIONS[name] for name, weight in scenario.weights.items() for _ in range(weight)]
@@ -1,14 +1,28 @@
 """
 Нагрузочное тестирование REST и gRPC API глоссария с помощью Locust
+
+Смесь операций, паузы и данные задаёт сценарий из loadtest/scenarios.py (--scenario или
+LOCUST_SCENARIO), одинаковый для обоих протоколов. С --report-json итоговые перцентили
+сохраняются в JSON (см. loadtest/run.py для headless-запусков сценариев).
 """
-import random
-import time
-from locust import HttpUser, TaskSet, task, between, events
-from locust.contrib.fasthttp import FastHttpUser
-import grpc
 import sys
+import time
 from pathlib import Path
 
+import grpc
+import grpc.experimental.gevent as grpc_gevent
+from locust import HttpUser, User, between, events
+from locust.runners import WorkerRunner
+
+from loadtest.report import build_report, write_report
+from loadtest.scenarios import (
+    CREATE_TERM, DEFAULT_SCENARIO, DELETE_TERM, GET_TERM, LIST_TERMS, SCENARIOS, UPDATE_TERM,
+    tasks as scenario_tasks,
+)
+
+# Блокирующие вызовы grpc должны уступать управление другим пользователям-greenlet-ам
+grpc_gevent.init_gevent()
+
 # Добавляем путь к proto модулям
 sys.path.insert(0, str(Path(__file__).parent / "proto"))
 
@@ -19,230 +33,119 @@ except ImportError:
     glossary_pb2 = None
     glossary_pb2_grpc = None
 
+REQUEST_TIMEOUT = 5  # секунды
+
 
 class RestGlossaryUser(HttpUser):
     """
     Класс пользователя для тестирования REST API
     Имитирует поведение клиента, работающего с глоссарием через REST
     """
-    wait_time = between(1, 3)  # Пауза между запросами 1-3 секунды
-    
-    # Список ключевых слов для тестирования
-    test_keywords = [
-        "API", "REST", "gRPC", "HTTP", "JSON", "XML", 
-        "SOAP", "GraphQL", "WebSocket", "TCP", "UDP"
-    ]
-    
+    tasks = scenario_tasks(SCENARIOS[DEFAULT_SCENARIO])
+    wait_time = between(*SCENARIOS[DEFAULT_SCENARIO].wait)
+
     def on_start(self):
-        """Выполняется при старте каждого пользователя"""
-        # Проверка работоспособности
-        self.client.get("/health", name="Health check")
-    
-    @task(3)
-    def get_term(self):
-        """Получение термина по ключевому слову (легкий запрос)"""
-        keyword = random.choice(self.test_keywords)
-        self.client.get(f"/terms/{keyword}", name="Get term by keyword")
-    
-    @task(2)
-    def list_terms(self):
-        """Получение списка всех терминов (более тяжелый запрос)"""
-        self.client.get("/terms/", name="List all terms")
-    
-    @task(1)
-    def create_term(self):
-        """Создание нового термина (средний запрос)"""
-        keyword = f"TEST_{random.randint(1000, 9999)}"
-        payload = {
-            "keyword": keyword,
-            "description": f"Test description for {keyword}",
-            "source": "https://test.example.com"
-        }
-        self.client.post("/terms/", json=payload, name="Create term")
-    
-    @task(1)
-    def update_term(self):
-        """Обновление термина (средний запрос)"""
-        keyword = random.choice(self.test_keywords)
-        payload = {
-            "description": f"Updated description for {keyword}",
-            "source": "https://updated.example.com"
-        }
-        self.client.put(f"/terms/{keyword}", json=payload, name="Update term")
-    
-    @task(1)
-    def delete_term(self):
-        """Удаление термина (легкий запрос)"""
-        # Используем тестовый термин для удаления
-        keyword = f"TEST_{random.randint(1000, 9999)}"
-        self.client.delete(f"/terms/{keyword}", name="Delete term")
-
-
-class GrpcGlossaryUser(TaskSet):
+        self.created = []
+
+    def get_term(self, keyword):
+        self.client.get(f"/terms/{keyword}", name=GET_TERM, timeout=REQUEST_TIMEOUT)
+
+    def list_terms(self, after, limit):
+        self.client.get("/terms/", params={"after": after, "limit": limit}, name=LIST_TERMS, timeout=REQUEST_TIMEOUT)
+
+    def create_term(self, keyword, description, source):
+        payload = {"keyword": keyword, "description": description, "source": source}
+        return self.client.post("/terms/", json=payload, name=CREATE_TERM, timeout=REQUEST_TIMEOUT).ok
+
+    def update_term(self, keyword, description):
+        self.client.put(f"/terms/{keyword}", json={"description": description}, name=UPDATE_TERM, timeout=REQUEST_TIMEOUT)
+
+    def delete_term(self, keyword):
+        with self.client.delete(
+            f"/terms/{keyword}", name=DELETE_TERM, timeout=REQUEST_TIMEOUT, catch_response=True
+        ) as response:
+            if response.status_code == 404:
+                response.success()
+
+
+class GrpcUser(User):
     """
     Класс пользователя для тестирования gRPC API
-    Имитирует поведение клиента, работающего с глоссарием через gRPC
+
+    У каждого пользователя свой канал (и своё HTTP/2-соединение: локальный пул подканалов,
+    иначе grpc объединил бы каналы с одинаковыми параметрами в одно соединение), который
+    открывается при старте пользователя и используется всеми его вызовами.
     """
-    wait_time = between(1, 3)  # Пауза между запросами 1-3 секунды
-    
-    test_keywords = [
-        "API", "REST", "gRPC", "HTTP", "JSON", "XML", 
-        "SOAP", "GraphQL", "WebSocket", "TCP", "UDP"
-    ]
-    
+    host = "localhost:50051"
+    tasks = scenario_tasks(SCENARIOS[DEFAULT_SCENARIO])
+    wait_time = between(*SCENARIOS[DEFAULT_SCENARIO].wait)
+
     def on_start(self):
-        """Выполняется при старте каждого пользователя"""
-        # Создание gRPC канала
-        self.channel = grpc.insecure_channel(self.user.host)
+        self.created = []
+        self.channel = grpc.insecure_channel(self.host, options=[("grpc.use_local_subchannel_pool", 1)])
         self.stub = glossary_pb2_grpc.GlossaryServiceStub(self.channel)
-    
+
     def on_stop(self):
-        """Выполняется при остановке пользователя"""
-        if hasattr(self, 'channel'):
-            self.channel.close()
-    
-    @task(3)
-    def get_term(self):
-        """Получение термина по ключевому слову (легкий запрос)"""
-        keyword = random.choice(self.test_keywords)
-        request = glossary_pb2.GetTermRequest(keyword=keyword)
-        start_time = time.time()
-        try:
-            response = self.stub.GetTerm(request, timeout=5)
-            request_meta = {
-                "request_type": "grpc",
-                "name": "GetTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": None,
-            }
-            events.request.fire(**request_meta)
-        except grpc.RpcError as e:
-            request_meta = {
-                "request_type": "grpc",
-                "name": "GetTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": e,
-            }
-            events.request.fire(**request_meta)
-    
-    @task(2)
-    def list_terms(self):
-        """Получение списка всех терминов (более тяжелый запрос)"""
-        request = glossary_pb2.ListTermsRequest(limit=100, offset=0)
-        start_time = time.time()
-        try:
-            response = self.stub.ListTerms(request, timeout=5)
-            request_meta = {
-                "request_type": "grpc",
-                "name": "ListTerms",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": None,
-            }
-            events.request.fire(**request_meta)
-        except grpc.RpcError as e:
-            request_meta = {
-                "request_type": "grpc",
-                "name": "ListTerms",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": e,
-            }
-            events.request.fire(**request_meta)
-    
-    @task(1)
-    def create_term(self):
-        """Создание нового термина (средний запрос)"""
-        keyword = f"TEST_{random.randint(1000, 9999)}"
-        request = glossary_pb2.CreateTermRequest(
-            keyword=keyword,
-            description=f"Test description for {keyword}",
-            source="https://test.example.com"
-        )
-        start_time = time.time()
+        self.channel.close()
+
+    def _call(self, name, method, request, expected=()):
+        """Вызов RPC с отчётом в статистику locust; размер ответа - длина сериализованного сообщения"""
+        started = time.perf_counter()
+        response, exception = None, None
         try:
-            response = self.stub.CreateTerm(request, timeout=5)
-            request_meta = {
-                "request_type": "grpc",
-                "name": "CreateTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": None,
-            }
-            events.request.fire(**request_meta)
-        except grpc.RpcError as e:
-            request_meta = {
-                "request_type": "grpc",
-                "name": "CreateTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": e,
-            }
-            events.request.fire(**request_meta)
-    
-    @task(1)
-    def update_term(self):
-        """Обновление термина (средний запрос)"""
-        keyword = random.choice(self.test_keywords)
-        request = glossary_pb2.UpdateTermRequest(
-            keyword=keyword,
-            description=f"Updated description for {keyword}",
-            source="https://updated.example.com"
+            response = method(request, timeout=REQUEST_TIMEOUT)
+        except grpc.RpcError as exc:
+            if exc.code() not in expected:
+                exception = exc
+        self.environment.events.request.fire(
+            request_type="grpc",
+            name=name,
+            response_time=(time.perf_counter() - started) * 1000,
+            response_length=response.ByteSize() if response is not None else 0,
+            exception=exception,
+            context={},
         )
-        start_time = time.time()
-        try:
-            response = self.stub.UpdateTerm(request, timeout=5)
-            request_meta = {
-                "request_type": "grpc",
-                "name": "UpdateTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": None,
-            }
-            events.request.fire(**request_meta)
-        except grpc.RpcError as e:
-            request_meta = {
-                "request_type": "grpc",
-                "name": "UpdateTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": e,
-            }
-            events.request.fire(**request_meta)
-    
-    @task(1)
-    def delete_term(self):
-        """Удаление термина (легкий запрос)"""
-        keyword = f"TEST_{random.randint(1000, 9999)}"
+        return response
+
+    def get_term(self, keyword):
+        self._call(GET_TERM, self.stub.GetTerm, glossary_pb2.GetTermRequest(keyword=keyword))
+
+    def list_terms(self, after, limit):
+        self._call(LIST_TERMS, self.stub.ListTerms, glossary_pb2.ListTermsRequest(after=after, limit=limit))
+
+    def create_term(self, keyword, description, source):
+        request = glossary_pb2.CreateTermRequest(keyword=keyword, description=description, source=source)
+        return self._call(CREATE_TERM, self.stub.CreateTerm, request) is not None
+
+    def update_term(self, keyword, description):
+        request = glossary_pb2.UpdateTermRequest(keyword=keyword, description=description)
+        self._call(UPDATE_TERM, self.stub.UpdateTerm, request)
+
+    def delete_term(self, keyword):
         request = glossary_pb2.DeleteTermRequest(keyword=keyword)
-        start_time = time.time()
-        try:
-            response = self.stub.DeleteTerm(request, timeout=5)
-            request_meta = {
-                "request_type": "grpc",
-                "name": "DeleteTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": None,
-            }
-            events.request.fire(**request_meta)
-        except grpc.RpcError as e:
-            request_meta = {
-                "request_type": "grpc",
-                "name": "DeleteTerm",
-                "response_time": (time.time() - start_time) * 1000,
-                "response_length": 0,
-                "exception": e,
-            }
-            events.request.fire(**request_meta)
-
-
-class GrpcUser(HttpUser):
-    """
-    Обертка для GrpcGlossaryUser, так как Locust требует HttpUser
-    """
-    tasks = [GrpcGlossaryUser]
-    host = "localhost:50051"  # gRPC сервер
-    wait_time = between(1, 3)
+        self._call(DELETE_TERM, self.stub.DeleteTerm, request, expected=(grpc.StatusCode.NOT_FOUND,))
+
+
+@events.init_command_line_parser.add_listener
+def _add_arguments(parser):
+    parser.add_argument(
+        "--scenario", choices=sorted(SCENARIOS), default=DEFAULT_SCENARIO, env_var="LOCUST_SCENARIO",
+        help="Смесь операций и паузы из loadtest/scenarios.py"
+    )
+    parser.add_argument("--report-json", default="", help="Сохранить итоговые перцентили в JSON")
+
+
+@events.init.add_listener
+def _apply_scenario(environment, **_kwargs):
+    scenario = SCENARIOS[environment.parsed_options.scenario]
+    for user_class in (RestGlossaryUser, GrpcUser):
+        user_class.tasks = scenario_tasks(scenario)
+        user_class.wait_time = between(*scenario.wait)
+
+
+@events.quitting.add_listener
+def _export_report(environment, **_kwargs):
+    path = environment.parsed_options.report_json
+    # Воркеры распределённого запуска не пишут отчёт: итоговая статистика есть только у мастера
+    if path and not isinstance(environment.runner, WorkerRunner):
+        write_report(build_report(environment, environment.parsed_options.scenario), path)
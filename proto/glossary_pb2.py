@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: glossary.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'glossary.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eglossary.proto\x12\x08glossary\"T\n\x10ListTermsRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\x0e\n\x06offset\x18\x02 \x01(\x05\x12\r\n\x05\x61\x66ter\x18\x03 \x01(\t\x12\x12\n\nskip_total\x18\x04 \x01(\x08\"V\n\x11ListTermsResponse\x12\x1d\n\x05terms\x18\x01 \x03(\x0b\x32\x0e.glossary.Term\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x13\n\x0bnext_cursor\x18\x03 \x01(\t\"7\n\x12StreamTermsRequest\x12\x12\n\nchunk_size\x18\x01 \x01(\x05\x12\r\n\x05\x61\x66ter\x18\x02 \x01(\t\"?\n\tTermChunk\x12\x1d\n\x05terms\x18\x01 \x03(\x0b\x32\x0e.glossary.Term\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t\"!\n\x0eGetTermRequest\x12\x0f\n\x07keyword\x18\x01 \x01(\t\"/\n\x0fGetTermResponse\x12\x1c\n\x04term\x18\x01 \x01(\x0b\x32\x0e.glossary.Term\"I\n\x11\x43reateTermRequest\x12\x0f\n\x07keyword\x18\x01 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x02 \x01(\t\x12\x0e\n\x06source\x18\x03 \x01(\t\"2\n\x12\x43reateTermResponse\x12\x1c\n\x04term\x18\x01 \x01(\x0b\x32\x0e.glossary.Term\"^\n\x11UpdateTermRequest\x12\x0f\n\x07keyword\x18\x01 \x01(\t\x12\x13\n\x0bnew_keyword\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x0e\n\x06source\x18\x04 \x01(\t\"2\n\x12UpdateTermResponse\x12\x1c\n\x04term\x18\x01 \x01(\x0b\x32\x0e.glossary.Term\"$\n\x11\x44\x65leteTermRequest\x12\x0f\n\x07keyword\x18\x01 \x01(\t\"6\n\x12\x44\x65leteTermResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"(\n\x14\x42\x61tchGetTermsRequest\x12\x10\n\x08keywords\x18\x01 \x03(\t\"G\n\x15\x42\x61tchGetTermsResponse\x12\x1d\n\x05terms\x18\x01 \x03(\x0b\x32\x0e.glossary.Term\x12\x0f\n\x07missing\x18\x02 \x03(\t\"D\n\x16\x42ulkCreateTermsRequest\x12*\n\x05terms\x18\x01 \x03(\x0b\x32\x1b.glossary.CreateTermRequest\"*\n\x16\x42ulkDeleteTermsRequest\x12\x10\n\x08keywords\x18\x01 \x03(\t\"u\n\x0e\x42ulkItemResult\x12\x0f\n\x07keyword\x18\x01 \x01(\t\x12$\n\x06status\x18\x02 \x01(\x0e\x32\x14.glossary.BulkStatus\x12\x1c\n\x04term\x18\x03 \x01(\x0b\x32\x0e.glossary.Term\x12\x0e\n\x06\x64\x65tail\x18\x04 \x01(\t\"9\n\x0c\x42ulkResponse\x12)\n\x07results\x18\x01 \x03(\x0b\x32\x18.glossary.BulkItemResult\"X\n\x12SearchTermsRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\x0e\n\x06offset\x18\x03 \x01(\x05\x12\x14\n\x0cno_highlight\x18\x04 \x01(\x08\"d\n\tSearchHit\x12\x1c\n\x04term\x18\x01 \x01(\x0b\x32\x0e.glossary.Term\x12\r\n\x05score\x18\x02 \x01(\x01\x12\x19\n\x11keyword_highlight\x18\x03 \x01(\t\x12\x0f\n\x07snippet\x18\x04 \x01(\t\"M\n\x13SearchTermsResponse\x12!\n\x04hits\x18\x01 \x03(\x0b\x32\x13.glossary.SearchHit\x12\x13\n\x0bnext_offset\x18\x02 \x01(\x05\"4\n\x13SuggestTermsRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\"(\n\x14SuggestTermsResponse\x12\x10\n\x08keywords\x18\x01 \x03(\t\"s\n\x15\x43reateRelationRequest\x12\x16\n\x0esource_keyword\x18\x01 \x01(\t\x12\x16\n\x0etarget_keyword\x18\x02 \x01(\t\x12\x15\n\rrelation_type\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x04 \x01(\t\">\n\x16\x43reateRelationResponse\x12$\n\x08relation\x18\x01 \x01(\x0b\x32\x12.glossary.Relation\"L\n\x14ListRelationsRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\r\n\x05\x61\x66ter\x18\x02 \x01(\t\x12\x16\n\x0erelation_types\x18\x03 \x03(\t\"`\n\x17GetTermRelationsRequest\x12\x0f\n\x07keyword\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\r\n\x05\x61\x66ter\x18\x03 \x01(\t\x12\x16\n\x0erelation_types\x18\x04 \x03(\t\"S\n\x15ListRelationsResponse\x12%\n\trelations\x18\x01 \x03(\x0b\x32\x12.glossary.Relation\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t\"#\n\x15\x44\x65leteRelationRequest\x12\n\n\x02id\x18\x01 \x01(\x05\":\n\x16\x44\x65leteRelationResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"(\n\x12StreamGraphRequest\x12\x12\n\nchunk_size\x18\x01 \x01(\x05\"`\n\nGraphChunk\x12\x1d\n\x05nodes\x18\x01 \x03(\x0b\x32\x0e.glossary.Term\x12\"\n\x05\x65\x64ges\x18\x02 \x03(\x0b\x32\x13.glossary.GraphEdge\x12\x0f\n\x07version\x18\x03 \x01(\x03\"c\n\tGraphEdge\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0e\n\x06source\x18\x02 \x01(\x05\x12\x0e\n\x06target\x18\x03 \x01(\x05\x12\x15\n\rrelation_type\x18\x04 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x05 \x01(\t\"\x98\x01\n\x08Relation\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x11\n\tsource_id\x18\x02 \x01(\x05\x12\x11\n\ttarget_id\x18\x03 \x01(\x05\x12\x15\n\rrelation_type\x18\x04 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x05 \x01(\t\x12\x16\n\x0esource_keyword\x18\x06 \x01(\t\x12\x16\n\x0etarget_keyword\x18\x07 \x01(\t\"H\n\x04Term\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0f\n\x07keyword\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x0e\n\x06source\x18\x04 \x01(\t*k\n\nBulkStatus\x12\x1b\n\x17\x42ULK_STATUS_UNSPECIFIED\x10\x00\x12\x0b\n\x07\x43REATED\x10\x01\x12\x0b\n\x07\x44\x45LETED\x10\x02\x12\x0c\n\x08\x43ONFLICT\x10\x03\x12\r\n\tNOT_FOUND\x10\x04\x12\t\n\x05\x45RROR\x10\x05\x32\xd6\t\n\x0fGlossaryService\x12\x44\n\tListTerms\x12\x1a.glossary.ListTermsRequest\x1a\x1b.glossary.ListTermsResponse\x12\x42\n\x0bStreamTerms\x12\x1c.glossary.StreamTermsRequest\x1a\x13.glossary.TermChunk0\x01\x12>\n\x07GetTerm\x12\x18.glossary.GetTermRequest\x1a\x19.glossary.GetTermResponse\x12G\n\nCreateTerm\x12\x1b.glossary.CreateTermRequest\x1a\x1c.glossary.CreateTermResponse\x12G\n\nUpdateTerm\x12\x1b.glossary.UpdateTermRequest\x1a\x1c.glossary.UpdateTermResponse\x12G\n\nDeleteTerm\x12\x1b.glossary.DeleteTermRequest\x1a\x1c.glossary.DeleteTermResponse\x12P\n\rBatchGetTerms\x12\x1e.glossary.BatchGetTermsRequest\x1a\x1f.glossary.BatchGetTermsResponse\x12K\n\x0f\x42ulkCreateTerms\x12 .glossary.BulkCreateTermsRequest\x1a\x16.glossary.BulkResponse\x12K\n\x0f\x42ulkDeleteTerms\x12 .glossary.BulkDeleteTermsRequest\x1a\x16.glossary.BulkResponse\x12J\n\x0bSearchTerms\x12\x1c.glossary.SearchTermsRequest\x1a\x1d.glossary.SearchTermsResponse\x12M\n\x0cSuggestTerms\x12\x1d.glossary.SuggestTermsRequest\x1a\x1e.glossary.SuggestTermsResponse\x12S\n\x0e\x43reateRelation\x12\x1f.glossary.CreateRelationRequest\x1a .glossary.CreateRelationResponse\x12P\n\rListRelations\x12\x1e.glossary.ListRelationsRequest\x1a\x1f.glossary.ListRelationsResponse\x12V\n\x10GetTermRelations\x12!.glossary.GetTermRelationsRequest\x1a\x1f.glossary.ListRelationsResponse\x12S\n\x0e\x44\x65leteRelation\x12\x1f.glossary.DeleteRelationRequest\x1a .glossary.DeleteRelationResponse\x12\x43\n\x0bStreamGraph\x12\x1c.glossary.StreamGraphRequest\x1a\x14.glossary.GraphChunk0\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'glossary_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_BULKSTATUS']._serialized_start=2560
+  _globals['_BULKSTATUS']._serialized_end=2667
+  _globals['_LISTTERMSREQUEST']._serialized_start=28
+  _globals['_LISTTERMSREQUEST']._serialized_end=112
+  _globals['_LISTTERMSRESPONSE']._serialized_start=114
+  _globals['_LISTTERMSRESPONSE']._serialized_end=200
+  _globals['_STREAMTERMSREQUEST']._serialized_start=202
+  _globals['_STREAMTERMSREQUEST']._serialized_end=257
+  _globals['_TERMCHUNK']._serialized_start=259
+  _globals['_TERMCHUNK']._serialized_end=322
+  _globals['_GETTERMREQUEST']._serialized_start=324
+  _globals['_GETTERMREQUEST']._serialized_end=357
+  _globals['_GETTERMRESPONSE']._serialized_start=359
+  _globals['_GETTERMRESPONSE']._serialized_end=406
+  _globals['_CREATETERMREQUEST']._serialized_start=408
+  _globals['_CREATETERMREQUEST']._serialized_end=481
+  _globals['_CREATETERMRESPONSE']._serialized_start=483
+  _globals['_CREATETERMRESPONSE']._serialized_end=533
+  _globals['_UPDATETERMREQUEST']._serialized_start=535
+  _globals['_UPDATETERMREQUEST']._serialized_end=629
+  _globals['_UPDATETERMRESPONSE']._serialized_start=631
+  _globals['_UPDATETERMRESPONSE']._serialized_end=681
+  _globals['_DELETETERMREQUEST']._serialized_start=683
+  _globals['_DELETETERMREQUEST']._serialized_end=719
+  _globals['_DELETETERMRESPONSE']._serialized_start=721
+  _globals['_DELETETERMRESPONSE']._serialized_end=775
+  _globals['_BATCHGETTERMSREQUEST']._serialized_start=777
+  _globals['_BATCHGETTERMSREQUEST']._serialized_end=817
+  _globals['_BATCHGETTERMSRESPONSE']._serialized_start=819
+  _globals['_BATCHGETTERMSRESPONSE']._serialized_end=890
+  _globals['_BULKCREATETERMSREQUEST']._serialized_start=892
+  _globals['_BULKCREATETERMSREQUEST']._serialized_end=960
+  _globals['_BULKDELETETERMSREQUEST']._serialized_start=962
+  _globals['_BULKDELETETERMSREQUEST']._serialized_end=1004
+  _globals['_BULKITEMRESULT']._serialized_start=1006
+  _globals['_BULKITEMRESULT']._serialized_end=1123
+  _globals['_BULKRESPONSE']._serialized_start=1125
+  _globals['_BULKRESPONSE']._serialized_end=1182
+  _globals['_SEARCHTERMSREQUEST']._serialized_start=1184
+  _globals['_SEARCHTERMSREQUEST']._serialized_end=1272
+  _globals['_SEARCHHIT']._serialized_start=1274
+  _globals['_SEARCHHIT']._serialized_end=1374
+  _globals['_SEARCHTERMSRESPONSE']._serialized_start=1376
+  _globals['_SEARCHTERMSRESPONSE']._serialized_end=1453
+  _globals['_SUGGESTTERMSREQUEST']._serialized_start=1455
+  _globals['_SUGGESTTERMSREQUEST']._serialized_end=1507
+  _globals['_SUGGESTTERMSRESPONSE']._serialized_start=1509
+  _globals['_SUGGESTTERMSRESPONSE']._serialized_end=1549
+  _globals['_CREATERELATIONREQUEST']._serialized_start=1551
+  _globals['_CREATERELATIONREQUEST']._serialized_end=1666
+  _globals['_CREATERELATIONRESPONSE']._serialized_start=1668
+  _globals['_CREATERELATIONRESPONSE']._serialized_end=1730
+  _globals['_LISTRELATIONSREQUEST']._serialized_start=1732
+  _globals['_LISTRELATIONSREQUEST']._serialized_end=1808
+  _globals['_GETTERMRELATIONSREQUEST']._serialized_start=1810
+  _globals['_GETTERMRELATIONSREQUEST']._serialized_end=1906
+  _globals['_LISTRELATIONSRESPONSE']._serialized_start=1908
+  _globals['_LISTRELATIONSRESPONSE']._serialized_end=1991
+  _globals['_DELETERELATIONREQUEST']._serialized_start=1993
+  _globals['_DELETERELATIONREQUEST']._serialized_end=2028
+  _globals['_DELETERELATIONRESPONSE']._serialized_start=2030
+  _globals['_DELETERELATIONRESPONSE']._serialized_end=2088
+  _globals['_STREAMGRAPHREQUEST']._serialized_start=2090
+  _globals['_STREAMGRAPHREQUEST']._serialized_end=2130
+  _globals['_GRAPHCHUNK']._serialized_start=2132
+  _globals['_GRAPHCHUNK']._serialized_end=2228
+  _globals['_GRAPHEDGE']._serialized_start=2230
+  _globals['_GRAPHEDGE']._serialized_end=2329
+  _globals['_RELATION']._serialized_start=2332
+  _globals['_RELATION']._serialized_end=2484
+  _globals['_TERM']._serialized_start=2486
+  _globals['_TERM']._serialized_end=2558
+  _globals['_GLOSSARYSERVICE']._serialized_start=2670
+  _globals['_GLOSSARYSERVICE']._serialized_end=3908
+# @@protoc_insertion_point(module_scope)
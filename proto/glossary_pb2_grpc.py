@@ -0,0 +1,761 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import glossary_pb2 as glossary__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in glossary_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class GlossaryServiceStub:
+    """Сервис для работы с глоссарием терминов
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.ListTerms = channel.unary_unary(
+                '/glossary.GlossaryService/ListTerms',
+                request_serializer=glossary__pb2.ListTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.ListTermsResponse.FromString,
+                _registered_method=True)
+        self.StreamTerms = channel.unary_stream(
+                '/glossary.GlossaryService/StreamTerms',
+                request_serializer=glossary__pb2.StreamTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.TermChunk.FromString,
+                _registered_method=True)
+        self.GetTerm = channel.unary_unary(
+                '/glossary.GlossaryService/GetTerm',
+                request_serializer=glossary__pb2.GetTermRequest.SerializeToString,
+                response_deserializer=glossary__pb2.GetTermResponse.FromString,
+                _registered_method=True)
+        self.CreateTerm = channel.unary_unary(
+                '/glossary.GlossaryService/CreateTerm',
+                request_serializer=glossary__pb2.CreateTermRequest.SerializeToString,
+                response_deserializer=glossary__pb2.CreateTermResponse.FromString,
+                _registered_method=True)
+        self.UpdateTerm = channel.unary_unary(
+                '/glossary.GlossaryService/UpdateTerm',
+                request_serializer=glossary__pb2.UpdateTermRequest.SerializeToString,
+                response_deserializer=glossary__pb2.UpdateTermResponse.FromString,
+                _registered_method=True)
+        self.DeleteTerm = channel.unary_unary(
+                '/glossary.GlossaryService/DeleteTerm',
+                request_serializer=glossary__pb2.DeleteTermRequest.SerializeToString,
+                response_deserializer=glossary__pb2.DeleteTermResponse.FromString,
+                _registered_method=True)
+        self.BatchGetTerms = channel.unary_unary(
+                '/glossary.GlossaryService/BatchGetTerms',
+                request_serializer=glossary__pb2.BatchGetTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.BatchGetTermsResponse.FromString,
+                _registered_method=True)
+        self.BulkCreateTerms = channel.unary_unary(
+                '/glossary.GlossaryService/BulkCreateTerms',
+                request_serializer=glossary__pb2.BulkCreateTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.BulkResponse.FromString,
+                _registered_method=True)
+        self.BulkDeleteTerms = channel.unary_unary(
+                '/glossary.GlossaryService/BulkDeleteTerms',
+                request_serializer=glossary__pb2.BulkDeleteTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.BulkResponse.FromString,
+                _registered_method=True)
+        self.SearchTerms = channel.unary_unary(
+                '/glossary.GlossaryService/SearchTerms',
+                request_serializer=glossary__pb2.SearchTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.SearchTermsResponse.FromString,
+                _registered_method=True)
+        self.SuggestTerms = channel.unary_unary(
+                '/glossary.GlossaryService/SuggestTerms',
+                request_serializer=glossary__pb2.SuggestTermsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.SuggestTermsResponse.FromString,
+                _registered_method=True)
+        self.CreateRelation = channel.unary_unary(
+                '/glossary.GlossaryService/CreateRelation',
+                request_serializer=glossary__pb2.CreateRelationRequest.SerializeToString,
+                response_deserializer=glossary__pb2.CreateRelationResponse.FromString,
+                _registered_method=True)
+        self.ListRelations = channel.unary_unary(
+                '/glossary.GlossaryService/ListRelations',
+                request_serializer=glossary__pb2.ListRelationsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.ListRelationsResponse.FromString,
+                _registered_method=True)
+        self.GetTermRelations = channel.unary_unary(
+                '/glossary.GlossaryService/GetTermRelations',
+                request_serializer=glossary__pb2.GetTermRelationsRequest.SerializeToString,
+                response_deserializer=glossary__pb2.ListRelationsResponse.FromString,
+                _registered_method=True)
+        self.DeleteRelation = channel.unary_unary(
+                '/glossary.GlossaryService/DeleteRelation',
+                request_serializer=glossary__pb2.DeleteRelationRequest.SerializeToString,
+                response_deserializer=glossary__pb2.DeleteRelationResponse.FromString,
+                _registered_method=True)
+        self.StreamGraph = channel.unary_stream(
+                '/glossary.GlossaryService/StreamGraph',
+                request_serializer=glossary__pb2.StreamGraphRequest.SerializeToString,
+                response_deserializer=glossary__pb2.GraphChunk.FromString,
+                _registered_method=True)
+
+
+class GlossaryServiceServicer:
+    """Сервис для работы с глоссарием терминов
+    """
+
+    def ListTerms(self, request, context):
+        """Получение страницы терминов по курсору (более тяжелый метод)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamTerms(self, request, context):
+        """Потоковая выгрузка всех терминов чанками (для экспорта больших глоссариев)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTerm(self, request, context):
+        """Получение конкретного термина по ключевому слову (легкий метод - поиск по индексу)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CreateTerm(self, request, context):
+        """Создание нового термина (средний метод - валидация + запись в БД)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UpdateTerm(self, request, context):
+        """Обновление существующего термина (средний метод - поиск + валидация + обновление)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DeleteTerm(self, request, context):
+        """Удаление термина (легкий метод - поиск + удаление)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchGetTerms(self, request, context):
+        """Получение нескольких терминов по ключевым словам за один вызов
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BulkCreateTerms(self, request, context):
+        """Пакетное создание терминов в одной транзакции
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BulkDeleteTerms(self, request, context):
+        """Пакетное удаление терминов в одной транзакции
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SearchTerms(self, request, context):
+        """Полнотекстовый поиск по keyword и description с ранжированием BM25
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SuggestTerms(self, request, context):
+        """Автодополнение ключевых слов по префиксу (индекс в памяти сервера)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CreateRelation(self, request, context):
+        """Создание связи между терминами (повтор связи того же типа - ALREADY_EXISTS)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListRelations(self, request, context):
+        """Страница связей по курсору, опционально только заданных типов
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTermRelations(self, request, context):
+        """Исходящие и входящие связи термина, страница по курсору
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DeleteRelation(self, request, context):
+        """Удаление связи по id
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamGraph(self, request, context):
+        """Потоковая выгрузка графа: сначала узлы, затем рёбра, чанками ограниченного размера (сжатие gzip)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_GlossaryServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'ListTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListTerms,
+                    request_deserializer=glossary__pb2.ListTermsRequest.FromString,
+                    response_serializer=glossary__pb2.ListTermsResponse.SerializeToString,
+            ),
+            'StreamTerms': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTerms,
+                    request_deserializer=glossary__pb2.StreamTermsRequest.FromString,
+                    response_serializer=glossary__pb2.TermChunk.SerializeToString,
+            ),
+            'GetTerm': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTerm,
+                    request_deserializer=glossary__pb2.GetTermRequest.FromString,
+                    response_serializer=glossary__pb2.GetTermResponse.SerializeToString,
+            ),
+            'CreateTerm': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateTerm,
+                    request_deserializer=glossary__pb2.CreateTermRequest.FromString,
+                    response_serializer=glossary__pb2.CreateTermResponse.SerializeToString,
+            ),
+            'UpdateTerm': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateTerm,
+                    request_deserializer=glossary__pb2.UpdateTermRequest.FromString,
+                    response_serializer=glossary__pb2.UpdateTermResponse.SerializeToString,
+            ),
+            'DeleteTerm': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeleteTerm,
+                    request_deserializer=glossary__pb2.DeleteTermRequest.FromString,
+                    response_serializer=glossary__pb2.DeleteTermResponse.SerializeToString,
+            ),
+            'BatchGetTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetTerms,
+                    request_deserializer=glossary__pb2.BatchGetTermsRequest.FromString,
+                    response_serializer=glossary__pb2.BatchGetTermsResponse.SerializeToString,
+            ),
+            'BulkCreateTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.BulkCreateTerms,
+                    request_deserializer=glossary__pb2.BulkCreateTermsRequest.FromString,
+                    response_serializer=glossary__pb2.BulkResponse.SerializeToString,
+            ),
+            'BulkDeleteTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.BulkDeleteTerms,
+                    request_deserializer=glossary__pb2.BulkDeleteTermsRequest.FromString,
+                    response_serializer=glossary__pb2.BulkResponse.SerializeToString,
+            ),
+            'SearchTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.SearchTerms,
+                    request_deserializer=glossary__pb2.SearchTermsRequest.FromString,
+                    response_serializer=glossary__pb2.SearchTermsResponse.SerializeToString,
+            ),
+            'SuggestTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.SuggestTerms,
+                    request_deserializer=glossary__pb2.SuggestTermsRequest.FromString,
+                    response_serializer=glossary__pb2.SuggestTermsResponse.SerializeToString,
+            ),
+            'CreateRelation': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateRelation,
+                    request_deserializer=glossary__pb2.CreateRelationRequest.FromString,
+                    response_serializer=glossary__pb2.CreateRelationResponse.SerializeToString,
+            ),
+            'ListRelations': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListRelations,
+                    request_deserializer=glossary__pb2.ListRelationsRequest.FromString,
+                    response_serializer=glossary__pb2.ListRelationsResponse.SerializeToString,
+            ),
+            'GetTermRelations': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTermRelations,
+                    request_deserializer=glossary__pb2.GetTermRelationsRequest.FromString,
+                    response_serializer=glossary__pb2.ListRelationsResponse.SerializeToString,
+            ),
+            'DeleteRelation': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeleteRelation,
+                    request_deserializer=glossary__pb2.DeleteRelationRequest.FromString,
+                    response_serializer=glossary__pb2.DeleteRelationResponse.SerializeToString,
+            ),
+            'StreamGraph': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamGraph,
+                    request_deserializer=glossary__pb2.StreamGraphRequest.FromString,
+                    response_serializer=glossary__pb2.GraphChunk.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'glossary.GlossaryService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('glossary.GlossaryService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class GlossaryService:
+    """Сервис для работы с глоссарием терминов
+    """
+
+    @staticmethod
+    def ListTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/ListTerms',
+            glossary__pb2.ListTermsRequest.SerializeToString,
+            glossary__pb2.ListTermsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/glossary.GlossaryService/StreamTerms',
+            glossary__pb2.StreamTermsRequest.SerializeToString,
+            glossary__pb2.TermChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetTerm(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/GetTerm',
+            glossary__pb2.GetTermRequest.SerializeToString,
+            glossary__pb2.GetTermResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CreateTerm(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/CreateTerm',
+            glossary__pb2.CreateTermRequest.SerializeToString,
+            glossary__pb2.CreateTermResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UpdateTerm(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/UpdateTerm',
+            glossary__pb2.UpdateTermRequest.SerializeToString,
+            glossary__pb2.UpdateTermResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DeleteTerm(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/DeleteTerm',
+            glossary__pb2.DeleteTermRequest.SerializeToString,
+            glossary__pb2.DeleteTermResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchGetTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/BatchGetTerms',
+            glossary__pb2.BatchGetTermsRequest.SerializeToString,
+            glossary__pb2.BatchGetTermsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BulkCreateTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/BulkCreateTerms',
+            glossary__pb2.BulkCreateTermsRequest.SerializeToString,
+            glossary__pb2.BulkResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BulkDeleteTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/BulkDeleteTerms',
+            glossary__pb2.BulkDeleteTermsRequest.SerializeToString,
+            glossary__pb2.BulkResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SearchTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/SearchTerms',
+            glossary__pb2.SearchTermsRequest.SerializeToString,
+            glossary__pb2.SearchTermsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SuggestTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/SuggestTerms',
+            glossary__pb2.SuggestTermsRequest.SerializeToString,
+            glossary__pb2.SuggestTermsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CreateRelation(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/CreateRelation',
+            glossary__pb2.CreateRelationRequest.SerializeToString,
+            glossary__pb2.CreateRelationResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListRelations(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/ListRelations',
+            glossary__pb2.ListRelationsRequest.SerializeToString,
+            glossary__pb2.ListRelationsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetTermRelations(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/GetTermRelations',
+            glossary__pb2.GetTermRelationsRequest.SerializeToString,
+            glossary__pb2.ListRelationsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DeleteRelation(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/glossary.GlossaryService/DeleteRelation',
+            glossary__pb2.DeleteRelationRequest.SerializeToString,
+            glossary__pb2.DeleteRelationResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamGraph(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/glossary.GlossaryService/StreamGraph',
+            glossary__pb2.StreamGraphRequest.SerializeToString,
+            glossary__pb2.GraphChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
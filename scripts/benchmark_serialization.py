@@ -0,0 +1,143 @@
+"""
+Бенчмарк сериализации списков: ORM + Pydantic на каждую строку против строк SQL -> orjson
+
+Сравниваются тела /graph/graph (весь граф) и страниц /terms/ и /graph/relations/.
+Пример: python scripts/benchmark_serialization.py --terms 100000 --relations 100000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def measure(func, repeat: int) -> float:
+    """Медиана времени выполнения, мс"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization paths")
+    parser.add_argument("--terms", type=int, default=100_000)
+    parser.add_argument("--relations", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=1000, help="размер страницы /terms/ и /graph/relations/")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="glossary-serialization-")
+    os.environ["GLOSSARY_DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import text
+    from sqlmodel import Session, select
+
+    from app.db import engine, init_db
+    from app.models import Term, TermRelation
+    from app.pagination import fetch_terms_page
+    from app.relations import fetch_relations_page
+    from app.schemas import GraphData, GraphEdge, GraphNode, TermRead, TermRelationRead
+    from app.serialization import RELATION_FIELDS, TERM_FIELDS, graph_json, orjson, rows_json
+
+    rng = random.Random(args.seed)
+    init_db()
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO term (id, keyword, description, source) VALUES (:id, :keyword, :description, :source)"),
+            [
+                {
+                    "id": i,
+                    "keyword": f"term-{i:07d}",
+                    "description": "Описание термина " * rng.randint(2, 10),
+                    "source": "https://example.com" if i % 3 == 0 else None,
+                }
+                for i in range(1, args.terms + 1)
+            ]
+        )
+        connection.execute(
+            text("INSERT INTO termrelation (source_id, target_id, relation_type) VALUES (:source, :target, :type)"),
+            [
+                {
+                    "source": rng.randint(1, args.terms),
+                    "target": rng.randint(1, args.terms),
+                    "type": rng.choice(("related", "synonym", "part_of")),
+                }
+                for _ in range(args.relations)
+            ]
+        )
+
+    term_list = TypeAdapter(list[TermRead])
+    relation_list = TypeAdapter(list[TermRelationRead])
+
+    def response_model_json(adapter, value) -> bytes:
+        # Путь FastAPI для response_model: валидация в модели, dump в JSON-совместимые типы, json.dumps
+        return json.dumps(adapter.dump_python(adapter.validate_python(value), mode="json")).encode()
+
+    def graph_pydantic():
+        with Session(engine) as session:
+            terms = session.exec(select(Term)).all()
+            relations = session.exec(select(TermRelation)).all()
+            nodes = [GraphNode(id=t.id, keyword=t.keyword, description=t.description, source=t.source) for t in terms]
+            edges = [
+                GraphEdge(id=r.id, source=r.source_id, target=r.target_id,
+                          relation_type=r.relation_type, description=r.description)
+                for r in relations
+            ]
+            return GraphData(nodes=nodes, edges=edges).model_dump_json().encode()
+
+    def graph_rows():
+        with Session(engine) as session:
+            terms = session.exec(select(Term.id, Term.keyword, Term.description, Term.source)).all()
+            relations = session.exec(select(
+                TermRelation.id, TermRelation.source_id, TermRelation.target_id,
+                TermRelation.relation_type, TermRelation.description
+            )).all()
+            return graph_json(terms, relations)
+
+    def terms_orm():
+        with Session(engine) as session:
+            terms = session.exec(select(Term).order_by(Term.keyword).limit(args.page)).all()
+            return response_model_json(term_list, terms)
+
+    def terms_rows():
+        with Session(engine) as session:
+            terms, _ = fetch_terms_page(session, None, args.page)
+            return rows_json(TERM_FIELDS, terms)
+
+    def relations_pydantic():
+        with Session(engine) as session:
+            rows, _ = fetch_relations_page(session, None, args.page)
+            return response_model_json(relation_list, [TermRelationRead(**row._mapping) for row in rows])
+
+    def relations_rows():
+        with Session(engine) as session:
+            rows, _ = fetch_relations_page(session, None, args.page)
+            return rows_json(RELATION_FIELDS, rows)
+
+    assert json.loads(graph_pydantic()) == json.loads(graph_rows())
+    assert json.loads(terms_orm()) == json.loads(terms_rows())
+    assert json.loads(relations_pydantic()) == json.loads(relations_rows())
+
+    print(f"serializer: {'orjson' if orjson else 'json (orjson not installed)'}")
+    print(f"{'endpoint':<34}{'pydantic, ms':>14}{'rows, ms':>12}{'speedup':>10}")
+    for name, before, after in (
+        (f"/graph/graph ({args.terms}+{args.relations})", graph_pydantic, graph_rows),
+        (f"/terms/?limit={args.page}", terms_orm, terms_rows),
+        (f"/graph/relations/?limit={args.page}", relations_pydantic, relations_rows),
+    ):
+        slow, fast = measure(before, args.repeat), measure(after, args.repeat)
+        print(f"{name:<34}{slow:>14.1f}{fast:>12.1f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
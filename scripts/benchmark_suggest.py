@@ -0,0 +1,106 @@
+"""
+Бенчмарк индекса автодополнения: время сборки из SQLite, занимаемая память и задержка запроса
+
+Пример: python scripts/benchmark_suggest.py --terms 1000000 --queries 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /terms/-/suggest keyword index")
+    parser.add_argument("--terms", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--like-queries", type=int, default=200,
+                        help="сколько запросов LIKE 'prefix%%' выполнить для сравнения (0 - не выполнять)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="glossary-suggest-")
+    os.environ["GLOSSARY_DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    from sqlalchemy import text
+    from sqlmodel import Session
+
+    from app import models  # noqa: F401  регистрирует таблицы в metadata
+    from app.db import engine, init_db
+    from app.suggest import KeywordIndex
+
+    rng = random.Random(args.seed)
+    alphabet = string.ascii_letters + string.digits
+    keywords = {
+        "".join(rng.choices(alphabet, k=rng.randint(4, 24)))
+        for _ in range(int(args.terms * 1.01))
+    }
+    keywords = list(keywords)[:args.terms]
+
+    init_db()
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO term (keyword, description) VALUES (:keyword, 'benchmark')"),
+            [{"keyword": keyword} for keyword in keywords]
+        )
+    print(f"seeded {len(keywords)} terms in {time.perf_counter() - started:.1f}s")
+
+    index = KeywordIndex()
+    started = time.perf_counter()
+    with Session(engine) as session:
+        index.build(session)
+    build_time = time.perf_counter() - started
+
+    # Память меряется отдельной сборкой: tracemalloc заметно замедляет выделения
+    tracemalloc.start()
+    measured = KeywordIndex()
+    with Session(engine) as session:
+        measured.build(session)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+    print(f"build: {build_time:.2f}s, index memory {current / 2**20:.1f} MiB (peak during build {peak / 2**20:.1f} MiB)")
+
+    prefixes = [rng.choice(keywords)[:rng.randint(1, 4)] for _ in range(args.queries)]
+    latencies = []
+    for prefix in prefixes:
+        started = time.perf_counter()
+        index.suggest(prefix, args.limit)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    print(
+        f"suggest (limit {args.limit}, {args.queries} queries): "
+        f"p50 {statistics.median(latencies):.1f}us, p99 {percentile(latencies, 0.99):.1f}us, "
+        f"max {max(latencies):.1f}us"
+    )
+
+    if args.like_queries:
+        latencies = []
+        with engine.connect() as connection:
+            for prefix in prefixes[:args.like_queries]:
+                started = time.perf_counter()
+                connection.execute(
+                    text("SELECT keyword FROM term WHERE keyword LIKE :pattern ORDER BY keyword LIMIT :limit"),
+                    {"pattern": prefix + "%", "limit": args.limit}
+                ).all()
+                latencies.append((time.perf_counter() - started) * 1e6)
+        print(
+            f"LIKE 'prefix%' ({args.like_queries} queries): "
+            f"p50 {statistics.median(latencies):.1f}us, p99 {percentile(latencies, 0.99):.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import os
 import sys
+import tempfile
 
 # Ensure project root is importable during tests
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 if PROJECT_ROOT not in sys.path:
 	sys.path.insert(0, PROJECT_ROOT)
+
+# Run the suite against a throwaway database instead of ./glossary.db
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="glossary-tests-")
+os.environ.setdefault("GLOSSARY_DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DB_DIR, 'glossary.db')}")
@@ -0,0 +1,48 @@
+import sqlite3
+
+import numpy as np
+
+from benchmarks.suite import compare
+from benchmarks.synthetic import RELATION_TYPES, generate, write_database
+
+
+def test_generator_is_seeded_and_consistent():
+	first, second = generate(2000, 3.0, seed=7), generate(2000, 3.0, seed=7)
+	assert first.keywords == second.keywords and np.array_equal(first.relation_targets, second.relation_targets)
+	assert generate(2000, 3.0, seed=8).keywords != first.keywords
+
+	assert len(set(first.keywords)) == 2000
+	assert first.relations == 6000
+	assert not np.any(first.relation_sources == first.relation_targets)
+	edges = set(zip(first.relation_sources.tolist(), first.relation_targets.tolist(), first.relation_types.tolist()))
+	assert len(edges) == first.relations
+	# Тяжёлый хвост степеней: самый связанный термин на порядок выше среднего
+	degree = np.bincount(np.concatenate((first.relation_sources, first.relation_targets)))
+	assert degree.max() > 10 * degree[1:].mean()
+	assert all(20 <= len(description) <= 2048 for description in first.descriptions)
+
+
+def test_written_database_is_searchable(tmp_path):
+	dataset = generate(500, 2.0, seed=1)
+	path = tmp_path / "glossary.db"
+	write_database(dataset, path)
+	connection = sqlite3.connect(path)
+	assert connection.execute("SELECT count(*) FROM term").fetchone()[0] == 500
+	assert connection.execute("SELECT count(*) FROM termrelation").fetchone()[0] == dataset.relations
+	keyword = dataset.keywords[0].split()[0]
+	assert connection.execute("SELECT count(*) FROM term_fts WHERE term_fts MATCH ?", (keyword,)).fetchone()[0] > 0
+	types = {row[0] for row in connection.execute("SELECT DISTINCT relation_type FROM termrelation")}
+	assert types <= set(RELATION_TYPES)
+	connection.close()
+
+
+def test_compare_flags_regressions(capsys):
+	result = {"median_ms": 1.0, "alloc_kb": 10.0, "queries": 1}
+	baseline = {"results": {"10000": {"GET /a": result, "GET /b": result}}}
+	current = {"results": {"10000": {
+		"GET /a": {**result, "median_ms": 1.1},
+		"GET /b": {**result, "queries": 3},
+		"GET /c": result,
+	}}}
+	assert compare(baseline, current, threshold=0.25) == ["[10k] GET /b: queries"]
+	assert "new" in capsys.readouterr().out
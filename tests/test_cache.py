@@ -0,0 +1,186 @@
+from fastapi.testclient import TestClient
+
+from app.cache import TermCache, term_cache
+from app.db import init_db
+from app.http_cache import negotiate_encoding, response_cache
+from app.main import app
+from app.schemas import TermRead
+
+client = TestClient(app)
+
+
+def setup_module(_module):
+	init_db()
+
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+def _term(keyword: str) -> TermRead:
+	return TermRead(id=1, keyword=keyword, description="d")
+
+
+def test_lru_eviction():
+	cache = TermCache(maxsize=2, ttl=60)
+	cache.set("a", _term("a"))
+	cache.set("b", _term("b"))
+	assert cache.get("a") is not None
+	cache.set("c", _term("c"))
+	assert cache.get("b") is None
+	assert cache.get("a") is not None
+	assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+	clock = FakeClock()
+	cache = TermCache(maxsize=10, ttl=5, clock=clock)
+	cache.set("a", _term("a"))
+	clock.now = 4.9
+	assert cache.get("a") is not None
+	clock.now = 5.0
+	assert cache.get("a") is None
+	stats = cache.stats()
+	assert stats["hits"] == 1
+	assert stats["misses"] == 1
+	assert stats["size"] == 0
+
+
+def test_rest_invalidation_on_rename():
+	client.post("/terms/", json={"keyword": "CacheTerm", "description": "Original"})
+	assert client.get("/terms/CacheTerm").json()["description"] == "Original"
+	hits = term_cache.stats()["hits"]
+	assert client.get("/terms/CacheTerm").status_code == 200
+	assert term_cache.stats()["hits"] == hits + 1
+
+	resp = client.put("/terms/CacheTerm", json={"keyword": "CacheTerm2", "description": "Changed"})
+	assert resp.status_code == 200
+	assert client.get("/terms/CacheTerm").status_code == 404
+	assert client.get("/terms/CacheTerm2").json()["description"] == "Changed"
+
+	assert client.delete("/terms/CacheTerm2").status_code == 204
+	assert client.get("/terms/CacheTerm2").status_code == 404
+
+
+def test_stale_fill_after_concurrent_update(monkeypatch):
+	import app.batch
+	from sqlmodel import Session
+
+	from app.db import read_engine
+
+	client.post("/terms/", json={"keyword": "CacheRace", "description": "Old"})
+	term_cache.invalidate("CacheRace")
+	find_terms = app.batch.find_terms
+
+	def read_then_update(session, keywords):
+		found = find_terms(session, keywords)
+		# Обновление коммитится между чтением из БД и записью в кэш
+		client.put("/terms/CacheRace", json={"description": "New"})
+		return found
+
+	monkeypatch.setattr(app.batch, "find_terms", read_then_update)
+	with Session(read_engine) as session:
+		terms, _ = app.batch.batch_get_terms(session, ["CacheRace"])
+	assert terms[0].description == "Old"
+	assert term_cache.get("CacheRace") is None
+	monkeypatch.undo()
+	assert client.get("/terms/CacheRace").json()["description"] == "New"
+	client.delete("/terms/CacheRace")
+
+
+def test_list_built_from_one_snapshot(monkeypatch):
+	import threading
+
+	import app.routers.terms
+
+	from app.db import engine
+	from app.models import Term
+
+	read_version = app.routers.terms.read_version
+	writers = []
+
+	def write_after_version(session):
+		version = read_version(session)
+		# Запись другого соединения коммитится между чтением версии и данных
+		writer = threading.Thread(target=_add_term, args=(engine, Term(keyword="SnapshotTerm", description="d")))
+		writer.start()
+		writer.join(0.5)
+		writers.append(writer)
+		return version
+
+	monkeypatch.setattr(app.routers.terms, "read_version", write_after_version)
+	response_cache.clear()
+	try:
+		resp = client.get("/terms/", params={"limit": 1000})
+		writers[0].join(10)
+		assert "SnapshotTerm" not in {term["keyword"] for term in resp.json()}
+		assert resp.headers["X-Total-Count"] == str(len(resp.json()))
+		monkeypatch.undo()
+		fresh = client.get("/terms/", params={"limit": 1000})
+		assert int(fresh.headers["X-Glossary-Version"]) > int(resp.headers["X-Glossary-Version"])
+		assert "SnapshotTerm" in {term["keyword"] for term in fresh.json()}
+	finally:
+		client.delete("/terms/SnapshotTerm")
+
+
+def _add_term(engine, term) -> None:
+	from sqlmodel import Session
+
+	with Session(engine) as session:
+		session.add(term)
+		session.commit()
+
+
+def test_cache_stats_endpoint():
+	resp = client.get("/cache/stats")
+	assert resp.status_code == 200
+	assert {"hits", "misses", "size"} <= set(resp.json())
+
+
+def test_negotiate_encoding():
+	assert negotiate_encoding(None) is None
+	assert negotiate_encoding("identity") is None
+	assert negotiate_encoding("gzip, deflate") == "gzip"
+	assert negotiate_encoding("gzip;q=0, deflate") is None
+	assert negotiate_encoding("*") in ("br", "gzip")
+
+
+def test_terms_list_etag_and_gzip():
+	keywords = [f"Compressed{i:03d}" for i in range(40)]
+	client.post("/terms/bulk", json={"terms": [
+		{"keyword": keyword, "description": "Достаточно длинное описание, чтобы тело ответа сжималось"}
+		for keyword in keywords
+	]})
+	try:
+		headers = {"Accept-Encoding": "gzip"}
+		resp = client.get("/terms/", params={"limit": 40}, headers=headers)
+		assert resp.status_code == 200
+		assert resp.headers["Content-Encoding"] == "gzip"
+		assert resp.headers["ETag"].endswith('-gzip"')
+		assert "Accept-Encoding" in resp.headers["Vary"]
+		assert resp.headers["X-Total-Count"] == "40"
+
+		hits = response_cache.stats()["hits"]
+		again = client.get("/terms/", params={"limit": 40}, headers=headers)
+		assert again.json() == resp.json()
+		assert response_cache.stats()["hits"] == hits + 1
+
+		plain = client.get("/terms/", params={"limit": 40}, headers={"Accept-Encoding": "identity"})
+		assert "Content-Encoding" not in plain.headers
+		assert plain.headers["ETag"] != resp.headers["ETag"]
+
+		# Копия в любом кодировании валидна, пока не изменилась версия; другие параметры - другой ETag
+		for etag in (resp.headers["ETag"], plain.headers["ETag"]):
+			assert client.get("/terms/", params={"limit": 40}, headers={"If-None-Match": etag}).status_code == 304
+		assert client.get("/terms/", params={"limit": 39}, headers={"If-None-Match": plain.headers["ETag"]}).status_code == 200
+
+		client.put(f"/terms/{keywords[0]}", json={"description": "Изменено"})
+		changed = client.get("/terms/", params={"limit": 40}, headers={"If-None-Match": resp.headers["ETag"], **headers})
+		assert changed.status_code == 200
+		assert changed.json()[0]["description"] == "Изменено"
+	finally:
+		client.post("/terms/bulk-delete", json={"keywords": keywords})
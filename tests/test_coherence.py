@@ -0,0 +1,139 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from fastapi.testclient import TestClient
+
+from app.db import init_db, read_engine
+from app.events import change_feed, changesets
+from app.main import app
+
+client = TestClient(app)
+
+
+def setup_module(_module):
+	init_db()
+	# Как в lifespan воркера: запросы начинают проверять изменения других процессов
+	change_feed.start(read_engine)
+
+
+def teardown_module(_module):
+	for keyword in ("CrossA", "CrossB", "CrossC"):
+		client.delete(f"/terms/{keyword}")
+
+
+def _other_worker(code: str) -> None:
+	"""Запись из отдельного процесса с тем же файлом БД"""
+	subprocess.run(
+		[sys.executable, "-c", textwrap.dedent(code)],
+		check=True, env=os.environ.copy(), cwd=os.path.dirname(os.path.dirname(__file__))
+	)
+
+
+def test_changesets_split_dependent_changes():
+	entries = [
+		(1, "relation", 7, "delete", '{"source": 1, "target": 2, "type": "related"}'),
+		(2, "relation", 8, "insert", '{"source": 1, "target": 2, "type": "related"}'),
+		(3, "term", 5, "insert", '{"keyword": "a"}'),
+		(4, "term", 6, "insert", '{"keyword": "b"}'),
+	]
+	first, second = changesets(entries)
+	assert first.relations_deleted == [(7, 1, 2, "related")] and first.version == 1
+	assert second.relations_added == [(8, 1, 2, "related")]
+	assert second.terms_added == {5: "a", 6: "b"} and second.version == 4
+
+
+def test_writes_from_other_process_are_visible():
+	client.post("/terms/", json={"keyword": "CrossA", "description": "before"})
+	assert client.get("/terms/CrossA").json()["description"] == "before"  # теперь в кэше терминов
+	assert client.get("/terms/-/suggest", params={"prefix": "Cross"}).json()["suggestions"] == ["CrossA"]
+	listing = client.get("/terms/")
+	version = int(listing.headers["X-Glossary-Version"])
+
+	_other_worker("""
+		from sqlmodel import Session, select
+		from app.db import engine
+		from app.models import Term
+		with Session(engine) as session:
+			term = session.exec(select(Term).where(Term.keyword == "CrossA")).one()
+			term.description = "after"
+			session.add(Term(keyword="CrossB", description="from another worker"))
+			session.commit()
+	""")
+
+	assert client.get("/terms/CrossA").json()["description"] == "after"
+	assert client.get("/terms/-/suggest", params={"prefix": "Cross"}).json()["suggestions"] == ["CrossA", "CrossB"]
+	assert client.get("/terms/-/fuzzy", params={"q": "CrosB"}).json()["matches"][0]["keyword"] == "CrossB"
+	fresh = client.get("/terms/", headers={"If-None-Match": listing.headers["ETag"]})
+	assert fresh.status_code == 200 and int(fresh.headers["X-Glossary-Version"]) > version
+	assert change_feed.applied == int(fresh.headers["X-Glossary-Version"])
+
+
+def test_pruned_change_log_triggers_rebuild():
+	client.get("/terms/-/suggest", params={"prefix": "Cross"})
+	_other_worker("""
+		from sqlmodel import Session
+		from app.db import engine
+		from app.models import Term
+		from app.versioning import prune_changelog
+		with Session(engine) as session:
+			term = Term(keyword="CrossC", description="created")
+			session.add(term)
+			session.commit()
+			term.description = "updated"
+			session.commit()
+			# Запись о создании CrossC удаляется из журнала до того, как этот процесс её прочитал
+			prune_changelog(session, retention=1)
+	""")
+	assert "CrossC" in client.get("/terms/-/suggest", params={"prefix": "Cross"}).json()["suggestions"]
+	assert client.get("/terms/CrossC").json()["description"] == "updated"
+
+
+def test_change_feed_poll_runs_off_event_loop(monkeypatch):
+	import asyncio
+
+	loops = []
+	monkeypatch.setattr(change_feed, "poll", lambda: loops.append(asyncio._get_running_loop()))
+	assert client.get("/health").status_code == 200
+	assert loops == [None]
+
+
+def test_changelog_pruned_in_background(monkeypatch):
+	import threading
+
+	from app import versioning
+
+	pruned = threading.Event()
+	monkeypatch.setattr(versioning, "prune_changelog", lambda session: pruned.set())
+	pruner = versioning.ChangelogPruner(interval=0.01)
+	pruner.start()
+	try:
+		assert pruned.wait(5)
+	finally:
+		pruner.stop()
+
+
+def test_concurrent_writes_above_pool_limit():
+	import asyncio
+
+	import httpx
+
+	from app.db import engine_settings
+
+	count = engine_settings.pool_size + engine_settings.max_overflow + 5
+	keywords = [f"Concurrent{i:03d}" for i in range(count)]
+
+	async def write_all():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+			requests = (http.post("/terms/", json={"keyword": keyword, "description": "d"}) for keyword in keywords)
+			# Commit не должен ждать второго соединения из пула, занятого другими записями
+			return await asyncio.wait_for(asyncio.gather(*requests), timeout=20)
+
+	try:
+		responses = asyncio.run(write_all())
+		assert [resp.status_code for resp in responses] == [201] * count
+		assert client.get("/terms/-/suggest", params={"prefix": "Concurrent", "limit": count}).json()["suggestions"] == keywords
+	finally:
+		client.post("/terms/bulk-delete", json={"keywords": keywords})
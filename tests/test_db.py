@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from sqlmodel import SQLModel
+
+from app.db import PROFILES, build_engine, settings_from_env
+from app.relations import init_relation_indexes
+
+
+def test_production_profile_pragmas(tmp_path):
+	engine = build_engine(f"sqlite:///{tmp_path / 'prod.db'}", PROFILES["production"])
+	with engine.connect() as conn:
+		assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+		assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+		assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+	assert engine.pool.size() == 20
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+	url = f"sqlite:///{tmp_path / 'ro.db'}"
+	with build_engine(url, PROFILES["default"]).begin() as conn:
+		conn.execute(text("CREATE TABLE t (x INTEGER)"))
+	read_engine = build_engine(url, PROFILES["default"], read_only=True)
+	with read_engine.connect() as conn:
+		assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+		with pytest.raises(OperationalError):
+			conn.execute(text("INSERT INTO t VALUES (1)"))
+
+
+def test_env_overrides(monkeypatch):
+	monkeypatch.setenv("GLOSSARY_DB_PROFILE", "production")
+	monkeypatch.setenv("GLOSSARY_SQLITE_SYNCHRONOUS", "FULL")
+	monkeypatch.setenv("GLOSSARY_DB_POOL_SIZE", "3")
+	settings = settings_from_env()
+	assert settings.journal_mode == "WAL"
+	assert settings.synchronous == "FULL"
+	assert settings.pool_size == 3
+
+	monkeypatch.setenv("GLOSSARY_DB_PROFILE", "unknown")
+	with pytest.raises(ValueError):
+		settings_from_env()
+
+
+def test_relation_indexes_migration(tmp_path):
+	engine = build_engine(f"sqlite:///{tmp_path / 'legacy.db'}", PROFILES["default"])
+	SQLModel.metadata.create_all(engine)
+	with engine.begin() as conn:
+		# Схема до появления составных индексов: индексы по source_id и target_id, повторы связей
+		for name in ("ix_termrelation_edge", "ix_termrelation_source_type", "ix_termrelation_target_type"):
+			conn.execute(text(f"DROP INDEX {name}"))
+		conn.execute(text("CREATE INDEX ix_termrelation_source_id ON termrelation (source_id)"))
+		conn.execute(text("INSERT INTO term (id, keyword, description) VALUES (1, 'A', 'a'), (2, 'B', 'b')"))
+		conn.execute(text(
+			"INSERT INTO termrelation (source_id, target_id, relation_type) "
+			"VALUES (1, 2, 'related'), (1, 2, 'related'), (1, 2, 'synonym'), (2, 1, 'related')"
+		))
+
+	init_relation_indexes(engine)
+	init_relation_indexes(engine)
+	with engine.connect() as conn:
+		assert conn.execute(text("SELECT id FROM termrelation ORDER BY id")).scalars().all() == [1, 3, 4]
+		assert conn.execute(text("SELECT entity_id, op FROM changelog")).all() == [(2, "delete")]
+		indexes = conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'termrelation'"))
+		assert set(indexes.scalars()) == {"ix_termrelation_edge", "ix_termrelation_source_type", "ix_termrelation_target_type"}
@@ -0,0 +1,454 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.db import init_db
+from app.main import app
+from app.schemas import GraphData, TermRelationRead
+
+client = TestClient(app)
+
+
+def setup_module(_module):
+	init_db()
+	for keyword in ("GraphA", "GraphB", "GraphC"):
+		client.post("/terms/", json={"keyword": keyword, "description": f"{keyword} description"})
+
+
+def teardown_module(_module):
+	for keyword in ("GraphA", "GraphB", "GraphC"):
+		client.delete(f"/terms/{keyword}")
+
+
+def test_create_and_list_relations():
+	resp = client.post("/graph/relations/", json={
+		"source_keyword": "GraphA", "target_keyword": "GraphB", "relation_type": "related"
+	})
+	assert resp.status_code == 201
+	relation = resp.json()
+	assert relation["source_keyword"] == "GraphA"
+	assert relation["target_keyword"] == "GraphB"
+
+	duplicate = client.post("/graph/relations/", json={
+		"source_keyword": "GraphA", "target_keyword": "GraphB", "relation_type": "related"
+	})
+	assert duplicate.status_code == 409
+
+	client.post("/graph/relations/", json={
+		"source_keyword": "GraphC", "target_keyword": "GraphA", "relation_type": "part_of"
+	})
+
+	relations = client.get("/graph/relations/GraphA").json()
+	assert {(r["source_keyword"], r["target_keyword"]) for r in relations} == {
+		("GraphA", "GraphB"), ("GraphC", "GraphA")
+	}
+	listed = client.get("/graph/relations/").json()
+	assert len(listed) == 2
+	# Быстрая сериализация из строк отдаёт ровно поля схемы в том же порядке
+	assert listed[0] == TermRelationRead.model_validate(listed[0]).model_dump()
+	assert list(listed[0]) == list(TermRelationRead.model_fields)
+
+	graph = client.get("/graph/graph").json()
+	assert graph == GraphData.model_validate(graph).model_dump()
+	assert {node["keyword"] for node in graph["nodes"]} >= {"GraphA", "GraphB", "GraphC"}
+	assert len(graph["edges"]) == 2
+
+	assert client.delete(f"/graph/relations/{relation['id']}").status_code == 204
+	assert client.delete(f"/graph/relations/{relation['id']}").status_code == 404
+
+
+def test_relation_to_missing_term():
+	resp = client.post("/graph/relations/", json={"source_keyword": "GraphA", "target_keyword": "Nope"})
+	assert resp.status_code == 404
+
+
+def test_delete_term_cascades_relations():
+	client.post("/terms/", json={"keyword": "GraphD", "description": "D"})
+	client.post("/graph/relations/", json={"source_keyword": "GraphD", "target_keyword": "GraphB"})
+	assert client.delete("/terms/GraphD").status_code == 204
+	assert all(r["source_keyword"] != "GraphD" for r in client.get("/graph/relations/").json())
+
+
+def test_relations_import_export_ndjson():
+	lines = [
+		{"source_keyword": "GraphA", "target_keyword": "GraphC", "relation_type": "imported"},
+		{"source_keyword": "GraphA", "target_keyword": "GraphC", "relation_type": "imported"},
+		{"source_keyword": "GraphA", "target_keyword": "Missing", "relation_type": "imported"},
+		{"source_keyword": "GraphB", "target_keyword": "GraphC", "relation_type": "imported", "description": "note"},
+	]
+	resp = client.post("/graph/relations/-/import", content="\n".join(json.dumps(line) for line in lines))
+	result = resp.json()
+	assert (result["created"], result["failed"]) == (2, 2)
+	assert [(f["line"], f["status"]) for f in result["failures"]] == [(2, "conflict"), (3, "not_found")]
+	assert client.get("/graph/path", params={"from": "GraphA", "to": "GraphB"}).json()["length"] == 2
+
+	resp = client.get("/graph/relations/-/export")
+	exported = [json.loads(line) for line in resp.text.splitlines()]
+	imported = [r for r in exported if r["relation_type"] == "imported"]
+	assert [(r["source_keyword"], r["target_keyword"], r["description"]) for r in imported] == [
+		("GraphA", "GraphC", None), ("GraphB", "GraphC", "note")
+	]
+	# Выгрузка импортируется обратно: все связи уже есть
+	again = client.post("/graph/relations/-/import", content=resp.content).json()
+	assert (again["created"], again["failed"]) == (0, len(exported))
+	for relation in imported:
+		client.delete(f"/graph/relations/{relation['id']}")
+
+
+def test_relations_of_term_named_export():
+	client.post("/terms/", json={"keyword": "export", "description": "Service word"})
+	try:
+		client.post("/graph/relations/", json={"source_keyword": "export", "target_keyword": "GraphA"})
+		resp = client.get("/graph/relations/export")
+		assert [(r["source_keyword"], r["target_keyword"]) for r in resp.json()] == [("export", "GraphA")]
+	finally:
+		client.delete("/terms/export")
+
+
+def test_relations_filter_and_pagination():
+	for target, relation_type in (("GraphB", "synonym"), ("GraphC", "related"), ("GraphB", "antonym")):
+		client.post("/graph/relations/", json={
+			"source_keyword": "GraphA", "target_keyword": target, "relation_type": relation_type
+		})
+
+	synonyms = client.get("/graph/relations/GraphA", params={"relation_type": "synonym"}).json()
+	assert [(r["target_keyword"], r["relation_type"]) for r in synonyms] == [("GraphB", "synonym")]
+
+	both = client.get("/graph/relations/", params=[("relation_type", "synonym"), ("relation_type", "antonym")]).json()
+	assert {r["relation_type"] for r in both} == {"synonym", "antonym"}
+
+	everything = client.get("/graph/relations/GraphA").json()
+	first = client.get("/graph/relations/GraphA", params={"limit": 2})
+	assert len(first.json()) == 2
+	pages = first.json()
+	cursor = first.headers.get("X-Next-Cursor")
+	while cursor:
+		page = client.get("/graph/relations/GraphA", params={"limit": 2, "after": cursor})
+		pages.extend(page.json())
+		cursor = page.headers.get("X-Next-Cursor")
+	assert pages == everything
+	assert [r["id"] for r in pages] == sorted(r["id"] for r in pages)
+
+	for relation in everything:
+		client.delete(f"/graph/relations/{relation['id']}")
+
+
+def test_neighbors_and_path_follow_relation_writes():
+	# Цепочка GraphA -> GraphB -> GraphC плюс синоним GraphA ~ GraphC
+	ids = []
+	for source, target, relation_type in (
+		("GraphA", "GraphB", "part_of"), ("GraphB", "GraphC", "part_of"), ("GraphC", "GraphA", "synonym")
+	):
+		resp = client.post("/graph/relations/", json={
+			"source_keyword": source, "target_keyword": target, "relation_type": relation_type
+		})
+		ids.append(resp.json()["id"])
+
+	one_hop = client.get("/graph/neighbors/GraphA", params={"types": "part_of", "direction": "out"}).json()
+	assert {node["keyword"]: node["depth"] for node in one_hop["nodes"]} == {"GraphA": 0, "GraphB": 1}
+
+	two_hops = client.get("/graph/neighbors/GraphA", params={"types": "part_of", "depth": 2, "direction": "out"}).json()
+	assert {node["keyword"] for node in two_hops["nodes"]} == {"GraphA", "GraphB", "GraphC"}
+	assert len(two_hops["edges"]) == 2
+
+	path = client.get("/graph/path", params={"from": "GraphA", "to": "GraphC", "direction": "out"}).json()
+	assert [node["keyword"] for node in path["nodes"]] == ["GraphA", "GraphB", "GraphC"]
+	assert path["length"] == 2
+
+	shortcut = client.get("/graph/path", params={"from": "GraphA", "to": "GraphC"}).json()
+	assert shortcut["length"] == 1
+
+	client.delete(f"/graph/relations/{ids[1]}")
+	missing = client.get("/graph/path", params={"from": "GraphA", "to": "GraphC", "direction": "out"})
+	assert missing.status_code == 404
+
+	for relation_id in ids:
+		client.delete(f"/graph/relations/{relation_id}")
+
+
+def test_graph_index_drops_edges_of_deleted_terms():
+	client.post("/terms/", json={"keyword": "GraphE", "description": "E"})
+	client.post("/graph/relations/", json={"source_keyword": "GraphE", "target_keyword": "GraphB"})
+	assert len(client.get("/graph/neighbors/GraphB", params={"direction": "in"}).json()["nodes"]) == 2
+
+	client.post("/terms/bulk-delete", json={"keywords": ["GraphE"]})
+	assert len(client.get("/graph/neighbors/GraphB", params={"direction": "in"}).json()["nodes"]) == 1
+
+
+def test_graph_index_overlay_compaction():
+	from app.graph_index import GraphIndex
+
+	index = GraphIndex()
+	for target in range(2, 6):
+		index.add_edge(1, target, "related")
+	index.remove_edge(1, 3, "related")
+	before = index.neighborhood(1, 1, direction="out")[0]
+	index.compact()
+	assert index.neighborhood(1, 1, direction="out")[0] == before == {1: 0, 2: 1, 4: 1, 5: 1}
+	index.remove_edge(1, 4, "related")
+	index.add_edge(5, 6, "related")
+	assert index.shortest_path(1, 6, direction="out")[0] == [1, 5, 6]
+	assert index.shortest_path(6, 1, direction="out") is None
+
+
+def test_graph_etag_and_changes():
+	full = client.get("/graph/graph")
+	etag = full.headers["ETag"]
+	version = int(full.headers["X-Glossary-Version"])
+	assert client.get("/graph/graph", headers={"If-None-Match": etag}).status_code == 304
+
+	client.post("/terms/", json={"keyword": "GraphF", "description": "F"})
+	client.put("/terms/GraphB", json={"description": "B changed"})
+	relation = client.post("/graph/relations/", json={"source_keyword": "GraphF", "target_keyword": "GraphA"}).json()
+	client.post("/terms/", json={"keyword": "GraphTmp", "description": "created and deleted"})
+	client.delete("/terms/GraphTmp")
+
+	fresh = client.get("/graph/graph", headers={"If-None-Match": etag})
+	assert fresh.status_code == 200
+	assert int(fresh.headers["X-Glossary-Version"]) > version
+
+	changes = client.get("/graph/changes", params={"since": version}).json()
+	assert changes["version"] == int(fresh.headers["X-Glossary-Version"])
+	assert [node["keyword"] for node in changes["nodes_added"]] == ["GraphF"]
+	assert [node["description"] for node in changes["nodes_updated"]] == ["B changed"]
+	assert [edge["id"] for edge in changes["edges_added"]] == [relation["id"]]
+	assert changes["nodes_deleted"] == []
+
+	after_delete = changes["version"]
+	client.delete("/terms/GraphF")
+	changes = client.get("/graph/changes", params={"since": after_delete}).json()
+	assert changes["nodes_deleted"] and changes["edges_deleted"] == [relation["id"]]
+
+	assert client.get("/graph/changes", params={"since": changes["version"] + 100}).status_code == 410
+
+
+def test_compute_layout_separates_components():
+	import numpy as np
+
+	from app.layout import compute_layout
+
+	node_ids = np.arange(1, 8)
+	positions, degree = compute_layout(node_ids, np.array([1, 2, 3, 5]), np.array([2, 3, 1, 6]))
+	assert positions.shape == (7, 2) and np.isfinite(positions).all()
+	assert degree.tolist() == [2, 2, 2, 0, 1, 1, 0]
+	distances = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+	assert distances[np.triu_indices(7, 1)].min() > 0
+	# Узлы треугольника ближе друг к другу, чем к другой компоненте
+	assert distances[0, 1] < distances[0, 4] and distances[1, 2] < distances[1, 5]
+
+
+def test_layout_viewport_and_overlay():
+	from sqlmodel import Session
+
+	from app.db import read_engine
+	from app.layout import graph_layout
+
+	relations = [
+		client.post("/graph/relations/", json={"source_keyword": "GraphA", "target_keyword": target}).json()["id"]
+		for target in ("GraphB", "GraphC")
+	]
+	with Session(read_engine) as session:
+		graph_layout.build(session)
+
+	view = client.get("/graph/layout").json()
+	assert not view["stale"] and not view["truncated"]
+	nodes = {node["keyword"]: node for node in view["nodes"]}
+	assert nodes["GraphA"]["importance"] == 2
+	assert {(edge["source"], edge["target"]) for edge in view["edges"]} == {
+		(nodes["GraphA"]["id"], nodes["GraphB"]["id"]), (nodes["GraphA"]["id"], nodes["GraphC"]["id"])
+	}
+
+	top = client.get("/graph/layout", params={"limit": 1}).json()
+	assert top["truncated"] and [node["keyword"] for node in top["nodes"]] == ["GraphA"]
+
+	a = nodes["GraphA"]
+	box = client.get("/graph/layout", params={"x0": a["x"], "y0": a["y"], "x1": a["x"], "y1": a["y"]}).json()
+	assert [node["keyword"] for node in box["nodes"]] == ["GraphA"] and box["edges"] == []
+	assert client.get("/graph/layout", params={"x0": 0, "y0": 0}).status_code == 400
+
+	# Новый термин до пересчёта ставится рядом с соседом
+	client.post("/terms/", json={"keyword": "GraphLayoutNew", "description": "new"})
+	relations.append(client.post("/graph/relations/", json={
+		"source_keyword": "GraphLayoutNew", "target_keyword": "GraphA"
+	}).json()["id"])
+	view = client.get("/graph/layout").json()
+	assert view["stale"]
+	nodes = {node["keyword"]: node for node in view["nodes"]}
+	new, a = nodes["GraphLayoutNew"], nodes["GraphA"]
+	assert abs(new["x"] - a["x"]) + abs(new["y"] - a["y"]) < 5
+	assert (new["id"], a["id"], "related") in {(e["source"], e["target"], e["relation_type"]) for e in view["edges"]}
+
+	client.delete("/terms/GraphLayoutNew")
+	for relation_id in relations:
+		client.delete(f"/graph/relations/{relation_id}")
+	assert "GraphLayoutNew" not in {node["keyword"] for node in client.get("/graph/layout").json()["nodes"]}
+
+
+def test_graph_version_matches_data(monkeypatch):
+	import threading
+
+	import app.routers.graph
+	from sqlmodel import Session
+
+	from app.db import engine
+	from app.http_cache import response_cache
+	from app.models import Term
+
+	read_version = app.routers.graph.read_version
+	writers = []
+
+	def add_term():
+		with Session(engine) as session:
+			session.add(Term(keyword="GraphSnapshot", description="d"))
+			session.commit()
+
+	def write_after_version(session):
+		version = read_version(session)
+		# Запись коммитится между чтением версии и чтением узлов
+		writers.append(threading.Thread(target=add_term))
+		writers[0].start()
+		writers[0].join(0.5)
+		return version
+
+	monkeypatch.setattr(app.routers.graph, "read_version", write_after_version)
+	response_cache.clear()
+	try:
+		resp = client.get("/graph/graph")
+		writers[0].join(10)
+		assert "GraphSnapshot" not in {node["keyword"] for node in resp.json()["nodes"]}
+		monkeypatch.undo()
+		fresh = client.get("/graph/graph", headers={"If-None-Match": resp.headers["ETag"]})
+		assert fresh.status_code == 200
+		assert "GraphSnapshot" in {node["keyword"] for node in fresh.json()["nodes"]}
+	finally:
+		client.delete("/terms/GraphSnapshot")
+
+
+def test_first_layout_built_off_event_loop(monkeypatch):
+	import asyncio
+	import threading
+
+	import httpx
+
+	from app.layout import graph_layout
+
+	build = graph_layout._build
+	release = threading.Event()
+	threads = []
+
+	def slow_build(session):
+		threads.append(threading.get_ident())
+		assert release.wait(5)
+		build(session)
+
+	monkeypatch.setattr(graph_layout, "_snapshot", None)
+	monkeypatch.setattr(graph_layout, "_build", slow_build)
+
+	async def requests():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+			pending = [asyncio.ensure_future(http.get("/graph/layout")) for _ in range(5)]
+			await asyncio.sleep(0.05)
+			health = await http.get("/health")
+			release.set()
+			return health, await asyncio.wait_for(asyncio.gather(*pending), timeout=10)
+
+	health, responses = asyncio.run(requests())
+	assert health.status_code == 200
+	assert [resp.status_code for resp in responses] == [200] * 5
+	assert len(threads) == 1 and threads[0] != threading.get_ident()
+	assert graph_layout.built
+
+
+def test_pagerank_matches_reference():
+	import numpy as np
+	from scipy.sparse import csr_matrix
+
+	from app.analytics import pagerank
+
+	# 0 -> 1, 0 -> 2, 1 -> 2, 2 -> 0, узел 3 без исходящих связей
+	adjacency = csr_matrix((np.ones(5), ([0, 0, 1, 2, 3], [1, 2, 2, 0, 0])), shape=(5, 5))
+	rank, _ = pagerank(adjacency)
+	# Плотная матрица переходов Google для сравнения
+	transition = np.array(adjacency.todense())
+	transition[4] = 1.0
+	transition /= transition.sum(axis=1, keepdims=True)
+	google = 0.85 * transition + 0.15 / 5
+	expected = np.full(5, 0.2)
+	for _ in range(200):
+		expected = expected @ google
+	assert np.allclose(rank, expected, atol=1e-6) and np.isclose(rank.sum(), 1.0)
+
+
+def test_analytics_endpoints_follow_relation_writes():
+	from app.analytics import graph_analytics
+
+	client.post("/terms/", json={"keyword": "GraphOrphan", "description": "orphan"})
+	relations = [
+		client.post("/graph/relations/", json={"source_keyword": source, "target_keyword": target}).json()["id"]
+		for source, target in (("GraphB", "GraphA"), ("GraphC", "GraphA"))
+	]
+
+	degree = client.get("/graph/analytics/degree").json()
+	assert degree["edges"] == 2
+	assert [(t["keyword"], t["in_degree"], t["out_degree"]) for t in degree["terms"][:1]] == [("GraphA", 2, 0)]
+	pagerank = client.get("/graph/analytics/pagerank", params={"limit": 1}).json()
+	assert [t["keyword"] for t in pagerank["terms"]] == ["GraphA"]
+	assert graph_analytics.cached
+
+	components = client.get("/graph/analytics/components").json()
+	assert components["largest"] == 3 and components["isolated"] == 1
+	assert sorted(components["components"][0]["keywords"]) == ["GraphA", "GraphB", "GraphC"]
+	orphans = client.get("/graph/analytics/components", params={"max_size": 1}).json()
+	assert [c["keywords"] for c in orphans["components"]] == [["GraphOrphan"]]
+
+	# Новая связь сбрасывает кэш: сирота присоединяется к основной компоненте
+	relations.append(client.post("/graph/relations/", json={
+		"source_keyword": "GraphOrphan", "target_keyword": "GraphC"
+	}).json()["id"])
+	assert not graph_analytics.cached
+	components = client.get("/graph/analytics/components").json()
+	assert components["largest"] == 4 and components["isolated"] == 0
+
+	for relation_id in relations:
+		client.delete(f"/graph/relations/{relation_id}")
+	client.delete("/terms/GraphOrphan")
+	assert client.get("/graph/analytics/degree").json()["edges"] == 0
+
+
+def test_analytics_concurrent_requests_share_one_build(monkeypatch):
+	import asyncio
+	import threading
+
+	import httpx
+
+	from app.analytics import graph_analytics
+
+	compute = graph_analytics._compute
+	release = threading.Event()
+	threads = []
+
+	def slow_compute(session):
+		threads.append(threading.get_ident())
+		# Расчёт держится, пока цикл событий не обслужит другой запрос
+		assert release.wait(5)
+		return compute(session)
+
+	graph_analytics.invalidate()
+	monkeypatch.setattr(graph_analytics, "_compute", slow_compute)
+
+	async def requests():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+			pending = [asyncio.ensure_future(http.get(f"/graph/analytics/{metric}")) for metric in ("degree", "pagerank") * 4]
+			pending.append(asyncio.ensure_future(http.get("/graph/analytics/components")))
+			await asyncio.sleep(0.05)
+			health = await http.get("/health")
+			release.set()
+			return health, await asyncio.wait_for(asyncio.gather(*pending), timeout=10)
+
+	health, responses = asyncio.run(requests())
+	assert health.status_code == 200
+	assert [resp.status_code for resp in responses] == [200] * 9
+	assert len(threads) == 1 and threads[0] != threading.get_ident()
+	assert graph_analytics.cached
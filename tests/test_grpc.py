@@ -0,0 +1,244 @@
+import grpc
+import pytest
+
+from app.db import init_db
+from app.grpc_server import GlossaryServicer, glossary_pb2
+
+pytestmark = pytest.mark.skipif(glossary_pb2 is None, reason="gRPC code not generated (make generate-grpc)")
+
+
+class FakeContext:
+	def __init__(self):
+		self.code = None
+		self.details = None
+
+	def set_code(self, code):
+		self.code = code
+
+	def set_details(self, details):
+		self.details = details
+
+	def set_compression(self, compression):
+		self.compression = compression
+
+
+servicer = GlossaryServicer()
+
+
+def setup_module(_module):
+	init_db()
+
+
+def _create(keyword: str, description: str = "gRPC test") -> None:
+	servicer.CreateTerm(glossary_pb2.CreateTermRequest(keyword=keyword, description=description), FakeContext())
+
+
+def _delete(keyword: str) -> None:
+	servicer.DeleteTerm(glossary_pb2.DeleteTermRequest(keyword=keyword), FakeContext())
+
+
+def test_get_term_after_rename():
+	_create("RpcTerm")
+	assert servicer.GetTerm(glossary_pb2.GetTermRequest(keyword="RpcTerm"), FakeContext()).term.keyword == "RpcTerm"
+
+	servicer.UpdateTerm(glossary_pb2.UpdateTermRequest(keyword="RpcTerm", new_keyword="RpcTerm2"), FakeContext())
+	context = FakeContext()
+	servicer.GetTerm(glossary_pb2.GetTermRequest(keyword="RpcTerm"), context)
+	assert context.code == grpc.StatusCode.NOT_FOUND
+	assert servicer.GetTerm(glossary_pb2.GetTermRequest(keyword="RpcTerm2"), FakeContext()).term.keyword == "RpcTerm2"
+	_delete("RpcTerm2")
+
+
+def test_list_terms_cursor():
+	keywords = [f"Rpc{i:02d}" for i in range(5)]
+	for keyword in keywords:
+		_create(keyword)
+
+	seen = []
+	request = glossary_pb2.ListTermsRequest(limit=2)
+	while True:
+		response = servicer.ListTerms(request, FakeContext())
+		assert response.total == 5
+		seen.extend(term.keyword for term in response.terms)
+		if not response.next_cursor:
+			break
+		request = glossary_pb2.ListTermsRequest(limit=2, after=response.next_cursor)
+	assert seen == keywords
+
+	response = servicer.ListTerms(glossary_pb2.ListTermsRequest(limit=2, skip_total=True), FakeContext())
+	assert response.total == 0
+
+	for keyword in keywords:
+		_delete(keyword)
+
+
+class ActiveContext(FakeContext):
+	def __init__(self, active_chunks: int = 1_000_000):
+		super().__init__()
+		self.active_chunks = active_chunks
+
+	def is_active(self):
+		self.active_chunks -= 1
+		return self.active_chunks >= 0
+
+
+def test_stream_terms_chunks():
+	keywords = [f"Stream{i:02d}" for i in range(5)]
+	for keyword in keywords:
+		_create(keyword)
+
+	chunks = list(servicer.StreamTerms(glossary_pb2.StreamTermsRequest(chunk_size=2), ActiveContext()))
+	assert [len(chunk.terms) for chunk in chunks] == [2, 2, 1]
+	assert [term.keyword for chunk in chunks for term in chunk.terms] == keywords
+
+	resumed = list(servicer.StreamTerms(
+		glossary_pb2.StreamTermsRequest(chunk_size=2, after=chunks[0].next_cursor), ActiveContext()
+	))
+	assert [term.keyword for chunk in resumed for term in chunk.terms] == keywords[2:]
+
+	cancelled = list(servicer.StreamTerms(glossary_pb2.StreamTermsRequest(chunk_size=2), ActiveContext(active_chunks=1)))
+	assert len(cancelled) == 1
+
+	for keyword in keywords:
+		_delete(keyword)
+
+
+def test_bulk_rpcs():
+	response = servicer.BulkCreateTerms(glossary_pb2.BulkCreateTermsRequest(terms=[
+		glossary_pb2.CreateTermRequest(keyword="RpcBulk1", description="One"),
+		glossary_pb2.CreateTermRequest(keyword="RpcBulk1", description="Duplicate"),
+		glossary_pb2.CreateTermRequest(keyword="RpcBulk2", description=""),
+	]), FakeContext())
+	assert [result.status for result in response.results] == [
+		glossary_pb2.CREATED, glossary_pb2.CONFLICT, glossary_pb2.ERROR
+	]
+	assert response.results[0].term.keyword == "RpcBulk1"
+
+	batch = servicer.BatchGetTerms(glossary_pb2.BatchGetTermsRequest(keywords=["RpcBulk1", "RpcBulk2"]), FakeContext())
+	assert [term.keyword for term in batch.terms] == ["RpcBulk1"]
+	assert list(batch.missing) == ["RpcBulk2"]
+
+	deleted = servicer.BulkDeleteTerms(glossary_pb2.BulkDeleteTermsRequest(keywords=["RpcBulk1", "RpcBulk2"]), FakeContext())
+	assert [result.status for result in deleted.results] == [glossary_pb2.DELETED, glossary_pb2.NOT_FOUND]
+
+
+def test_search_terms_rpc():
+	_create("RpcSearchable", "Описание для полнотекстового поиска")
+	try:
+		response = servicer.SearchTerms(glossary_pb2.SearchTermsRequest(query="полнотекст"), FakeContext())
+		assert [hit.term.keyword for hit in response.hits] == ["RpcSearchable"]
+		assert response.hits[0].score > 0
+		assert "<mark>" in response.hits[0].snippet
+		assert response.next_offset == 0
+	finally:
+		_delete("RpcSearchable")
+
+
+def test_suggest_terms_rpc():
+	_create("RpcSuggestAlpha")
+	_create("RpcSuggestBeta")
+	try:
+		response = servicer.SuggestTerms(glossary_pb2.SuggestTermsRequest(prefix="rpcsuggest", limit=1), FakeContext())
+		assert list(response.keywords) == ["RpcSuggestAlpha"]
+	finally:
+		_delete("RpcSuggestAlpha")
+		_delete("RpcSuggestBeta")
+	response = servicer.SuggestTerms(glossary_pb2.SuggestTermsRequest(prefix="rpcsuggest"), FakeContext())
+	assert list(response.keywords) == []
+
+def test_relation_rpcs():
+	_create("RpcRelA")
+	_create("RpcRelB")
+	try:
+		created = servicer.CreateRelation(glossary_pb2.CreateRelationRequest(
+			source_keyword="RpcRelA", target_keyword="RpcRelB", relation_type="rpc"
+		), FakeContext()).relation
+		assert (created.source_keyword, created.target_keyword, created.relation_type) == ("RpcRelA", "RpcRelB", "rpc")
+
+		for request, code in [
+			(glossary_pb2.CreateRelationRequest(source_keyword="RpcRelA", target_keyword="RpcRelB", relation_type="rpc"), grpc.StatusCode.ALREADY_EXISTS),
+			(glossary_pb2.CreateRelationRequest(source_keyword="RpcRelA", target_keyword="RpcRelA"), grpc.StatusCode.INVALID_ARGUMENT),
+			(glossary_pb2.CreateRelationRequest(source_keyword="RpcRelA", target_keyword="RpcMissing"), grpc.StatusCode.NOT_FOUND),
+		]:
+			context = FakeContext()
+			servicer.CreateRelation(request, context)
+			assert context.code == code
+
+		page = servicer.ListRelations(glossary_pb2.ListRelationsRequest(relation_types=["rpc"]), FakeContext())
+		assert [relation.id for relation in page.relations] == [created.id]
+		assert page.next_cursor == ""
+		term_page = servicer.GetTermRelations(glossary_pb2.GetTermRelationsRequest(keyword="RpcRelB"), FakeContext())
+		assert [relation.id for relation in term_page.relations] == [created.id]
+
+		context = ActiveContext()
+		chunks = list(servicer.StreamGraph(glossary_pb2.StreamGraphRequest(chunk_size=1), context))
+		assert context.compression == grpc.Compression.Gzip
+		assert all(len(chunk.nodes) + len(chunk.edges) == 1 for chunk in chunks)
+		assert {"RpcRelA", "RpcRelB"} <= {node.keyword for chunk in chunks for node in chunk.nodes}
+		edges = [edge for chunk in chunks for edge in chunk.edges]
+		assert (created.id, created.source_id, created.target_id) in {(edge.id, edge.source, edge.target) for edge in edges}
+		# Сначала все узлы, затем рёбра
+		kinds = ["edges" if chunk.edges else "nodes" for chunk in chunks]
+		assert kinds == sorted(kinds, reverse=True)
+
+		assert servicer.DeleteRelation(glossary_pb2.DeleteRelationRequest(id=created.id), FakeContext()).success
+		context = FakeContext()
+		servicer.DeleteRelation(glossary_pb2.DeleteRelationRequest(id=created.id), context)
+		assert context.code == grpc.StatusCode.NOT_FOUND
+	finally:
+		_delete("RpcRelA")
+		_delete("RpcRelB")
+
+
+def test_aio_server_end_to_end():
+	import asyncio
+
+	from app.grpc_aio_server import AsyncGlossaryServicer
+	from app.grpc_server import glossary_pb2_grpc
+
+	async def scenario():
+		server = grpc.aio.server(maximum_concurrent_rpcs=8)
+		glossary_pb2_grpc.add_GlossaryServiceServicer_to_server(AsyncGlossaryServicer(), server)
+		port = server.add_insecure_port("127.0.0.1:0")
+		await server.start()
+		try:
+			async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+				stub = glossary_pb2_grpc.GlossaryServiceStub(channel)
+				await stub.CreateTerm(glossary_pb2.CreateTermRequest(keyword="Aio1", description="One"))
+				await stub.CreateTerm(glossary_pb2.CreateTermRequest(keyword="Aio2", description="Two"))
+
+				responses = await asyncio.gather(*[
+					stub.GetTerm(glossary_pb2.GetTermRequest(keyword="Aio1")) for _ in range(20)
+				])
+				assert all(response.term.description == "One" for response in responses)
+
+				updated = await stub.UpdateTerm(glossary_pb2.UpdateTermRequest(keyword="Aio1", new_keyword="Aio3"))
+				assert updated.term.keyword == "Aio3"
+				with pytest.raises(grpc.aio.AioRpcError) as exc_info:
+					await stub.GetTerm(glossary_pb2.GetTermRequest(keyword="Aio1"))
+				assert exc_info.value.code() == grpc.StatusCode.NOT_FOUND
+
+				page = await stub.ListTerms(glossary_pb2.ListTermsRequest(limit=1))
+				assert page.total == 2
+				assert page.next_cursor
+
+				chunks = [chunk async for chunk in stub.StreamTerms(glossary_pb2.StreamTermsRequest(chunk_size=1))]
+				assert [chunk.terms[0].keyword for chunk in chunks] == ["Aio2", "Aio3"]
+
+				relation = (await stub.CreateRelation(glossary_pb2.CreateRelationRequest(
+					source_keyword="Aio2", target_keyword="Aio3"
+				))).relation
+				assert relation.relation_type == "related"
+				relations = await stub.GetTermRelations(glossary_pb2.GetTermRelationsRequest(keyword="Aio3"))
+				assert [item.id for item in relations.relations] == [relation.id]
+				graph = [chunk async for chunk in stub.StreamGraph(glossary_pb2.StreamGraphRequest(chunk_size=1))]
+				assert sorted(node.keyword for chunk in graph for node in chunk.nodes) == ["Aio2", "Aio3"]
+				assert [edge.id for chunk in graph for edge in chunk.edges] == [relation.id]
+				assert (await stub.DeleteRelation(glossary_pb2.DeleteRelationRequest(id=relation.id))).success
+
+				deleted = await stub.BulkDeleteTerms(glossary_pb2.BulkDeleteTermsRequest(keywords=["Aio2", "Aio3"]))
+				assert [result.status for result in deleted.results] == [glossary_pb2.DELETED, glossary_pb2.DELETED]
+		finally:
+			await server.stop(0)
+
+	asyncio.run(scenario())
@@ -0,0 +1,21 @@
+from collections import Counter
+
+from loadtest.report import compare
+from loadtest.scenarios import OPERATIONS, SCENARIOS, tasks
+
+
+def test_scenarios_share_operations_and_weights():
+	workload = Counter(task.__name__ for task in tasks(SCENARIOS["workload"]))
+	assert workload == {"get_term": 40, "list_terms": 30, "create_term": 15, "update_term": 10, "delete_term": 5}
+	for scenario in SCENARIOS.values():
+		assert set(scenario.weights) <= set(OPERATIONS)
+		assert scenario.wait[0] <= scenario.wait[1]
+
+
+def test_compare_reports():
+	entry = {"p50_ms": 10, "p95_ms": 20, "p99_ms": 40, "rps": 100.0, "failure_ratio": 0.0}
+	previous = {"operations": {"grpc GetTerm": entry}}
+	current = {"operations": {"grpc GetTerm": {**entry, "p50_ms": 15}, "grpc ListTerms": entry}}
+	lines = compare(previous, current)
+	assert lines[0].startswith("grpc GetTerm: p50_ms 10 -> 15 (+50%)")
+	assert lines[1] == "grpc ListTerms: new"
@@ -0,0 +1,113 @@
+import logging
+import os
+import re
+from concurrent import futures
+
+import grpc
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db import init_db
+from app.grpc_server import GlossaryServicer, MetricsInterceptor, glossary_pb2, glossary_pb2_grpc
+from app.main import app
+from app import query_stats
+from app.metrics import LATENCY_BUCKETS, Registry, quantile
+
+client = TestClient(app)
+
+
+def setup_module(_module):
+	init_db()
+
+
+def _sample(text: str, prefix: str) -> float:
+	"""Значение первой строки метрики, начинающейся с prefix"""
+	line = next(line for line in text.splitlines() if line.startswith(prefix))
+	return float(line.rsplit(" ", 1)[1])
+
+
+def test_quantile_interpolates_within_bucket():
+	bounds = (1.0, 2.0, 4.0)
+	assert quantile(bounds, [0, 0, 0, 0], 0.5) is None
+	assert quantile(bounds, [0, 10, 0, 0], 0.5) == 1.5
+	assert quantile(bounds, [5, 0, 5, 0], 0.99) == pytest.approx(3.96)
+	assert quantile(bounds, [0, 0, 0, 3], 0.5) == 4.0  # выше последней границы
+
+
+def test_processes_are_aggregated(tmp_path):
+	registry = Registry(str(tmp_path))
+	registry.histogram("latency", "test", ("route",), LATENCY_BUCKETS).labels("/a").observe(0.003)
+	registry.counter("requests", "test", ("route",)).labels("/a").inc(2)
+	registry.flush()
+	# Снимок завершившегося процесса (такого pid нет) не учитывается
+	(tmp_path / "999999999.json").write_text((tmp_path / f"{os.getpid()}.json").read_text())
+	text = registry.render()
+	assert 'requests{route="/a"} 2' in text
+	assert 'latency_bucket{route="/a",le="0.005"} 1' in text
+	assert 'latency_bucket{route="/a",le="+Inf"} 1' in text
+	assert registry.summary()["latency"][0]["count"] == 1
+
+
+def test_rest_metrics_by_route_template():
+	client.post("/terms/", json={"keyword": "MetricTerm", "description": "metrics"})
+	client.get("/terms/MetricTerm")
+	client.get("/terms/NoSuchMetricTerm")
+	text = client.get("/metrics").text
+	assert _sample(text, 'glossary_http_responses_total{method="GET",route="/terms/{keyword}",status="200"}') >= 1
+	assert _sample(text, 'glossary_http_responses_total{method="GET",route="/terms/{keyword}",status="404"}') >= 1
+	assert _sample(text, 'glossary_http_request_duration_seconds_count{method="GET",route="/terms/{keyword}"}') >= 2
+	assert "/terms/MetricTerm" not in text
+
+	summary = client.get("/metrics/summary").json()
+	row = next(
+		row for row in summary["glossary_http_request_duration_seconds"]
+		if row["route"] == "/terms/{keyword}" and row["method"] == "GET"
+	)
+	assert row["p50"] is not None and row["p50"] <= row["p99"]
+	client.delete("/terms/MetricTerm")
+
+
+@pytest.mark.skipif(glossary_pb2 is None, reason="gRPC code not generated (make generate-grpc)")
+def test_grpc_metrics_by_method_and_code():
+	server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[MetricsInterceptor()])
+	glossary_pb2_grpc.add_GlossaryServiceServicer_to_server(GlossaryServicer(), server)
+	port = server.add_insecure_port("127.0.0.1:0")
+	server.start()
+	try:
+		with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+			stub = glossary_pb2_grpc.GlossaryServiceStub(channel)
+			with pytest.raises(grpc.RpcError):
+				stub.SuggestTerms(glossary_pb2.SuggestTermsRequest(prefix=""))
+			list(stub.StreamTerms(glossary_pb2.StreamTermsRequest()))
+			_, call = stub.ListTerms.with_call(glossary_pb2.ListTermsRequest(limit=5))
+			timing = dict(call.trailing_metadata())["server-timing"]
+			assert int(re.search(r'desc="(\d+) queries"', timing).group(1)) >= 1
+	finally:
+		server.stop(None)
+
+	text = client.get("/metrics").text
+	suggest = '"/glossary.GlossaryService/SuggestTerms"'
+	stream = '"/glossary.GlossaryService/StreamTerms"'
+	assert _sample(text, f'glossary_grpc_server_handled_total{{method={suggest},code="INVALID_ARGUMENT"}}') >= 1
+	assert _sample(text, f'glossary_grpc_server_handled_total{{method={stream},code="OK"}}') >= 1
+	assert _sample(text, f'glossary_grpc_server_in_flight{{method={stream}}}') == 0
+
+
+def test_server_timing_counts_queries():
+	client.post("/terms/", json={"keyword": "TimingTerm", "description": "timing"})
+	timing = client.get("/terms/", params={"limit": 5}).headers["Server-Timing"]
+	match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"', timing)
+	assert match and int(match.group(2)) >= 1
+	# /health не обращается к БД
+	assert client.get("/health").headers["Server-Timing"] == 'db;dur=0.00;desc="0 queries"'
+	client.delete("/terms/TimingTerm")
+
+	text = client.get("/metrics").text
+	assert _sample(text, 'glossary_http_db_queries_count{method="GET",route="/terms/"}') >= 1
+
+
+def test_slow_query_log_includes_route(monkeypatch, caplog):
+	monkeypatch.setattr(query_stats, "SLOW_QUERY_MS", 1e-9)
+	with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+		client.get("/terms/SlowTerm")
+	assert any("GET /terms/{keyword}" in record.getMessage() and "FROM term" in record.getMessage() for record in caplog.records)
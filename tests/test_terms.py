@@ -1,6 +1,9 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app import transfer
 from app.main import app
 from app.db import init_db
 
@@ -62,3 +65,187 @@ def test_delete_term():
 def test_get_deleted_term():
 	resp = client.get("/terms/APIv2")
 	assert resp.status_code == 404
+
+
+def test_list_keyset_pagination():
+	keywords = [f"Page{i:02d}" for i in range(5)]
+	for keyword in keywords:
+		client.post("/terms/", json={"keyword": keyword, "description": "Paged"})
+
+	first = client.get("/terms/", params={"limit": 2})
+	assert first.status_code == 200
+	assert [t["keyword"] for t in first.json()] == keywords[:2]
+	assert first.headers["X-Total-Count"] == "5"
+
+	seen = [t["keyword"] for t in first.json()]
+	cursor = first.headers.get("X-Next-Cursor")
+	while cursor:
+		page = client.get("/terms/", params={"limit": 2, "after": cursor, "include_total": False})
+		assert "X-Total-Count" not in page.headers
+		seen.extend(t["keyword"] for t in page.json())
+		cursor = page.headers.get("X-Next-Cursor")
+	assert seen == keywords
+
+	for keyword in keywords:
+		client.delete(f"/terms/{keyword}")
+	assert client.get("/terms/").headers["X-Total-Count"] == "0"
+
+
+def test_list_invalid_cursor():
+	resp = client.get("/terms/", params={"after": "!!!"})
+	assert resp.status_code == 400
+
+
+def test_bulk_create_get_delete():
+	resp = client.post("/terms/bulk", json={"terms": [
+		{"keyword": "Bulk1", "description": "One"},
+		{"keyword": "Bulk2", "description": "Two", "source": "https://example.com"},
+		{"keyword": "Bulk1", "description": "Duplicate in batch"},
+		{"keyword": "Bulk3", "description": ""},
+	]})
+	assert resp.status_code == 200
+	statuses = [item["status"] for item in resp.json()["results"]]
+	assert statuses == ["created", "created", "conflict", "error"]
+	assert resp.json()["results"][1]["term"]["source"] == "https://example.com"
+
+	again = client.post("/terms/bulk", json={"terms": [{"keyword": "Bulk2", "description": "Again"}]})
+	assert again.json()["results"][0]["status"] == "conflict"
+
+	batch = client.post("/terms/batch-get", json={"keywords": ["Bulk2", "Missing", "Bulk1"]})
+	assert batch.status_code == 200
+	assert [t["keyword"] for t in batch.json()["terms"]] == ["Bulk2", "Bulk1"]
+	assert batch.json()["missing"] == ["Missing"]
+
+	deleted = client.post("/terms/bulk-delete", json={"keywords": ["Bulk1", "Bulk2", "Missing"]})
+	assert [item["status"] for item in deleted.json()["results"]] == ["deleted", "deleted", "not_found"]
+	assert client.get("/terms/Bulk1").status_code == 404
+
+
+def test_import_export_ndjson(monkeypatch):
+	monkeypatch.setattr(transfer, "IMPORT_BATCH_SIZE", 2)
+	lines = [json.dumps({"keyword": f"Import{index}", "description": f"Imported {index}"}) for index in range(5)]
+	lines[3:3] = ["", "{broken", json.dumps({"keyword": "Import0", "description": "Duplicate"})]
+	resp = client.post("/terms/-/import", content="\n".join(lines) + "\n", headers={"Content-Type": "application/x-ndjson"})
+	assert resp.status_code == 200
+	result = resp.json()
+	assert (result["lines"], result["created"], result["failed"]) == (7, 5, 2)
+	assert [(f["line"], f["status"]) for f in result["failures"]] == [(5, "error"), (6, "conflict")]
+	assert client.get("/terms/Import4").json()["description"] == "Imported 4"
+	assert client.get("/terms/-/search", params={"q": "Import3"}).json()["hits"][0]["keyword"] == "Import3"
+
+	resp = client.get("/terms/-/export")
+	assert resp.headers["content-type"].startswith("application/x-ndjson")
+	exported = [json.loads(line) for line in resp.text.splitlines()]
+	assert [term["keyword"] for term in exported if term["keyword"].startswith("Import")] == [f"Import{i}" for i in range(5)]
+	assert set(exported[0]) == {"id", "keyword", "description", "source"}
+
+	client.post("/terms/bulk-delete", json={"keywords": [f"Import{index}" for index in range(5)]})
+
+
+def test_service_route_names_as_keywords():
+	# Служебные маршруты не перекрывают термины с такими же ключевыми словами
+	for keyword in ["search", "suggest", "fuzzy", "export"]:
+		assert client.post("/terms/", json={"keyword": keyword, "description": "Service word"}).status_code == 201
+		try:
+			assert client.get(f"/terms/{keyword}").json()["keyword"] == keyword
+		finally:
+			client.delete(f"/terms/{keyword}")
+
+
+def test_search_ranking_highlight_and_sync():
+	client.post("/terms/bulk", json={"terms": [
+		{"keyword": "Kubernetes", "description": "Оркестратор контейнеров"},
+		{"keyword": "Docker", "description": "Платформа контейнеров, которую часто запускают в Kubernetes"},
+		{"keyword": "Café", "description": "Термин с диакритикой"},
+	]})
+	try:
+		resp = client.get("/terms/-/search", params={"q": "kubernetes"})
+		assert resp.status_code == 200
+		hits = resp.json()["hits"]
+		# Совпадение в keyword весит больше, чем в description
+		assert [hit["keyword"] for hit in hits] == ["Kubernetes", "Docker"]
+		assert hits[0]["keyword_highlight"] == "<mark>Kubernetes</mark>"
+		assert "<mark>Kubernetes</mark>" in hits[1]["snippet"]
+
+		page = client.get("/terms/-/search", params={"q": "контейн", "limit": 1})
+		assert len(page.json()["hits"]) == 1 and page.json()["next_offset"] == 1
+		last = client.get("/terms/-/search", params={"q": "контейн", "limit": 1, "offset": 1})
+		assert last.json()["next_offset"] is None
+
+		assert client.get("/terms/-/search", params={"q": "cafe"}).json()["hits"][0]["keyword"] == "Café"
+		assert client.get("/terms/-/search", params={"q": "\"*)"}).json()["hits"] == []
+
+		# Триггеры синхронизируют индекс при изменении и удалении
+		client.put("/terms/Docker", json={"description": "Контейнерная платформа"})
+		assert [hit["keyword"] for hit in client.get("/terms/-/search", params={"q": "kubernetes"}).json()["hits"]] == ["Kubernetes"]
+	finally:
+		client.post("/terms/bulk-delete", json={"keywords": ["Kubernetes", "Docker", "Café"]})
+	assert client.get("/terms/-/search", params={"q": "kubernetes"}).json()["hits"] == []
+
+
+def test_suggest_prefix():
+	client.post("/terms/bulk", json={"terms": [
+		{"keyword": "Suggest", "description": "a"},
+		{"keyword": "suggestion", "description": "b"},
+		{"keyword": "SuggestBox", "description": "c"},
+		{"keyword": "Sugar", "description": "d"},
+	]})
+	try:
+		resp = client.get("/terms/-/suggest", params={"prefix": "sugg"})
+		assert resp.status_code == 200
+		assert resp.json()["suggestions"] == ["Suggest", "SuggestBox", "suggestion"]
+		assert client.get("/terms/-/suggest", params={"prefix": "SUG", "limit": 2}).json()["suggestions"] == ["Sugar", "Suggest"]
+
+		# Индекс обновляется при переименовании и удалении
+		client.put("/terms/SuggestBox", json={"keyword": "Sugarcane"})
+		client.delete("/terms/suggestion")
+		assert client.get("/terms/-/suggest", params={"prefix": "sug"}).json()["suggestions"] == ["Sugar", "Sugarcane", "Suggest"]
+	finally:
+		client.post("/terms/bulk-delete", json={"keywords": ["Suggest", "Sugarcane", "Sugar"]})
+	assert client.get("/terms/-/suggest", params={"prefix": "sug"}).json()["suggestions"] == []
+
+
+def test_keyword_index_batches():
+	from app.suggest import MERGE_MIN_BATCH, KeywordIndex
+
+	def reference(keywords):
+		return sorted(set(keywords), key=lambda keyword: (keyword.casefold(), keyword))
+
+	index = KeywordIndex()
+	small = ["beta", "Alpha", "alpha"]
+	large = [f"{prefix}{i:03d}" for i in range(MERGE_MIN_BATCH) for prefix in ("Key", "key")] + ["beta", "Gamma"]
+	index.add(small)
+	index.add(large)
+	index.add(large[:3])  # повторное добавление не создаёт дублей
+	assert index.suggest("", limit=len(large) + 10) == reference(small + large)
+	assert index.suggest("KEY00", limit=4) == ["Key000", "key000", "Key001", "key001"]
+
+	index.remove(large[::2])
+	index.remove(["missing"])
+	assert index.suggest("", limit=len(large) + 10) == reference(set(small + large) - set(large[::2]))
+
+
+def test_fuzzy_and_did_you_mean():
+	client.post("/terms/bulk", json={"terms": [
+		{"keyword": "WebSocket", "description": "a"},
+		{"keyword": "gRPC", "description": "b"},
+		{"keyword": "Webhook", "description": "c"},
+	]})
+	try:
+		resp = client.get("/terms/-/fuzzy", params={"q": "WebSoket"})
+		assert resp.status_code == 200
+		matches = resp.json()["matches"]
+		assert matches[0]["keyword"] == "WebSocket"
+		assert 0.3 <= matches[0]["similarity"] < 1
+		assert client.get("/terms/-/fuzzy", params={"q": "grpc"}).json()["matches"][0] == {"keyword": "gRPC", "similarity": 1.0}
+
+		missing = client.get("/terms/WebSoket")
+		assert missing.status_code == 404
+		assert missing.json()["detail"] == "Term not found"
+		assert missing.json()["did_you_mean"][0] == "WebSocket"
+
+		client.put("/terms/WebSocket", json={"keyword": "WebSockets"})
+		assert client.get("/terms/-/fuzzy", params={"q": "WebSoket"}).json()["matches"][0]["keyword"] == "WebSockets"
+	finally:
+		client.post("/terms/bulk-delete", json={"keywords": ["WebSockets", "gRPC", "Webhook"]})
+	assert client.get("/terms/-/fuzzy", params={"q": "WebSoket"}).json()["matches"] == []